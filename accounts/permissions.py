@@ -9,6 +9,13 @@ def is_admin(user):
 role_required = user_passes_test(is_admin, login_url='accounts:login')
 
 
+def is_staff(user):
+    return user.is_active and user.is_staff
+
+
+staff_required = user_passes_test(is_staff, login_url='accounts:login')
+
+
 class AdminRequiredMixin(UserPassesTestMixin):
     login_url = 'accounts:login'
 
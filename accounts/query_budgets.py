@@ -0,0 +1,10 @@
+"""Query budgets for accounts' views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'signup': Budget({}),
+    'login': Budget({}),
+    'logout': Budget({'default': 4}, user='learner', method='post', status=302),
+    'profile': Budget({'default': 3}, user='learner'),
+    'delete': Budget({'default': 15}, user='learner', method='post', status=302),
+}
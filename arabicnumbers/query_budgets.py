@@ -0,0 +1,8 @@
+"""Query budgets for arabicnumbers' views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({}),
+    'practice': Budget({}),
+    'api_numbers': Budget({'arabicnumbers': 1}),
+}
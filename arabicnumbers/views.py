@@ -1,11 +1,13 @@
 import json
 
-from django.http import JsonResponse
 from django.shortcuts import render
-from django.urls import reverse
 
 from arabicnumbers.models import ArabicNumber
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url
 
 
 def home(request):
@@ -14,12 +16,14 @@ def home(request):
 
 def practice(request):
     config = {
-        'apiNumbersUrl': reverse('arabicnumbers:api_numbers'),
+        'apiNumbersUrl': api_url('arabicnumbers:api_numbers'),
     }
     context = {'config_json': json.dumps(config), **nav_context('arabicnumbers', 'practice')}
     return render(request, 'arabic-numbers/practice.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_numbers(request):
     return JsonResponse(
         list(ArabicNumber.objects.values('value', 'numeral', 'script', 'english', 'transliteration')),
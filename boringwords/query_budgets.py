@@ -0,0 +1,8 @@
+"""Query budgets for boringwords' views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({'boringwords': 1}),
+    'practice': Budget({}, args=('vie',)),
+    'api_deck': Budget({'boringwords': 2}, args=('vie',)),
+}
@@ -1,13 +1,16 @@
 import json
 
-from django.http import Http404, JsonResponse
+from django.http import Http404
 from django.shortcuts import render
-from django.urls import reverse
 
 from boringwords.languages import get_language_codes
 from boringwords.models import Background, Word
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
 from core.languages import display_name
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url
 
 
 def home(request):
@@ -23,12 +26,14 @@ def practice(request, language):
         raise Http404('Unknown language.')
     config = {
         'language': language,
-        'apiDeckUrl': reverse('boringwords:api_deck', args=[language]),
+        'apiDeckUrl': api_url('boringwords:api_deck', language),
     }
     context = {'config_json': json.dumps(config), **nav_context('boringwords', 'practice')}
     return render(request, 'boring-words/practice.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_deck(request, language):
     if language not in get_language_codes():
         raise Http404('Unknown language.')
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def _invalidate_content(sender, **kwargs):
+    from core.conditional import invalidate
+    invalidate('comprehensible_input')
 
 
 class ComprehensibleInputConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'comprehensible_input'
+
+    def ready(self):
+        # Languages/videos are edited live (admin and the manage views), unlike the other
+        # content apps' deployed files - see core.conditional.content_version.
+        for model in (self.get_model('Language'), self.get_model('Video')):
+            post_save.connect(_invalidate_content, sender=model, dispatch_uid=f'invalidate-{model.__name__}')
+            post_delete.connect(_invalidate_content, sender=model, dispatch_uid=f'invalidate-{model.__name__}')
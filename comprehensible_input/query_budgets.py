@@ -0,0 +1,29 @@
+"""Query budgets for comprehensible_input's views (see core.query_budgets)."""
+from comprehensible_input.models import Language, Video
+from core.query_budgets import Budget
+
+
+def _language_id():
+    return (Language.objects.filter(videos__isnull=False).values_list('pk', flat=True).first(),)
+
+
+def _language_code():
+    return (Language.objects.filter(videos__isnull=False).values_list('code', flat=True).first(),)
+
+
+def _video_id():
+    return (Video.objects.values_list('pk', flat=True).first(),)
+
+
+BUDGETS = {
+    'home': Budget({'comprehensible_input': 1}),
+    'all_videos': Budget({'comprehensible_input': 1}),
+    'video_list': Budget({'comprehensible_input': 2}, args=_language_id),
+    'practice': Budget({'comprehensible_input': 2}, args=_video_id),
+    'random_video': Budget({'comprehensible_input': 3}, args=_language_code),
+    'stats': Budget({}),
+    'video_manage': Budget({'default': 2, 'comprehensible_input': 1}, user='staff'),
+    'video_add': Budget({'default': 2, 'comprehensible_input': 1}, user='staff'),
+    'video_edit': Budget({'default': 2, 'comprehensible_input': 2}, args=_video_id, user='staff'),
+    'video_delete': Budget({'default': 2, 'comprehensible_input': 1}, args=_video_id, user='staff'),
+}
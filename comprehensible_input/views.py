@@ -78,7 +78,7 @@ class StatsView(TemplateView):
 
 
 class VideoManageListView(AdminRequiredMixin, ListView):
-    model = Video
+    queryset = Video.objects.select_related('language')
     template_name = 'comprehensible-input/video-manage.html'
     context_object_name = 'videos'
 
@@ -79,6 +79,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # After WhiteNoise, so static files aren't timed; see core/metrics.py.
+    'core.metrics.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -117,18 +119,41 @@ if db_url := os.environ.get('DATABASE_URL'):
 else:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'config.sqlite',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'PROFILE': 'writable',
+            # tracking's sync transactions read before they write; with SQLite's default
+            # DEFERRED mode two concurrent ones deadlock upgrading their locks ("database is
+            # locked" without waiting out the timeout). IMMEDIATE takes the write lock up front.
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
         }
     }
 
+# The SQLite aliases below use config.sqlite, which opens each with the
+# connection profile named by its PROFILE (see PROFILES there). The content
+# aliases open read-only/immutable when this is on - by default everywhere
+# but DEBUG, since locally import_*_data writes to them. `migrate` writes to
+# them too, so doc/deploy.md turns this off for the migrate step.
+SQLITE_CONTENT_READ_ONLY = os.environ.get('SQLITE_CONTENT_READ_ONLY', str(not DEBUG)).lower() == 'true'
+# Opt-in, on top of read-only: each worker copies the content files into
+# memory at startup and serves them from there. Any file over
+# SQLITE_PRELOAD_MAX_BYTES (or a DATABASES entry's own PRELOAD_MAX_BYTES)
+# stays on disk. Load time and RSS are logged per worker.
+SQLITE_CONTENT_PRELOAD = os.environ.get('SQLITE_CONTENT_PRELOAD', 'false').lower() == 'true'
+SQLITE_PRELOAD_MAX_BYTES = int(os.environ.get('SQLITE_PRELOAD_MAX_BYTES', 64 * 1024 * 1024))
+if SQLITE_CONTENT_READ_ONLY:
+    CONTENT_DB_PROFILE = 'preloaded' if SQLITE_CONTENT_PRELOAD else 'read_only'
+else:
+    CONTENT_DB_PROFILE = None
+
 # tprboard's content (vocab/tasks/3D-object relationships) is read-only in
 # normal operation, so it lives in its own committed SQLite file rather than
 # the app's operational database. DATABASE_ROUTERS below routes the tprboard
 # app's models here automatically.
 DATABASES['tprboard'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'tprboard.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # viettonepractice's clip content (transcript + audio filename) is a fixed,
@@ -136,8 +161,9 @@ DATABASES['tprboard'] = {
 # normal operation, so it lives in its own committed SQLite file. Routed here
 # automatically by DATABASE_ROUTERS below.
 DATABASES['viettonepractice'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'viettonepractice.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # hebrewscript's clip content (transcript + audio filename) is a fixed
@@ -145,25 +171,28 @@ DATABASES['viettonepractice'] = {
 # operation, so it lives in its own committed SQLite file. Routed here
 # automatically by DATABASE_ROUTERS below.
 DATABASES['hebrewscript'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'hebrewscript.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # comprehensible_input's Language/Video content is live, admin-managed CRUD
-# data (unlike the read-only imported content of the apps above), so its
-# sqlite file is not committed to git. Routed here automatically by
-# DATABASE_ROUTERS below.
+# data (unlike the read-only imported content of the apps above). Its sqlite
+# file is committed as a seed, but the server writes to it from then on.
+# Routed here automatically by DATABASE_ROUTERS below.
 DATABASES['comprehensible_input'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'comprehensible_input.sqlite3',
+    'PROFILE': 'writable',
 }
 
 # arabicnumbers's number/numeral/transliteration content is a fixed, small
 # dataset - read-only in normal operation, so it lives in its own committed
 # SQLite file. Routed here automatically by DATABASE_ROUTERS below.
 DATABASES['arabicnumbers'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'arabicnumbers.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # prepositions3d's gloss/translation content (per-language sentences + audio
@@ -171,8 +200,9 @@ DATABASES['arabicnumbers'] = {
 # read-only in normal operation, so it lives in its own committed SQLite
 # file. Routed here automatically by DATABASE_ROUTERS below.
 DATABASES['prepositions3d'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'prepositions3d.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # saetze's lesson/exercise content (German cloze-sentence drills with Tatoeba
@@ -180,8 +210,9 @@ DATABASES['prepositions3d'] = {
 # normal operation, so it lives in its own committed SQLite file. Routed here
 # automatically by DATABASE_ROUTERS below.
 DATABASES['saetze'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'saetze.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # egyptiansentences's sentence/cloze-word content (Egyptian Arabic cloze
@@ -190,8 +221,9 @@ DATABASES['saetze'] = {
 # operation, so it lives in its own committed SQLite file. Routed here
 # automatically by DATABASE_ROUTERS below.
 DATABASES['egyptiansentences'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'egyptiansentences.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # infinitesentences's sentence/gloss content (vocabulary-in-context drills
@@ -200,8 +232,9 @@ DATABASES['egyptiansentences'] = {
 # read-only in normal operation, so it lives in its own committed SQLite
 # file. Routed here automatically by DATABASE_ROUTERS below.
 DATABASES['infinitesentences'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'infinitesentences.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 # boringwords's Word/Background content (a small, hand-authored deck of
@@ -210,12 +243,51 @@ DATABASES['infinitesentences'] = {
 # in normal operation, so it lives in its own committed SQLite file.
 # Routed here automatically by DATABASE_ROUTERS below.
 DATABASES['boringwords'] = {
-    'ENGINE': 'django.db.backends.sqlite3',
+    'ENGINE': 'config.sqlite',
     'NAME': BASE_DIR / 'boringwords.sqlite3',
+    'PROFILE': CONTENT_DB_PROFILE,
 }
 
 DATABASE_ROUTERS = ['config.db_router.AppLabelRouter']
 
+# Opt-in: when set, tracking.views.sync only validates each batch and appends
+# it to this WAL-mode SQLite spool file (answering 202), and the
+# drain_tracking_spool command applies batches to the database in large
+# transactions - keeps write contention off the request path. Unset (the
+# default), sync writes inline as before.
+TRACKING_SPOOL_PATH = os.environ.get('TRACKING_SPOOL_PATH') or None
+
+# A plain directory rather than a cache server: every gunicorn worker on the
+# box shares it, which is all tracking.recent needs (and LocMemCache, being
+# per-process, wouldn't give). CACHE_DIR overrides the location.
+# 'tracking' holds tracking.recent's uuid sets and tracking.ratelimit's
+# token buckets - an entry or two per active user - in a directory of its
+# own, so user churn can't cull the default cache's keys. FileBasedCache
+# culls a random third of its files once it holds MAX_ENTRIES, so keep
+# TRACKING_CACHE_MAX_ENTRIES well above twice the number of active users.
+# 'fragments' is per-process on purpose: rendered template fragments hold
+# hashed static URLs, so they must not outlive the worker across a deploy.
+CACHE_DIR = Path(os.environ.get('CACHE_DIR') or BASE_DIR / '.cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+    },
+    'tracking': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'tracking',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('TRACKING_CACHE_MAX_ENTRIES', 20_000))},
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+    },
+}
+
+# Per-worker byte budget for core.response_cache's LRU of serialized content
+# API responses (0 turns it off).
+CONTENT_RESPONSE_CACHE_BYTES = int(os.environ.get('CONTENT_RESPONSE_CACHE_BYTES', 32 * 1024 * 1024))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -256,6 +328,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Django's defaults plus INFO from config.sqlite (preload_all's one-line summary at worker
+# start, and missing content files), which gunicorn's stderr carries into the journal. Each
+# alias's own preload line is DEBUG, so tests - which preload lazily - stay quiet.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'config.sqlite': {'handlers': ['console'], 'level': 'INFO'}},
+}
+
 AUTH_USER_MODEL = 'accounts.User'
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'index'
@@ -0,0 +1,215 @@
+"""SQLite backend with per-alias connection profiles.
+
+Set `'ENGINE': 'config.sqlite'` and `'PROFILE': <name>` on a DATABASES entry
+to open its connections with that entry from PROFILES: extra URI parameters
+on the file name plus PRAGMAs run on every new connection. It's the
+connection-level counterpart of config.db_router.AppLabelRouter - the router
+decides which alias an app's queries go to, the profile decides how that
+alias's file is opened. Without a PROFILE (or under DATABASE_URL) this is
+the stock sqlite3 backend.
+
+In-memory databases (i.e. the test runner's) never get a profile: they
+have to be created and migrated, and have no file to map or journal.
+
+A `preload` profile copies the file into an in-memory database (sqlite3's
+backup API) the first time the alias is used in a process - config.wsgi
+calls preload_all() so gunicorn workers do it at startup - and serves every
+connection from that copy. Each worker holds its own: an SQLite connection
+mustn't be carried across fork(), so a copy made in the gunicorn master
+can't be shared. Files over the alias's PRELOAD_MAX_BYTES (default
+settings.SQLITE_PRELOAD_MAX_BYTES) stay on disk, opened as `read_only`.
+
+A content file that doesn't exist is never created: its alias is served
+from an empty in-memory placeholder (with a warning) instead.
+"""
+import logging
+import os
+import resource
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+from urllib.request import pathname2url
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.sqlite3 import base
+
+logger = logging.getLogger(__name__)
+
+PROFILES = {
+    # Committed content databases nothing writes to while serving: no locking or change
+    # detection (immutable), reads through the page cache via mmap, and any write is refused
+    # at the connection rather than discovered as a corrupted file later. Nothing can go stale
+    # under an immutable file, so connections persist (as CONN_MAX_AGE=None) and the setup is
+    # paid once per worker thread instead of once per request.
+    'read_only': {
+        'persistent': True,
+        'uri': {'mode': 'ro', 'immutable': 1},
+        'pragmas': {
+            'query_only': 'ON',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -16 * 1024,  # KiB when negative
+            'temp_store': 'MEMORY',
+        },
+    },
+    # read_only, served from a per-worker in-memory copy (see the module docstring).
+    'preloaded': {
+        'persistent': True,
+        'preload': True,
+        'uri': {'mode': 'ro', 'immutable': 1},
+        'pragmas': {
+            'query_only': 'ON',
+            'temp_store': 'MEMORY',
+        },
+    },
+    # Databases written while serving (default, comprehensible_input): readers don't block
+    # the writer under WAL, and a busy writer is waited for rather than failing at once.
+    # journal_mode is stored in the file itself, so it isn't a per-connection pragma:
+    # set_journal_modes() switches it when the server starts (see config.wsgi), which leaves
+    # the committed comprehensible_input.sqlite3 alone in dev and test runs.
+    'writable': {
+        'uri': {},
+        'journal_mode': 'WAL',
+        'pragmas': {
+            'synchronous': 'NORMAL',
+            'busy_timeout': 20_000,
+        },
+    },
+}
+
+
+# alias -> connection keeping the in-memory copy alive (one must stay open for it to exist),
+# or None once the alias has been found too big to preload.
+_preloaded = {}
+_preload_lock = threading.Lock()
+
+
+def _file_uri(path, params):
+    return f'file:{pathname2url(str(path))}?{urlencode(params)}'
+
+
+def _memory_uri(alias):
+    return f'file:preloaded-{alias}?mode=memory&cache=shared'
+
+
+def _missing_uri(alias):
+    return f'file:missing-{alias}?mode=memory&cache=shared'
+
+
+def _peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _preload(alias, path, max_bytes):
+    """URI of `alias`'s in-memory copy of `path`, loading it on first use; None if it's too big."""
+    with _preload_lock:
+        if alias not in _preloaded:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = None  # not imported on this machine; see get_connection_params
+            if size is None:
+                _preloaded[alias] = None
+            elif size > max_bytes:
+                logger.debug('Not preloading %s: %.1f MiB is over its %.1f MiB cap', alias, size / 2**20, max_bytes / 2**20)
+                _preloaded[alias] = None
+            else:
+                started = time.perf_counter()
+                keeper = sqlite3.connect(_memory_uri(alias), uri=True, check_same_thread=False)
+                source = sqlite3.connect(_file_uri(path, {'mode': 'ro', 'immutable': 1}), uri=True)
+                try:
+                    source.backup(keeper)
+                finally:
+                    source.close()
+                _preloaded[alias] = keeper
+                logger.debug(
+                    'Preloaded %s (%.1f MiB) into memory in %.1f ms; worker peak RSS %.1f MiB',
+                    alias, size / 2**20, (time.perf_counter() - started) * 1000, _peak_rss_mib(),
+                )
+        return _memory_uri(alias) if _preloaded[alias] is not None else None
+
+
+def preload_all():
+    """Preload every alias whose profile asks for it, now rather than on first query."""
+    started = time.perf_counter()
+    loaded = [
+        alias for alias in connections
+        if isinstance(connections[alias], DatabaseWrapper) and connections[alias].preloaded_uri()
+    ]
+    if loaded:
+        logger.info(
+            'Preloaded %d content database(s) in %.1f ms; worker peak RSS %.1f MiB',
+            len(loaded), (time.perf_counter() - started) * 1000, _peak_rss_mib(),
+        )
+
+
+def set_journal_modes():
+    """Put every alias whose profile names a journal_mode into it (once per file, persistently)."""
+    for alias in connections:
+        if isinstance(connections[alias], DatabaseWrapper):
+            connections[alias].set_journal_mode()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _profile(self):
+        name = self.settings_dict.get('PROFILE')
+        if name is None or self.is_in_memory_db():
+            return {'uri': {}, 'pragmas': {}}
+        try:
+            return PROFILES[name]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES[{self.alias!r}]['PROFILE'] is {name!r}; "
+                f"expected one of {', '.join(sorted(PROFILES))}."
+            ) from None
+
+    def preloaded_uri(self):
+        """URI of this alias's in-memory copy if its profile preloads and it fits, else None."""
+        if not self._profile().get('preload'):
+            return None
+        max_bytes = self.settings_dict.get('PRELOAD_MAX_BYTES', settings.SQLITE_PRELOAD_MAX_BYTES)
+        return _preload(self.alias, self.settings_dict['NAME'], max_bytes)
+
+    def set_journal_mode(self):
+        mode = self._profile().get('journal_mode')
+        if mode is None:
+            return
+        with self.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode = {mode}')
+        self.close()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        uri = self._profile()['uri']
+        if preloaded := self.preloaded_uri():
+            params['database'] = preloaded
+        elif uri and os.path.exists(params['database']):
+            params['database'] = _file_uri(params['database'], uri)
+        elif uri:
+            # A content file not imported on this machine (e.g. infinitesentences): mode=ro would
+            # refuse it and the stock open would create an empty file in its place, while startup
+            # checks connect to every alias. An empty in-memory stand-in has no tables, so reads
+            # fail loudly rather than answer as if there were no content.
+            logger.warning('%s is missing; serving %s from an empty placeholder', params['database'], self.alias)
+            params['database'] = _missing_uri(self.alias)
+        return params
+
+    def connect(self):
+        super().connect()
+        if self._profile().get('persistent'):
+            self.close_at = None
+
+    def _pragmas(self):
+        profile = self._profile()
+        if profile.get('preload') and self.preloaded_uri() is None:
+            # Left on disk, so it wants the on-disk tuning (mmap, page cache) the copy doesn't need.
+            return PROFILES['read_only']['pragmas']
+        return profile['pragmas']
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for pragma, value in self._pragmas().items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
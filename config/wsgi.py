@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Put the writable SQLite files into WAL, and load content databases marked for preloading
+# (see config/sqlite/base.py) as each worker starts, rather than inside its first request.
+from config.sqlite.base import preload_all, set_journal_modes  # noqa: E402
+
+set_journal_modes()
+preload_all()
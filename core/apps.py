@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core.metrics import install_query_timer
+        connection_created.connect(install_query_timer, dispatch_uid='core-metrics-query-timer')
@@ -199,6 +199,9 @@ APPS: list[AppInfo] = [
 
 APPS_BY_SLUG: dict[str, AppInfo] = {app.slug: app for app in APPS}
 
+# Index-grid order (see AppState.sort_order), sorted once here rather than per request.
+INDEX_APPS: list[AppInfo] = sorted(APPS, key=lambda app: app.state.sort_order)
+
 
 def nav_context(slug: str, current_page: str) -> dict:
     """Context for `_app_subnav.html` / `_app_footer.html`.
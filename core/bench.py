@@ -0,0 +1,215 @@
+"""Load-generation/benchmark harness behind `manage.py bench`.
+
+Convention over configuration (mirrors core.languages): an app opts in by
+shipping a `<app>/bench.py` with
+
+- `scenarios(params)` -> list of Scenario - what to measure, given the
+  command's options as a dict;
+- optionally `WRITE_ALIASES` - database aliases the scenarios write to. The
+  runner points those at throwaway test databases (an on-disk file for
+  SQLite, `test_<name>` for a DATABASE_URL Postgres) so a benchmark never
+  touches real data. Read-only content aliases keep using the committed
+  .sqlite3 files, which is what production serves;
+- optionally `environment(params)` -> context manager wrapped around the
+  whole run (e.g. to switch off a rate limit).
+
+Each scenario is replayed from `concurrency` threads, each with its own
+django.test.Client (and so its own DB connection), and summarized as
+throughput plus p50/p95/p99 latency.
+
+This module is also core's own bench.py: `scenarios` at the bottom measures
+the index page.
+"""
+import importlib
+import math
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    # Called once per request: (client, request_number) -> response.
+    call: Callable
+    # Called once before the run with the concurrency level; returns one
+    # ready (e.g. logged-in) Client per worker thread.
+    prepare: Callable[[int], list] = field(default=lambda count: [Client() for _ in range(count)])
+
+
+def load_app_bench(app_label):
+    name = f'{apps.get_app_config(app_label).name}.bench'
+    try:
+        module = importlib.import_module(name)
+    except ModuleNotFoundError as exc:
+        if exc.name is None or not name.startswith(exc.name):
+            raise
+        return None
+    # core.bench is this harness; it only counts as core's bench.py if it defines scenarios.
+    return module if hasattr(module, 'scenarios') else None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(scenario, requests, concurrency):
+    clients = scenario.prepare(concurrency)
+    latencies = []
+    statuses = Counter()
+    response_bytes = Counter()
+    lock = threading.Lock()
+
+    def worker(index):
+        client = clients[index]
+        local_latencies, local_statuses, local_bytes = [], Counter(), 0
+        try:
+            for number in range(index, requests, concurrency):
+                started = time.perf_counter()
+                response = scenario.call(client, number)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                local_latencies.append(time.perf_counter() - started)
+                local_statuses[response.status_code] += 1
+                local_bytes += len(body)
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+            response_bytes['total'] += local_bytes
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    latencies.sort()
+    return {
+        'description': scenario.description,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 4),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'mean_response_bytes': round(response_bytes['total'] / len(latencies)) if latencies else 0,
+        # Process CPU (all threads, client side included) per request.
+        'cpu_ms_per_request': _ms(cpu / len(latencies)) if latencies else None,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+@contextmanager
+def isolated_databases(aliases):
+    """Swap `aliases` for freshly migrated throwaway databases for the duration."""
+    setup_test_environment(debug=False)
+    tmp_dir = tempfile.mkdtemp(prefix='linguanodon-bench-')
+    for alias in aliases:
+        connection = connections[alias]
+        if connection.vendor == 'sqlite':
+            # On disk rather than Django's default in-memory test database, so fsync and
+            # locking costs match production.
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tmp_dir, f'{alias}.sqlite3')
+    old_config = setup_databases(verbosity=0, interactive=False, aliases=set(aliases))
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def run_app(module, params, requests, concurrency, only=None):
+    write_aliases = getattr(module, 'WRITE_ALIASES', [])
+    environment = getattr(module, 'environment', lambda params: nullcontext())
+    results = {}
+    with isolated_databases(write_aliases), environment(params):
+        for scenario in module.scenarios(params):
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = run_scenario(scenario, requests, concurrency)
+    return results
+
+
+def run_metadata(params):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'database_vendor': connections['default'].vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'params': params,
+    }
+
+
+def compare(current, baseline):
+    """Lines describing each scenario's latency, throughput, size and CPU change against a baseline run."""
+    lines = []
+    for app_label, scenarios in current['results'].items():
+        for name, result in scenarios.items():
+            before = baseline.get('results', {}).get(app_label, {}).get(name)
+            if before is None:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p95_ms', 'throughput_rps', 'mean_response_bytes', 'cpu_ms_per_request'):
+                if before.get(key) and result.get(key) is not None:
+                    changes.append(f'{key} {before[key]} -> {result[key]} ({(result[key] / before[key] - 1) * 100:+.1f}%)')
+            lines.append(f'{app_label}.{name}: ' + ', '.join(changes))
+    return lines
+
+
+# core's scenarios: the index page, anonymous and logged in (the user goes in a throwaway default).
+WRITE_ALIASES = ['default']
+
+
+def scenarios(params):
+    user = get_user_model().objects.create_user('bench-index', password=None)
+
+    def prepare_logged_in(count):
+        clients = [Client() for _ in range(count)]
+        for client in clients:
+            client.force_login(user)
+        return clients
+
+    return [
+        Scenario('index-anonymous', 'GET the index page (app grid) anonymously', lambda client, number: client.get('/')),
+        Scenario(
+            'index-authenticated', 'GET the index page (app grid) logged in',
+            lambda client, number: client.get('/'),
+            prepare_logged_in,
+        ),
+    ]
@@ -0,0 +1,130 @@
+"""Conditional GET (ETag/Last-Modified -> 304) for the read-only content APIs.
+
+A content view's output only changes when a new `.sqlite3` for its alias
+is deployed, or when the view's own code changes. `content_conditional`
+derives a strong ETag from a hash of both the alias's database file and
+the view's module, and `If-None-Match` is answered 304 by Django's
+`condition` before the view, so before any ORM query. `no-cache` makes
+browsers revalidate every time rather than guess a freshness lifetime from
+Last-Modified and miss a deploy.
+
+The file hash is computed once per deployed file (keyed by its inode,
+size and mtime) and kept in the shared cache, so even the large
+infinitesentences file is read only once per deploy across all workers.
+A writable alias (PROFILE 'writable', i.e. comprehensible_input) changes
+without a deploy, so its version is instead a token in the shared cache
+that `invalidate` replaces whenever its content is edited.
+"""
+import hashlib
+import inspect
+import os
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+VERSION_TIMEOUT = 7 * 24 * 60 * 60
+
+_file_versions = {}
+
+
+def _file_version(path):
+    """`(sha256 hex, mtime)` of the file at `path`, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    signature = f'{path}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}'
+    if signature not in _file_versions:
+        key = 'core:file-version:' + hashlib.sha256(signature.encode()).hexdigest()
+        digest = cache.get(key)
+        if digest is None:
+            with open(path, 'rb') as file:
+                digest = hashlib.file_digest(file, 'sha256').hexdigest()
+            cache.set(key, digest, VERSION_TIMEOUT)
+        _file_versions[signature] = (digest, stat.st_mtime)
+    return _file_versions[signature]
+
+
+def _generation_key(alias):
+    return f'core:content-generation:{alias}'
+
+
+def invalidate(alias):
+    """Mark `alias`'s content as changed, for every worker."""
+    cache.set(_generation_key(alias), (uuid.uuid4().hex, time.time()), None)
+
+
+def content_version(alias):
+    """`(version, mtime)` of the content behind `alias`, or None if there isn't any.
+
+    The sha256 of the database file for a read-only alias; for a writable
+    (or in-memory) one, the token set by the last `invalidate` (created on
+    first use).
+    """
+    connection = connections[alias]
+    # The test runner's in-memory databases have no file to hash either.
+    if connection.settings_dict.get('PROFILE') == 'writable' or connection.is_in_memory_db():
+        generation = cache.get(_generation_key(alias))
+        if generation is None:
+            invalidate(alias)
+            generation = cache.get(_generation_key(alias))
+        return generation
+    return _file_version(connection.settings_dict['NAME'])
+
+
+def content_conditional(view):
+    """Answer a content view with ETag/Last-Modified, and If-None-Match with 304.
+
+    Only a 200 keeps the validators; an error response goes out without them.
+
+    The alias is the view's app label (config.db_router.AppLabelRouter
+    routes each content app to the alias of the same name).
+    """
+    alias = view.__module__.split('.')[0]
+    # The module defining the view itself, not that of a decorator wrapped around it
+    # (cache_content_response, typically).
+    source = inspect.getsourcefile(inspect.unwrap(view))
+
+    def versions():
+        return content_version(alias), _file_version(source)
+
+    def etag(request, *args, **kwargs):
+        database, code = versions()
+        if database is None or code is None:
+            return None
+        return hashlib.sha256(f'{database[0]}|{code[0]}'.encode()).hexdigest()[:32]
+
+    def last_modified(request, *args, **kwargs):
+        database, code = versions()
+        if database is None or code is None:
+            return None
+        return datetime.fromtimestamp(max(database[1], code[1]), tz=dt_timezone.utc)
+
+    conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code not in (200, 304):
+            # An error names no content version: nothing to revalidate, nothing to keep.
+            del response['ETag']
+            del response['Last-Modified']
+            return response
+        patch_cache_control(response, public=True, no_cache=True)
+        # core.response_cache may answer with a compressed body: the ETag names the content,
+        # not these exact bytes, so make it weak (as GZipMiddleware does). If-None-Match
+        # compares weakly, so either form still revalidates to a 304 - which needs the Vary too.
+        etag = response.get('ETag', '')
+        if response.has_header('Content-Encoding') and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    return wrapper
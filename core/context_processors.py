@@ -1,6 +1,6 @@
 from django.templatetags.static import static
 
-from core.apps_registry import APPS, APPS_BY_SLUG
+from core.apps_registry import APPS_BY_SLUG, INDEX_APPS
 
 
 def apps_registry(request):
@@ -9,10 +9,11 @@ def apps_registry(request):
     `apps_list` is ordered by state (recommended, then usable, then proof of
     concept) for the index grid; `apps_by_slug` lets an app's own templates
     look up their own entry (e.g. `apps_by_slug.saetze.code`) without
-    duplicating name/code/description locally.
+    duplicating name/code/description locally. Both are module constants,
+    so pages that use neither pay nothing for them.
     """
     return {
-        'apps_list': sorted(APPS, key=lambda app: app.state.sort_order),
+        'apps_list': INDEX_APPS,
         'apps_by_slug': APPS_BY_SLUG,
     }
 
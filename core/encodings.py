@@ -0,0 +1,78 @@
+"""Pre-compressed encodings of content payloads, and Accept-Encoding negotiation.
+
+Content payloads only change with their content version, so they are
+compressed once (into core.response_cache, or next to a snapshot file at
+build time) instead of once per request. gzip is always available; brotli
+is used when the optional `brotli` package is installed (`uv add brotli`).
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IDENTITY = 'identity'
+
+# Smaller bodies barely shrink and would cost a header and a Vary'd cache entry for nothing.
+MIN_COMPRESS_BYTES = 1024
+
+# (live, build) levels: a live miss compresses on the request path, a snapshot build has time to spare.
+GZIP_LEVELS = (6, 9)
+BROTLI_QUALITIES = (5, 11)
+
+# Preferred first when the client accepts several at the same q.
+PREFERENCE = ('br', 'gzip', IDENTITY)
+
+
+def encode(body, build=False):
+    """`{encoding: bytes}` for `body`: always IDENTITY, plus each available encoding that is smaller."""
+    variants = {IDENTITY: body}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return variants
+    compressed = {'gzip': gzip.compress(body, GZIP_LEVELS[build], mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(body, quality=BROTLI_QUALITIES[build])
+    for encoding, data in compressed.items():
+        if len(data) < len(body):
+            variants[encoding] = data
+    return variants
+
+
+def _accepted(header):
+    """`{coding: q}` from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def negotiate(header, available):
+    """The encoding in `available` to send for Accept-Encoding `header` (RFC 9110 12.5.3).
+
+    Highest q wins, ties go to PREFERENCE order. Identity is acceptable
+    unless refused explicitly (or via `*;q=0`), and is the fallback anyway -
+    a 406 would help no one.
+    """
+    accepted = _accepted(header or '')
+    wildcard = accepted.get('*', 0.0)
+
+    def q(encoding):
+        if encoding in accepted:
+            return accepted[encoding]
+        return max(wildcard, 0.001) if encoding == IDENTITY and '*' not in accepted else wildcard
+
+    ranked = [(q(encoding), -PREFERENCE.index(encoding), encoding) for encoding in PREFERENCE if encoding in available]
+    best_q, _, best = max(ranked)
+    return best if best_q > 0 else IDENTITY
@@ -7,12 +7,23 @@ model isn't possible here. Instead, the shared vocabulary is plain codes
 (ISO 639-3, e.g. 'deu', 'vie', 'arz') - each app privately owns whatever
 representation of "language" makes sense for its own data. See
 doc/languages.md.
+
+Every page renders `language_display` for one or more app cards, so the
+codes are kept per process and per content version of the app's alias
+(core.conditional.content_version): a new deployed `.sqlite3` changes the
+version, and an edit to the writable comprehensible_input alias calls
+core.conditional.invalidate. Apps without an alias list static codes and
+are read once.
 """
 import importlib
+from functools import cache
 
+from django.conf import settings
 from iso639 import Lang
 from iso639.exceptions import DeprecatedLanguageValue, InvalidLanguageValue
 
+from core.conditional import content_version
+
 # Overrides for codes iso639-lang doesn't resolve (e.g. a private-use/BCP-47
 # qaa-qtz or x-* code for an unregistered conlang or dialect). Empty today -
 # every code currently in use resolves via iso639-lang.
@@ -23,7 +34,11 @@ CUSTOM_LANGUAGES: dict[str, str] = {}
 # language rows.
 MAX_NAMES_SHOWN = 8
 
+# slug -> (content version, codes)
+_registry: dict[str, tuple] = {}
+
 
+@cache
 def display_name(code: str) -> str:
     if code in CUSTOM_LANGUAGES:
         return CUSTOM_LANGUAGES[code]
@@ -41,8 +56,12 @@ def language_codes(slug: str) -> list[str]:
     function - a static list for single-language apps, a live query against
     the app's own database for multi-language apps.
     """
-    module = importlib.import_module(f'{slug}.languages')
-    return module.get_language_codes()
+    version = content_version(slug) if slug in settings.DATABASES else None
+    entry = _registry.get(slug)
+    if entry is None or entry[0] != version:
+        module = importlib.import_module(f'{slug}.languages')
+        entry = _registry[slug] = (version, module.get_language_codes())
+    return list(entry[1])
 
 
 def language_display(slug: str) -> str:
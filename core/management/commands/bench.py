@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark request paths with synthetic load: replays each scenario from each '
+        "app's <app>/bench.py through Django test clients on concurrent threads and "
+        'reports throughput and p50/p95/p99 latency. Writes go to throwaway databases '
+        '(SQLite by default, the DATABASE_URL Postgres when set). Results are saved as '
+        'JSON for comparing runs across commits (see --compare).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('apps', nargs='*', help='App labels to benchmark. Defaults to every app with a bench.py.')
+        parser.add_argument('--scenario', action='append', dest='scenarios', help='Only run this scenario (repeatable).')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent client threads.')
+        parser.add_argument('--users', type=int, default=8, help='Synthetic users to seed.')
+        parser.add_argument('--history-days', type=int, default=90, help='Days of event history per synthetic user.')
+        parser.add_argument('--events-per-day', type=int, default=40, help='Events per synthetic user per day.')
+        parser.add_argument('--states-per-user', type=int, default=5000, help='LearningState rows per synthetic user.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic data.')
+        parser.add_argument(
+            '--with-ratelimit', action='store_true',
+            help='Keep per-user sync rate limiting on (off by default so scenarios measure ingestion).',
+        )
+        parser.add_argument('--output', help='Where to write the JSON results. Defaults to benchmarks/<timestamp>-<commit>.json.')
+        parser.add_argument('--compare', help='A previous results JSON to print changes against.')
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key]
+            for key in ('users', 'history_days', 'events_per_day', 'states_per_user', 'seed', 'with_ratelimit')
+        }
+        app_labels = options['apps'] or [config.label for config in apps.get_app_configs()]
+
+        modules = {}
+        for app_label in app_labels:
+            module = bench.load_app_bench(app_label)
+            if module is not None:
+                modules[app_label] = module
+            elif options['apps']:
+                raise CommandError(f'{app_label} has no bench.py.')
+
+        run = {'meta': bench.run_metadata(params), 'results': {}}
+        for app_label, module in modules.items():
+            results = bench.run_app(module, params, options['requests'], options['concurrency'], options['scenarios'])
+            run['results'][app_label] = results
+            for name, result in results.items():
+                self.stdout.write(
+                    f'{app_label}.{name}: {result["throughput_rps"]} req/s, '
+                    f'p50 {result["p50_ms"]} ms, p95 {result["p95_ms"]} ms, p99 {result["p99_ms"]} ms, '
+                    f'{result["mean_response_bytes"]} B, cpu {result["cpu_ms_per_request"]} ms/req, '
+                    f'statuses {result["statuses"]}'
+                )
+
+        meta = run['meta']
+        output = Path(options['output'] or settings.BASE_DIR / 'benchmarks' / (
+            f'{meta["timestamp"].replace(":", "")}-{meta["commit"] or "nocommit"}-{meta["database_vendor"]}.json'
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(run, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
+
+        if options['compare']:
+            baseline = json.loads(Path(options['compare']).read_text())
+            for line in bench.compare(run, baseline):
+                self.stdout.write(line)
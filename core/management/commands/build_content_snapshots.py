@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Render every read-only content API (core.snapshots.ENDPOINTS, per argument) into '
+        'content-hashed JSON under STATIC_ROOT/snapshots/ for nginx to serve, and write the '
+        'manifest practice pages use to point at them. Run after collectstatic, before '
+        'restarting gunicorn.'
+    )
+
+    def handle(self, *args, **options):
+        try:
+            manifest, written = snapshots.build()
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(manifest)} snapshots in {snapshots.snapshot_root()} ({written} new bytes written)'
+        ))
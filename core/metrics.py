@@ -0,0 +1,261 @@
+"""Per-request performance instrumentation: Server-Timing and `/metrics`.
+
+ServerTimingMiddleware times each request, every query on every database
+alias (`time_query` is installed as an execute wrapper on each connection
+as it opens - see CoreConfig.ready - so it sees each AppLabelRouter alias
+separately) and the json.dumps inside this module's JsonResponse, which
+the JSON views use in place of django.http's. What's left of the wall time
+is `app`: view code and template rendering. In DEBUG, or for staff, the
+numbers go back as a `Server-Timing` header - browser devtools show it next
+to the request. Everyone else gets no header, as it names database aliases
+and query counts.
+
+The same numbers accumulate per view in each worker. At most every
+FLUSH_INTERVAL seconds a worker writes its whole snapshot to the shared
+cache (settings.CACHES 'default', the directory every gunicorn worker on
+the box reads) under its own key - one writer per key, so no locking and
+no lost increments. The staff-only `metrics` view sums every worker's
+snapshot into Prometheus text format; a worker's last FLUSH_INTERVAL of
+requests shows up with its next request.
+"""
+import contextvars
+import os
+import threading
+import time
+
+from django import http
+from django.conf import settings
+from django.core.cache import cache
+
+from core.response_cache import response_cache
+
+FLUSH_INTERVAL = 10
+# A dead worker's counts keep being reported for this long (Prometheus treats their
+# disappearance as a counter reset), then its snapshot expires.
+WORKER_TIMEOUT = 24 * 60 * 60
+WORKERS_KEY = 'core:metrics:workers'
+# Cache version of the snapshots: bump it with their shape, so workers still running the old
+# code (or their leftovers) aren't summed with the new.
+SNAPSHOT_VERSION = 2
+
+# Prometheus client's default histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar('core.metrics.current', default=None)
+
+
+class _RequestTimings:
+    def __init__(self):
+        # alias -> [query count, seconds]
+        self.queries = {}
+        self.serialize = 0.0
+
+    def app_seconds(self, total):
+        """Of `total`, the time not spent in queries or serialization."""
+        return max(0.0, total - self.serialize - sum(seconds for _, seconds in self.queries.values()))
+
+
+class JsonResponse(http.JsonResponse):
+    """django.http.JsonResponse that reports its serialization time as `serialize`."""
+
+    def __init__(self, *args, **kwargs):
+        started = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        timings = _current.get()
+        if timings is not None:
+            timings.serialize += time.perf_counter() - started
+
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper adding each query to the current request's timings, if any."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        entry = timings.queries.setdefault(context['connection'].alias, [0, 0.0])
+        entry[0] += 1
+        entry[1] += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver: wrap every query on `connection` with time_query."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def _server_timing(total, timings):
+    metrics = [f'total;dur={total * 1000:.2f}']
+    for alias, (count, seconds) in sorted(timings.queries.items()):
+        noun = 'query' if count == 1 else 'queries'
+        metrics.append(f'db-{alias};desc="{count} {noun}";dur={seconds * 1000:.2f}')
+    if timings.serialize:
+        metrics.append(f'serialize;dur={timings.serialize * 1000:.2f}')
+    metrics.append(f'app;dur={timings.app_seconds(total) * 1000:.2f}')
+    return ', '.join(metrics)
+
+
+class _Aggregate:
+    """This worker's per-view totals since it started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # view -> [count, seconds, app seconds, serialize seconds, [per-bucket counts, last one +Inf]]
+        self.views = {}
+        # (view, alias) -> [query count, seconds]
+        self.queries = {}
+        self._flushed_at = time.monotonic()
+
+    def record(self, view, total, timings):
+        with self._lock:
+            entry = self.views.setdefault(view, [0, 0.0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)])
+            entry[0] += 1
+            entry[1] += total
+            entry[2] += timings.app_seconds(total)
+            entry[3] += timings.serialize
+            entry[4][next((i for i, bound in enumerate(BUCKETS) if total <= bound), len(BUCKETS))] += 1
+            for alias, (count, seconds) in timings.queries.items():
+                queries = self.queries.setdefault((view, alias), [0, 0.0])
+                queries[0] += count
+                queries[1] += seconds
+            due = time.monotonic() - self._flushed_at >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'views': {view: [*entry[:4], list(entry[4])] for view, entry in self.views.items()},
+                'queries': {key: list(entry) for key, entry in self.queries.items()},
+                'response_cache': response_cache.stats(),
+            }
+
+    def flush(self):
+        worker = f'core:metrics:worker:{os.getpid()}'
+        self._flushed_at = time.monotonic()
+        cache.set(worker, self.snapshot(), WORKER_TIMEOUT, version=SNAPSHOT_VERSION)
+        # Two workers registering at once can drop one of them; it re-adds itself next flush.
+        workers = cache.get(WORKERS_KEY, version=SNAPSHOT_VERSION) or set()
+        if worker not in workers:
+            cache.set(WORKERS_KEY, workers | {worker}, None, version=SNAPSHOT_VERSION)
+
+
+aggregate = _Aggregate()
+
+
+def _shows_timings(request):
+    if settings.DEBUG:
+        return True
+    # Only a request with a session can be staff; don't load one just to find that out.
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return False
+    # This middleware runs ahead of SessionMiddleware/AuthenticationMiddleware (so their queries
+    # are timed too) and asks only once the response is back; a response from before them - one
+    # that short-circuited - has no `user`.
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class ServerTimingMiddleware:
+    """Time the request, its queries per alias and its JSON serialization (see module docstring).
+
+    Streaming responses are timed up to their first byte only.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if _shows_timings(request):
+            response['Server-Timing'] = _server_timing(total, timings)
+        match = request.resolver_match
+        aggregate.record(match.view_name if match else 'unresolved', total, timings)
+        return response
+
+
+def collect():
+    """Every live worker's snapshot, summed (this worker's flushed first)."""
+    aggregate.flush()
+    workers = cache.get(WORKERS_KEY, version=SNAPSHOT_VERSION) or set()
+    snapshots = cache.get_many(workers, version=SNAPSHOT_VERSION)
+    if set(snapshots) != workers:
+        cache.set(WORKERS_KEY, set(snapshots), None, version=SNAPSHOT_VERSION)
+
+    views, queries, response_caches = {}, {}, {}
+    for snapshot in snapshots.values():
+        for view, (count, seconds, app, serialize, buckets) in snapshot['views'].items():
+            entry = views.setdefault(view, [0, 0.0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)])
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] += app
+            entry[3] += serialize
+            entry[4] = [a + b for a, b in zip(entry[4], buckets)]
+        for key, (count, seconds) in snapshot['queries'].items():
+            entry = queries.setdefault(key, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+        for name, value in snapshot['response_cache'].items():
+            response_caches[name] = response_caches.get(name, 0) + value
+    return {'workers': len(snapshots), 'views': views, 'queries': queries, 'response_cache': response_caches}
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def prometheus_text(totals):
+    """`collect()`'s totals in the Prometheus text exposition format."""
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'])
+
+    family('linguanodon_request_duration_seconds', 'histogram', 'Wall time per request, by view.')
+    for view, (count, seconds, _, _, buckets) in sorted(totals['views'].items()):
+        cumulative = 0
+        for bound, bucket in zip((*BUCKETS, '+Inf'), buckets):
+            cumulative += bucket
+            lines.append(f'linguanodon_request_duration_seconds_bucket{_labels(view=view, le=bound)} {cumulative}')
+        lines.append(f'linguanodon_request_duration_seconds_sum{_labels(view=view)} {seconds}')
+        lines.append(f'linguanodon_request_duration_seconds_count{_labels(view=view)} {count}')
+
+    family(
+        'linguanodon_app_seconds_total', 'counter',
+        'Time outside database queries and JSON serialization (view code, rendering), by view.',
+    )
+    for view, (_, _, app, _, _) in sorted(totals['views'].items()):
+        lines.append(f'linguanodon_app_seconds_total{_labels(view=view)} {app}')
+
+    family('linguanodon_json_serialize_seconds_total', 'counter', 'Time spent serializing JsonResponse bodies, by view.')
+    for view, (_, _, _, serialize, _) in sorted(totals['views'].items()):
+        lines.append(f'linguanodon_json_serialize_seconds_total{_labels(view=view)} {serialize}')
+
+    family('linguanodon_db_queries_total', 'counter', 'Database queries, by view and alias.')
+    for (view, alias), (count, _) in sorted(totals['queries'].items()):
+        lines.append(f'linguanodon_db_queries_total{_labels(view=view, alias=alias)} {count}')
+    family('linguanodon_db_query_seconds_total', 'counter', 'Time spent in database queries, by view and alias.')
+    for (view, alias), (_, seconds) in sorted(totals['queries'].items()):
+        lines.append(f'linguanodon_db_query_seconds_total{_labels(view=view, alias=alias)} {seconds}')
+
+    for name in ('hits', 'misses', 'evictions'):
+        family(f'linguanodon_response_cache_{name}_total', 'counter', f'core.response_cache {name}, all workers.')
+        lines.append(f'linguanodon_response_cache_{name}_total {totals["response_cache"].get(name, 0)}')
+    family('linguanodon_response_cache_bytes', 'gauge', 'Bytes held by core.response_cache, all workers.')
+    lines.append(f'linguanodon_response_cache_bytes {totals["response_cache"].get("bytes", 0)}')
+
+    family('linguanodon_metrics_workers', 'gauge', 'Workers whose snapshot is included.')
+    lines.append(f'linguanodon_metrics_workers {totals["workers"]}')
+    return '\n'.join(lines) + '\n'
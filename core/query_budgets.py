@@ -0,0 +1,222 @@
+"""Per-view query budgets, checked for every named URL by core.tests.
+
+Convention over configuration (mirrors core.bench): an app declares its
+views' budgets in a `<app>/query_budgets.py` with
+
+- `BUDGETS` - `{url name within the app's namespace: Budget}`; every named
+  URL under the app's namespace needs an entry, so a new view can't slip in
+  unbudgeted;
+- optionally `fixtures()` - seeds the app's test database. Content aliases
+  without one get a copy of their committed `<alias>.sqlite3`, so budgets
+  are checked against the real content (an N+1 shows up as one query per
+  real row, not per toy row) - if it exists, fits under
+  SQLITE_PRELOAD_MAX_BYTES and has the app's tables (an unimported
+  infinitesentences.sqlite3 is an empty file).
+
+Each URL is requested once with the process-level caches (core.languages,
+core.response_cache, the 'fragments' template cache) emptied first, so a
+budget bounds the cold path. A response with an ETag is then revalidated
+with If-None-Match, which has to answer 304 within the same budget. A
+request over budget fails with the SQL it ran; statements it repeated
+(the usual N+1 shape) are marked `+` against the distinct statements.
+core's own budgets are at the bottom of this module.
+"""
+import difflib
+import importlib
+import re
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Callable
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+
+from core import languages
+from core.conditional import invalidate
+from core.response_cache import response_cache
+
+# Generous on purpose: it's there to catch a view going from milliseconds to seconds, not
+# to benchmark (that's `manage.py bench`) on whatever machine runs the tests.
+DEFAULT_MAX_MS = 500
+
+# Namespaces that aren't ours to budget.
+IGNORED_NAMESPACES = {'admin'}
+
+
+@dataclass
+class Budget:
+    # alias -> most queries the request may run on it; aliases not listed get 0.
+    queries: dict[str, int]
+    # URL arguments, or a callable returning them once fixtures are loaded.
+    args: tuple | Callable[[], tuple] = ()
+    # Query string parameters for method 'get'.
+    query: dict | None = None
+    # None (anonymous), 'learner' or 'staff' (an admin-role staff user).
+    user: str | None = None
+    method: str = 'get'
+    # Request body (or a callable returning it) for method 'post'.
+    data: object = None
+    content_type: str = 'application/x-www-form-urlencoded'
+    status: int = 200
+    max_ms: float = DEFAULT_MAX_MS
+
+
+def named_urls():
+    """`(full url name, namespace)` for every named URL outside IGNORED_NAMESPACES."""
+    def walk(patterns, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace in IGNORED_NAMESPACES:
+                    continue
+                inner = pattern.namespace if pattern.namespace else namespace
+                yield from walk(pattern.url_patterns, inner)
+            elif pattern.name:
+                yield (f'{namespace}:{pattern.name}' if namespace else pattern.name), namespace
+    return list(walk(get_resolver().url_patterns, None))
+
+
+def load_budgets(namespace):
+    """The `<namespace>.query_budgets` module (this one for core's un-namespaced URLs)."""
+    module_name = f'{namespace}.query_budgets' if namespace else __name__
+    try:
+        return importlib.import_module(module_name)
+    except ModuleNotFoundError as exc:
+        if exc.name != module_name:
+            raise
+        return None
+
+
+def _has_tables(path, alias):
+    """Whether the database at `path` has a table for each of `alias`'s models."""
+    tables = {model._meta.db_table for model in apps.get_app_config(alias).get_models()}
+    with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as source:
+        found = {name for name, in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return tables <= found
+
+
+def load_content_fixtures(modules):
+    """Fill every content alias's test database: `fixtures()` if its app defines one, else a copy
+    of its committed file if that fits in memory and has the app's tables, else nothing."""
+    for alias in connections:
+        if alias == 'default':
+            continue
+        path = settings.BASE_DIR / f'{alias}.sqlite3'
+        module = modules.get(alias)
+        if module is not None and hasattr(module, 'fixtures'):
+            module.fixtures()
+        elif (
+            path.exists()
+            and path.stat().st_size <= settings.SQLITE_PRELOAD_MAX_BYTES
+            and _has_tables(path, alias)
+        ):
+            connection = connections[alias]
+            connection.ensure_connection()
+            with closing(sqlite3.connect(f'file:{path}?mode=ro', uri=True)) as source:
+                source.backup(connection.connection)
+        invalidate(alias)
+
+
+def _user(kind):
+    if kind is None:
+        return None
+    model = get_user_model()
+    count = model.objects.count()
+    if kind == 'staff':
+        return model.objects.create_user(
+            f'budget-staff-{count}', password=None, is_staff=True, role=model.Role.ADMIN,
+        )
+    return model.objects.create_user(f'budget-learner-{count}', password=None)
+
+
+def _reset_process_caches():
+    languages._registry.clear()
+    response_cache.clear()
+    caches['fragments'].clear()
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b")
+_TRANSACTION_CONTROL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+def _shape(sql):
+    return _LITERALS.sub('?', sql)
+
+
+def sql_report(statements):
+    """Executed SQL, numbered, then a diff of its distinct shapes (-) against every execution (+)."""
+    lines = [f'  {number}. {sql}' for number, sql in enumerate(statements, 1)]
+    shapes = [_shape(sql) for sql in statements if not sql.startswith(_TRANSACTION_CONTROL)]
+    distinct = list(dict.fromkeys(shapes))
+    if len(distinct) < len(shapes):
+        lines.append('  repeated statements (distinct -> executed):')
+        lines.extend(
+            f'    {line}' for line in difflib.unified_diff(distinct, shapes, 'distinct', 'executed', lineterm='')
+        )
+    return '\n'.join(lines)
+
+
+def measure(client, url_name, budget, headers=None):
+    """Request `url_name` per `budget`; returns `(response, seconds, {alias: [sql, ...]})`.
+
+    The request goes out as a new user of the budget's kind - unless it has `headers`: those
+    revalidate the previous response (If-None-Match), in the same session it was answered for.
+    """
+    args = budget.args() if callable(budget.args) else budget.args
+    url = reverse(url_name, args=args)
+    if headers is None:
+        user = _user(budget.user)
+        client.logout()
+        if user is not None:
+            client.force_login(user)
+    data = budget.data() if callable(budget.data) else budget.data
+    _reset_process_caches()
+
+    captures = {alias: CaptureQueriesContext(connections[alias]) for alias in connections}
+    for capture in captures.values():
+        capture.__enter__()
+    try:
+        started = time.perf_counter()
+        if budget.method == 'post':
+            response = client.post(url, data, content_type=budget.content_type, headers=headers)
+        else:
+            response = client.get(url, budget.query, headers=headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        seconds = time.perf_counter() - started
+    finally:
+        for capture in captures.values():
+            capture.__exit__(None, None, None)
+    return response, seconds, {
+        alias: [query['sql'] for query in capture.captured_queries] for alias, capture in captures.items()
+    }
+
+
+def violations(budget, response, seconds, executed):
+    """Human-readable reasons a `measure`d request broke `budget` (empty if it didn't)."""
+    problems = []
+    if response.status_code != budget.status:
+        problems.append(f'answered {response.status_code}, expected {budget.status}')
+    for alias, statements in sorted(executed.items()):
+        allowed = budget.queries.get(alias, 0)
+        if len(statements) > allowed:
+            problems.append(
+                f"ran {len(statements)} queries on '{alias}', budget {allowed}:\n{sql_report(statements)}"
+            )
+    if seconds * 1000 > budget.max_ms:
+        problems.append(f'took {seconds * 1000:.0f} ms, ceiling {budget.max_ms:.0f} ms')
+    return problems
+
+
+# core's budgets: the index page and /metrics.
+BUDGETS = {
+    # Cold: one language-code query per app with a multi-language alias (core.languages).
+    'index': Budget({'tprboard': 1, 'comprehensible_input': 1, 'prepositions3d': 1, 'infinitesentences': 1}),
+    'metrics': Budget({'default': 2}, user='staff'),
+}
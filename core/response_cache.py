@@ -0,0 +1,129 @@
+"""In-process LRU cache of serialized content API responses.
+
+`cache_content_response` keys each response on the view, its arguments and
+the content version of the view's alias (core.conditional.content_version),
+so a deploy of a new `.sqlite3` - or an edit to a writable alias, see
+core.conditional.invalidate - makes every older entry unreachable. Those
+then age out of the LRU, which is bounded by
+settings.CONTENT_RESPONSE_CACHE_BYTES of response bodies per worker.
+
+Each entry keeps the identity body together with its gzip (and brotli, see
+core.encodings) variants, compressed once on the miss; every response picks
+one by Accept-Encoding and says `Vary: Accept-Encoding`.
+
+Per-process on purpose: a hit is a dict lookup with no I/O, where the
+shared file cache (settings.CACHES) would cost a file read plus unpickling
+the same bytes.
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core import encodings
+from core.conditional import content_version
+
+CACHE_STATUS_HEADER = 'X-Response-Cache'
+
+
+def _size(variants):
+    return sum(len(body) for body in variants.values())
+
+
+class ResponseCache:
+    """Thread-safe LRU of `key -> ({encoding: body bytes}, content type)`, capped by total body bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, variants, content_type):
+        size = _size(variants)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= _size(self._entries.pop(key)[0])
+            self._entries[key] = (variants, content_type)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= _size(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+response_cache = ResponseCache(settings.CONTENT_RESPONSE_CACHE_BYTES)
+
+
+def _encoded_response(request, variants, content_type):
+    encoding = encodings.negotiate(request.headers.get('Accept-Encoding'), variants)
+    response = HttpResponse(variants[encoding], content_type=content_type)
+    if encoding != encodings.IDENTITY:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def cache_content_response(view):
+    """Serve a content view's 200 responses from `response_cache`.
+
+    Place it under core.conditional.content_conditional, so a 304 never
+    reaches the cache at all. Responses say `X-Response-Cache: hit|miss`.
+    """
+    alias = view.__module__.split('.')[0]
+    name = f'{view.__module__}.{view.__qualname__}'
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        version = content_version(alias)
+        if request.method != 'GET' or version is None or not response_cache.max_bytes:
+            return view(request, *args, **kwargs)
+
+        key = (name, args, tuple(sorted(kwargs.items())), request.GET.urlencode(), version[0])
+        entry = response_cache.get(key)
+        if entry is not None:
+            response = _encoded_response(request, *entry)
+            response[CACHE_STATUS_HEADER] = 'hit'
+            return response
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            variants = encodings.encode(response.content)
+            response_cache.set(key, variants, response['Content-Type'])
+            response = _encoded_response(request, variants, response['Content-Type'])
+        response[CACHE_STATUS_HEADER] = 'miss'
+        return response
+
+    return wrapper
@@ -0,0 +1,149 @@
+"""Build-time JSON snapshots of the read-only content APIs.
+
+Every endpoint in ENDPOINTS is a pure function of a committed content
+database, so `manage.py build_content_snapshots` renders each one (once per
+argument tuple) into a content-hashed file under
+STATIC_ROOT/snapshots/<app>/, and records `live URL -> static path` in
+STATIC_ROOT/snapshots/manifest.json. nginx serves those from /static/ with
+its `immutable` headers; a changed payload gets a new hash, so a new URL.
+Each file gets `.gz` (and `.br`, see core.encodings) siblings compressed at
+the highest level, which nginx's `gzip_static` sends instead of gzipping
+the payload on every request.
+
+Practice views build their API URLs with `api_url`, which returns the
+snapshot's static URL when the manifest has one and the live view's URL
+otherwise (locally, before any build, or for an argument added since).
+"""
+import hashlib
+import json
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.templatetags.static import static
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.text import slugify
+
+from core import encodings
+
+SNAPSHOT_DIR = 'snapshots'
+MANIFEST_NAME = 'manifest.json'
+
+
+def _no_args():
+    return [()]
+
+
+def _boringwords_languages():
+    from boringwords.languages import get_language_codes
+    return [(code,) for code in get_language_codes()]
+
+
+def _saetze_lessons():
+    from saetze.models import Lesson
+    return [(key,) for key in Lesson.objects.values_list('key', flat=True)]
+
+
+def _tprboard_locales():
+    from tprboard.models import Locale
+    return [(code,) for code in Locale.objects.values_list('code', flat=True)]
+
+
+# url name -> callable returning the argument tuples to render it for.
+ENDPOINTS = {
+    'arabicnumbers:api_numbers': _no_args,
+    'boringwords:api_deck': _boringwords_languages,
+    'hebrewscript:api_clips': _no_args,
+    'prepositions3d:api_glossary': _no_args,
+    'prepositions3d:api_languages': _no_args,
+    'saetze:api_exercises': _saetze_lessons,
+    'tprboard:api_languages': _no_args,
+    'tprboard:api_locale_tasks': _tprboard_locales,
+    'tprboard:api_objects': _no_args,
+    'viettonepractice:api_clips': _no_args,
+}
+
+
+_SUFFIXES = {encodings.IDENTITY: '', 'gzip': '.gz', 'br': '.br'}
+
+
+def snapshot_root():
+    return Path(settings.STATIC_ROOT) / SNAPSHOT_DIR
+
+
+@cache
+def _manifest():
+    try:
+        return json.loads((snapshot_root() / MANIFEST_NAME).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def snapshot_url(url_name, *args):
+    """Static URL of `url_name`'s snapshot for `args`, or None if none was built.
+
+    The manifest is read once per process - gunicorn restarts after a deploy's
+    build_content_snapshots.
+    """
+    path = _manifest().get(reverse(url_name, args=args))
+    return static(path) if path else None
+
+
+def api_url(url_name, *args):
+    """URL a practice page should fetch `url_name` from: its snapshot if built, else the live view."""
+    return snapshot_url(url_name, *args) or reverse(url_name, args=args)
+
+
+def _render(live_url):
+    match = resolve(live_url)
+    response = match.func(RequestFactory().get(live_url), *match.args, **match.kwargs)
+    if response.status_code != 200:
+        raise ValueError(f'{live_url} answered {response.status_code}')
+    return response.content
+
+
+def build():
+    """Render every endpoint into STATIC_ROOT and write the manifest.
+
+    Files (and their compressed siblings) that neither this build nor the
+    previous one reference are deleted; the previous build's are kept so
+    pages rendered just before a deploy can still fetch theirs. Returns
+    `(manifest, bytes_written)`.
+    """
+    root = snapshot_root()
+    manifest_path = root / MANIFEST_NAME
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except FileNotFoundError:
+        previous = {}
+
+    manifest = {}
+    written = 0
+    for url_name, arguments in ENDPOINTS.items():
+        app_label, name = url_name.split(':')
+        for args in arguments():
+            live_url = reverse(url_name, args=args)
+            content = _render(live_url)
+            stem = '-'.join([name, *(slugify(str(arg)) for arg in args)])
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            relative = f'{SNAPSHOT_DIR}/{app_label}/{stem}.{digest}.json'
+            path = Path(settings.STATIC_ROOT) / relative
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                for encoding, data in encodings.encode(content, build=True).items():
+                    suffix = _SUFFIXES[encoding]
+                    path.with_name(path.name + suffix).write_bytes(data)
+                    written += len(data)
+            manifest[live_url] = relative
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    _manifest.cache_clear()
+
+    keep = {Path(settings.STATIC_ROOT) / relative for relative in (*manifest.values(), *previous.values())}
+    for path in root.glob('*/*.json*'):
+        snapshot = path.with_suffix('') if path.suffix in ('.gz', '.br') else path
+        if snapshot not in keep:
+            path.unlink()
+    return manifest, written
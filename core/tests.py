@@ -1,3 +1,361 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import importlib.util
+import json
+import sqlite3
+import tempfile
+from contextlib import closing
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connections
+from django.templatetags.static import static
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from config.sqlite.base import PROFILES, DatabaseWrapper
+from core import encodings, snapshots
+from core.conditional import content_conditional
+from core.query_budgets import load_budgets, load_content_fixtures, measure, named_urls, violations
+from core.response_cache import ResponseCache, cache_content_response
+
+
+class QueryBudgetTest(TransactionTestCase):
+    """Requests every named URL against the content fixtures and holds it to the query
+    budget and time ceiling declared in its app's query_budgets.py."""
+
+    databases = '__all__'
+
+    def test_every_named_url_stays_within_its_budget(self):
+        urls = named_urls()
+        modules = {namespace: load_budgets(namespace) for namespace in {namespace for _, namespace in urls}}
+        load_content_fixtures(modules)
+        client = Client()
+
+        for url_name, namespace in urls:
+            with self.subTest(url=url_name):
+                budget = getattr(modules[namespace], 'BUDGETS', {}).get(url_name.rpartition(':')[2])
+                if budget is None:
+                    self.fail(f'{url_name} has no entry in {namespace or "core"}/query_budgets.py BUDGETS')
+                response, seconds, executed = measure(client, url_name, budget)
+                problems = violations(budget, response, seconds, executed)
+                if response.has_header('ETag'):
+                    revalidated = replace(budget, status=304)
+                    response, seconds, executed = measure(
+                        client, url_name, revalidated, headers={'If-None-Match': response['ETag']},
+                    )
+                    problems += [f'revalidated: {problem}' for problem in violations(revalidated, response, seconds, executed)]
+                if problems:
+                    self.fail(f'{url_name}:\n' + '\n'.join(problems))
+
+    def test_budgets_name_existing_urls(self):
+        urls = set(url_name for url_name, _ in named_urls())
+        for namespace in {namespace for _, namespace in named_urls()}:
+            module = load_budgets(namespace)
+            for name in getattr(module, 'BUDGETS', {}):
+                full_name = f'{namespace}:{name}' if namespace else name
+                self.assertIn(full_name, urls, f'{full_name} is budgeted but no longer routed')
+
+
+class SQLiteProfileTest(SimpleTestCase):
+    """config.sqlite's profiles: `preloaded` in and over its size cap, `writable`'s journal
+    mode, and a content file that isn't there."""
+
+    def open(self, alias, profile='preloaded', max_bytes=1024 * 1024, create=True):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'content.sqlite3'
+        if create:
+            with closing(sqlite3.connect(self.path)) as source:
+                source.execute('CREATE TABLE word (text TEXT)')
+                source.execute("INSERT INTO word VALUES ('kitab')")
+                source.commit()
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'config.sqlite', 'NAME': str(self.path), 'PROFILE': profile, 'PRELOAD_MAX_BYTES': max_bytes,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_preloaded_copy_serves_queries(self):
+        wrapper = self.open('profile-test-preloaded')
+        self.assertIsNotNone(wrapper.preloaded_uri())
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT text FROM word')
+            self.assertEqual(cursor.fetchall(), [('kitab',)])
+
+    def test_over_the_cap_falls_back_to_read_only_tuning(self):
+        wrapper = self.open('profile-test-over-cap', max_bytes=0)
+        self.assertIsNone(wrapper.preloaded_uri())
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), PROFILES['read_only']['pragmas']['cache_size'])
+        self.assertEqual(self.pragma(wrapper, 'query_only'), 1)
+
+    def test_writable_connections_leave_the_journal_mode_to_set_journal_mode(self):
+        wrapper = self.open('profile-test-writable', 'writable')
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        wrapper.set_journal_mode()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+
+    def test_missing_content_file_is_not_created(self):
+        wrapper = self.open('profile-test-missing', 'read_only', create=False)
+        with self.assertLogs('config.sqlite', 'WARNING'), self.assertRaisesMessage(OperationalError, 'no such table'):
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT text FROM word')
+        self.assertFalse(self.path.exists())
+
+
+class ContentConditionalTest(SimpleTestCase):
+    """core.conditional.content_conditional's validators follow the view's own module."""
+
+    VIEW_SOURCE = (
+        'from django.http import JsonResponse\n'
+        '\n'
+        '\n'
+        'def view(request):\n'
+        "    return JsonResponse({'version': %d})\n"
+    )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.module_path = Path(directory.name) / 'content_view_module.py'
+        version = mock.patch('core.conditional.content_version', return_value=('database', 0.0))
+        version.start()
+        self.addCleanup(version.stop)
+
+    def load_view(self, version):
+        self.module_path.write_text(self.VIEW_SOURCE % version)
+        spec = importlib.util.spec_from_file_location('content_view_module', self.module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        view = module.view
+        view.__module__ = 'tprboard.views'  # For the alias; the source file stays the temp module.
+        # Stacked as on the real content views.
+        return content_conditional(cache_content_response(view))
+
+    def etag(self, view):
+        with mock.patch('core.response_cache.content_version', return_value=None):
+            return view(RequestFactory().get('/'))['ETag']
+
+    def test_editing_the_view_module_changes_the_etag(self):
+        before = self.etag(self.load_view(1))
+        after = self.etag(self.load_view(22))
+        self.assertNotEqual(before, after)
+
+    def test_etag_hashes_the_view_module_not_the_decorators(self):
+        view = self.load_view(1)
+        module_digest = hashlib.sha256(self.module_path.read_bytes()).hexdigest()
+        expected = hashlib.sha256(f'database|{module_digest}'.encode()).hexdigest()[:32]
+        self.assertEqual(self.etag(view), f'"{expected}"')
+
+
+class ResponseCacheTest(SimpleTestCase):
+    """core.response_cache.ResponseCache evicts least recently used first, within its byte cap."""
+
+    def body(self, size):
+        return {encodings.IDENTITY: b'x' * size}
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_bytes=100)
+        for key in 'abc':
+            cache.set(key, self.body(30), 'application/json')
+        self.assertIsNotNone(cache.get('a'))  # b is now the least recently used
+        cache.set('d', self.body(30), 'application/json')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([key for key in 'acd' if cache.get(key) is not None], ['a', 'c', 'd'])
+        self.assertEqual(cache.stats(), {
+            'entries': 3, 'bytes': 90, 'max_bytes': 100, 'hits': 4, 'misses': 1, 'evictions': 1,
+        })
+
+    def test_size_bound_counts_every_variant(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set('a', {encodings.IDENTITY: b'x' * 40, 'gzip': b'x' * 20}, 'application/json')
+        cache.set('b', self.body(40), 'application/json')  # 100 bytes: still fits
+        self.assertEqual(cache.stats()['evictions'], 0)
+        cache.set('c', self.body(1), 'application/json')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['bytes'], 41)
+
+        cache.set('b', self.body(10), 'application/json')  # replacing an entry frees its old bytes
+        self.assertEqual(cache.stats()['bytes'], 11)
+
+    def test_larger_than_the_whole_cache_is_not_stored(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set('a', self.body(50), 'application/json')
+        cache.set('huge', self.body(101), 'application/json')
+        self.assertIsNone(cache.get('huge'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 0)
+
+
+class EncodingNegotiationTest(SimpleTestCase):
+    """core.encodings.negotiate's reading of Accept-Encoding, q-values included."""
+
+    ALL = {encodings.IDENTITY, 'gzip', 'br'}
+    NO_BROTLI = {encodings.IDENTITY, 'gzip'}
+
+    def assertNegotiates(self, cases, available=ALL):
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(encodings.negotiate(header, available), expected)
+
+    def test_q_values(self):
+        self.assertNegotiates([
+            (None, 'identity'),
+            ('', 'identity'),
+            ('gzip, deflate, br', 'br'),
+            ('gzip, br;q=0.9', 'gzip'),
+            ('br;q=0, gzip', 'gzip'),
+            ('br;q=0', 'identity'),
+            ('br;q=nonsense, gzip', 'gzip'),
+            ('deflate', 'identity'),
+        ])
+
+    def test_wildcard(self):
+        self.assertNegotiates([
+            ('*', 'br'),
+            ('gzip;q=0.5, *;q=0.8', 'br'),
+            ('br;q=0, *', 'gzip'),
+            ('*;q=0', 'identity'),  # refused too, but still the fallback: no 406
+        ])
+
+    def test_identity_refused(self):
+        self.assertNegotiates([
+            ('identity;q=0', 'identity'),
+            ('identity;q=0, gzip', 'gzip'),
+            ('identity;q=0, *', 'br'),
+        ])
+
+    def test_case_and_whitespace(self):
+        self.assertNegotiates([
+            (' GZip ; Q=0.5 ,  BR;q=0.4 ', 'gzip'),
+            ('gzip;q= 0.2,br ;q =0.3', 'br'),
+            ('Identity;Q=0, GZIP', 'gzip'),
+            (' , ,gzip', 'gzip'),
+        ])
+
+    def test_without_brotli(self):
+        body = b'{"padding": "%s"}' % (b'x' * encodings.MIN_COMPRESS_BYTES)
+        with mock.patch('core.encodings.brotli', None):
+            available = encodings.encode(body)
+        self.assertEqual(set(available), self.NO_BROTLI)
+        self.assertNegotiates([
+            ('gzip, deflate, br', 'gzip'),
+            ('br', 'identity'),
+            ('br, gzip;q=0.1', 'gzip'),
+            ('*', 'gzip'),
+        ], available)
+
+
+class SnapshotBuildTest(SimpleTestCase):
+    """core.snapshots.build's files and manifest, and api_url's choice between them and the live view."""
+
+    ENDPOINTS = {
+        'arabicnumbers:api_numbers': lambda: [()],
+        'boringwords:api_deck': lambda: [('deu',), ('fra',)],
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.enterContext(override_settings(STATIC_ROOT=directory.name))
+        self.enterContext(mock.patch.dict(snapshots.ENDPOINTS, self.ENDPOINTS, clear=True))
+        self.enterContext(mock.patch('core.snapshots._render', side_effect=lambda live_url: self.payloads[live_url]))
+        snapshots._manifest.cache_clear()
+        self.addCleanup(snapshots._manifest.cache_clear)
+        self.numbers = reverse('arabicnumbers:api_numbers')
+        self.decks = [reverse('boringwords:api_deck', args=[code]) for code in ('deu', 'fra')]
+        self.payloads = {url: self.payload(url, 1) for url in (self.numbers, *self.decks)}
+
+    def payload(self, url, version):
+        # Long enough to be compressed (core.encodings.MIN_COMPRESS_BYTES).
+        return json.dumps({'url': url, 'version': version, 'padding': ['x'] * 400}).encode()
+
+    def test_manifest_maps_live_urls_to_content_hashed_files(self):
+        manifest, written = snapshots.build()
+        digest = hashlib.sha256(self.payloads[self.numbers]).hexdigest()[:12]
+        self.assertEqual(manifest[self.numbers], f'snapshots/arabicnumbers/api_numbers.{digest}.json')
+        self.assertRegex(manifest[self.decks[1]], r'^snapshots/boringwords/api_deck-fra\.[0-9a-f]{12}\.json$')
+        self.assertEqual(sorted(manifest), sorted([self.numbers, *self.decks]))
+        self.assertEqual(json.loads((self.root / 'snapshots' / 'manifest.json').read_text()), manifest)
+
+        for url, relative in manifest.items():
+            path = self.root / relative
+            self.assertEqual(path.read_bytes(), self.payloads[url])
+            self.assertEqual(gzip.decompress(path.with_name(path.name + '.gz').read_bytes()), self.payloads[url])
+        self.assertEqual(written, sum(path.stat().st_size for path in self.root.glob('snapshots/*/*')))
+
+    def test_unchanged_content_keeps_its_file(self):
+        first, _ = snapshots.build()
+        second, written = snapshots.build()
+        self.assertEqual((second, written), (first, 0))
+
+        self.payloads[self.numbers] = self.payload(self.numbers, 2)
+        third, written = snapshots.build()
+        self.assertNotEqual(third[self.numbers], first[self.numbers])
+        self.assertEqual({url: third[url] for url in self.decks}, {url: first[url] for url in self.decks})
+        self.assertGreater(written, 0)
+
+    def test_prunes_snapshots_older_than_the_previous_build(self):
+        builds = []
+        for version in (1, 2, 3):
+            self.payloads[self.numbers] = self.payload(self.numbers, version)
+            builds.append(snapshots.build()[0])
+        oldest, previous, current = (self.root / manifest[self.numbers] for manifest in builds)
+        self.assertEqual(list(oldest.parent.glob(oldest.name + '*')), [])
+        # Unchanged since the first build, but still referenced by the current one.
+        unchanged = self.root / builds[0][self.decks[0]]
+        for kept in (previous, current, unchanged):
+            self.assertTrue(kept.exists())
+            self.assertTrue(kept.with_name(kept.name + '.gz').exists())
+
+    def test_api_url_falls_back_to_the_live_view(self):
+        self.assertEqual(snapshots.api_url('arabicnumbers:api_numbers'), self.numbers)
+        self.assertIsNone(snapshots.snapshot_url('arabicnumbers:api_numbers'))
+
+        manifest, _ = snapshots.build()
+        self.assertEqual(snapshots.api_url('arabicnumbers:api_numbers'), static(manifest[self.numbers]))
+        self.assertEqual(snapshots.api_url('boringwords:api_deck', 'fra'), static(manifest[self.decks[1]]))
+        # An argument added since the last build.
+        self.assertEqual(
+            snapshots.api_url('boringwords:api_deck', 'ita'), reverse('boringwords:api_deck', args=['ita']),
+        )
+
+
+class ServerTimingTest(TestCase):
+    """core.metrics.ServerTimingMiddleware only shows its timings to staff, or under DEBUG."""
+
+    url = reverse('accounts:profile')  # a page whose queries all go to 'default'
+
+    def test_hidden_from_anonymous_and_non_staff_users(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+        self.client.force_login(get_user_model().objects.create_user('learner'))
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    def test_shown_to_staff(self):
+        self.client.force_login(get_user_model().objects.create_user('admin', is_staff=True))
+        timing = self.client.get(self.url)['Server-Timing']
+        self.assertRegex(timing, r'^total;dur=[\d.]+, db-default;desc="\d+ quer(y|ies)";dur=[\d.]+, app;dur=[\d.]+$')
+
+    @override_settings(DEBUG=True)
+    def test_shown_to_everyone_in_debug(self):
+        self.assertIn('Server-Timing', self.client.get(self.url))
+
+    @override_settings(DEBUG=True)
+    def test_json_serialization_is_timed_on_its_own(self):
+        self.client.force_login(get_user_model().objects.create_user('learner'))
+        timing = self.client.get(reverse('tracking:state', args=['tprboard']))['Server-Timing']
+        self.assertRegex(timing, r', serialize;dur=[\d.]+, app;dur=[\d.]+$')
+
+        self.client.force_login(get_user_model().objects.create_user('admin', is_staff=True))
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertRegex(metrics, r'linguanodon_json_serialize_seconds_total\{view="tracking:state"\} [\d.e-]+')
@@ -1,5 +1,28 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from accounts.permissions import staff_required
+from core import metrics as performance_metrics
+from core.apps_registry import INDEX_APPS
+from core.conditional import content_version
+
+
+def _grid_version():
+    """Changes whenever a card's "Languages:" line could: with any app's content version."""
+    versions = [str(content_version(app.slug)) for app in INDEX_APPS if app.slug in settings.DATABASES]
+    return hashlib.sha256('|'.join(versions).encode()).hexdigest()[:16]
+
 
 def index(request):
-    return render(request, 'index.html')
+    # The app grid is a {% cache %} fragment keyed on this (see index.html).
+    return render(request, 'index.html', {'grid_version': _grid_version()})
+
+
+@staff_required
+def metrics(request):
+    """Per-view request, query, serialization and app-time totals of every worker, for Prometheus."""
+    text = performance_metrics.prometheus_text(performance_metrics.collect())
+    return HttpResponse(text, content_type='text/plain; version=0.0.4; charset=utf-8')
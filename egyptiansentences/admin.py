@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from egyptiansentences.models import ClozeWord, Sentence
+from egyptiansentences.models import ClozeWord, Distractor, Sentence, Word
 
 
 @admin.register(Sentence)
@@ -9,8 +9,23 @@ class SentenceAdmin(admin.ModelAdmin):
     search_fields = ['arz', 'transliteration', 'translations']
 
 
+class DistractorInline(admin.TabularInline):
+    model = Distractor
+    fk_name = 'word'
+    raw_id_fields = ['distractor']
+
+
+@admin.register(Word)
+class WordAdmin(admin.ModelAdmin):
+    list_display = ['text']
+    search_fields = ['text']
+    inlines = [DistractorInline]
+
+
 @admin.register(ClozeWord)
 class ClozeWordAdmin(admin.ModelAdmin):
     list_display = ['sentence', 'word']
     list_filter = ['sentence']
-    search_fields = ['word']
+    list_select_related = ['sentence', 'word']
+    raw_id_fields = ['word']
+    search_fields = ['word__text']
@@ -0,0 +1,34 @@
+"""`manage.py bench egyptiansentences` scenarios: the sample API over read-only content."""
+from django.test import Client
+from django.urls import reverse
+
+from core.bench import Scenario
+
+
+def scenarios(params):
+    url = reverse('egyptiansentences:api_sample')
+    page = {'seed': 1, 'count': 20}
+
+    def prepare_with_etag(count):
+        clients = [Client() for _ in range(count)]
+        for client in clients:
+            client.bench_etag = client.get(url, page)['ETag']
+        return clients
+
+    return [
+        Scenario(
+            'api-sample', 'GET a 20-sentence page of a fresh seeded shuffle (a new practice session)',
+            lambda client, number: client.get(url, {'seed': number, 'count': 20}),
+        ),
+        Scenario(
+            'api-sample-gzip', 'GET a 20-sentence page of a fresh seeded shuffle, accepting gzip/br',
+            lambda client, number: client.get(
+                url, {'seed': number, 'count': 20}, HTTP_ACCEPT_ENCODING='gzip, deflate, br',
+            ),
+        ),
+        Scenario(
+            'api-sample-not-modified', 'Revalidate a page with a matching If-None-Match',
+            lambda client, number: client.get(url, page, HTTP_IF_NONE_MATCH=client.bench_etag),
+            prepare_with_etag,
+        ),
+    ]
@@ -0,0 +1,212 @@
+"""Nearest-word search behind import_egyptiansentences_data's distractors.
+
+A distractor candidate list is the `n` words closest to the cloze word by
+Levenshtein distance, ties in word-list order - `find_closest_words`, the
+brute-force definition, kept as the reference the fast path is checked
+against (`manage.py bench_distractors --check`).
+
+`WordIndex` gives the same answer without scoring every word. The list is
+indexed once by padded bigram; a query counts the bigrams each word shares
+with the target, which with the length difference bounds the word's
+distance from below, and scores words in order of that bound until it
+passes the n-th best distance found so far - usually a few hundred words
+out of tens of thousands. Scoring uses Hyyrö's bit-parallel form of Myers'
+algorithm on Python ints: a few integer operations per character instead
+of a (len+1)x(len+1) matrix. `closest_words_many` fans the targets out
+over a process pool, each worker building its own index.
+"""
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+
+def levenshtein(a, b):
+    """Edit distance via the full DP matrix - the reference implementation."""
+    if len(a) == 0:
+        return len(b)
+    if len(b) == 0:
+        return len(a)
+
+    matrix = [[0] * (len(a) + 1) for _ in range(len(b) + 1)]
+    for i in range(len(b) + 1):
+        matrix[i][0] = i
+    for j in range(len(a) + 1):
+        matrix[0][j] = j
+
+    for i in range(1, len(b) + 1):
+        for j in range(1, len(a) + 1):
+            if b[i - 1] == a[j - 1]:
+                matrix[i][j] = matrix[i - 1][j - 1]
+            else:
+                matrix[i][j] = min(
+                    matrix[i - 1][j - 1] + 1,
+                    matrix[i][j - 1] + 1,
+                    matrix[i - 1][j] + 1,
+                )
+    return matrix[len(b)][len(a)]
+
+
+def find_closest_words(target, words, n):
+    """The `n` words (other than `target`) closest to `target`, ties in `words` order."""
+    scored = sorted(
+        ((word, levenshtein(target, word)) for word in words if word != target),
+        key=lambda item: item[1],
+    )
+    return [word for word, _ in scored[:n]]
+
+
+class _Pattern:
+    """`word` prepared for bit-parallel distance to any other word."""
+
+    __slots__ = ('length', 'peq', 'mask', 'last')
+
+    def __init__(self, word):
+        self.length = len(word)
+        self.peq = {}
+        for position, char in enumerate(word):
+            self.peq[char] = self.peq.get(char, 0) | (1 << position)
+        self.mask = (1 << self.length) - 1
+        self.last = 1 << (self.length - 1) if word else 0
+
+    def distance(self, other):
+        if not self.length:
+            return len(other)
+        peq, mask, last = self.peq, self.mask, self.last
+        pv, mv, score = mask, 0, self.length
+        for char in other:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = (ph << 1) | 1
+            pv = ((mh << 1) | ~(xv | ph)) & mask
+            mv = ph & xv
+        return score
+
+
+def _bigrams(word):
+    """Multiset of `word`'s bigrams, padded so that every character starts and ends one."""
+    padded = f'\x02{word}\x03'
+    grams = {}
+    for position in range(len(padded) - 1):
+        gram = padded[position:position + 2]
+        grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+
+class WordIndex:
+    """A word list indexed for `find_closest_words` queries (see the module docstring)."""
+
+    def __init__(self, words):
+        # Distinct words; a duplicate is still a separate candidate, at each of its positions.
+        self.words = []
+        self.positions = []
+        ids = {}
+        for position, word in enumerate(words):
+            word_id = ids.get(word)
+            if word_id is None:
+                word_id = ids[word] = len(self.words)
+                self.words.append(word)
+                self.positions.append([])
+            self.positions[word_id].append(position)
+
+        # bigram -> [(word id, occurrences in that word)]
+        self.postings = {}
+        # length -> [word id]
+        self.by_length = {}
+        for word_id, word in enumerate(self.words):
+            for gram, count in _bigrams(word).items():
+                self.postings.setdefault(gram, []).append((word_id, count))
+            self.by_length.setdefault(len(word), []).append(word_id)
+
+    def _bounds(self, target):
+        """`(level -> [word id], level -> [length])`: lower bounds on each word's distance to `target`.
+
+        An edit changes at most two padded bigrams, so words within distance
+        k share at least max(len) + 1 - 2k of them; nor can a distance be
+        below the length difference. Words sharing no bigram with `target`
+        are only listed by length, as they are rarely reached.
+        """
+        length = len(target)
+        shared = {}
+        for gram, count in _bigrams(target).items():
+            for word_id, other in self.postings.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + (count if count < other else other)
+
+        levels = {}
+        words = self.words
+        for word_id, common in shared.items():
+            other = len(words[word_id])
+            level = max(abs(length - other), (max(length, other) + 2 - common) // 2)
+            levels.setdefault(level, []).append(word_id)
+
+        unshared = {}
+        for other in self.by_length:
+            level = max(abs(length - other), (max(length, other) + 2) // 2)
+            unshared.setdefault(level, []).append(other)
+        return levels, unshared, shared
+
+    def closest(self, target, n):
+        """Same result as `find_closest_words(target, words, n)`.
+
+        Words are scored in order of their lower bound, which stops as soon
+        as the bound passes the n-th best distance found so far.
+        """
+        if n <= 0 or not self.words:
+            return []
+        levels, unshared, shared = self._bounds(target)
+        pattern = _Pattern(target)
+        # Max-heap of the best n so far as (-distance, -position, word): best[0] is the one to beat.
+        best = []
+        radius = float('inf')
+        last_level = max(max(levels, default=0), max(unshared, default=0))
+        for level in range(last_level + 1):
+            # Ties count (an earlier position wins), so a bound equal to the radius is still scored.
+            if level > radius:
+                break
+            candidates = levels.get(level, [])
+            for other in unshared.get(level, ()):
+                candidates = candidates + [word_id for word_id in self.by_length[other] if word_id not in shared]
+            for word_id in candidates:
+                word = self.words[word_id]
+                if word == target:
+                    continue
+                distance = pattern.distance(word)
+                if distance > radius:
+                    continue
+                for position in self.positions[word_id]:
+                    candidate = (-distance, -position, word)
+                    if len(best) < n:
+                        heapq.heappush(best, candidate)
+                    elif candidate > best[0]:
+                        heapq.heapreplace(best, candidate)
+                if len(best) == n:
+                    radius = -best[0][0]
+        return [word for _, _, word in sorted(best, reverse=True)]
+
+
+_worker_index = None
+
+
+def _init_worker(words):
+    global _worker_index
+    _worker_index = WordIndex(words)
+
+
+def _closest_in_worker(target, n):
+    return target, _worker_index.closest(target, n)
+
+
+def closest_words_many(targets, words, n, workers=1):
+    """`{target: find_closest_words(target, words, n)}` for every target, over `workers` processes."""
+    targets = list(dict.fromkeys(targets))
+    if workers <= 1 or len(targets) < 2:
+        index = WordIndex(words)
+        return {target: index.closest(target, n) for target in targets}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(words,)) as pool:
+        chunksize = max(1, len(targets) // (workers * 8))
+        return dict(pool.map(_closest_in_worker, targets, [n] * len(targets), chunksize=chunksize))
@@ -0,0 +1,97 @@
+import os
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from egyptiansentences.distractors import WordIndex, closest_words_many, find_closest_words
+from egyptiansentences.management.commands.import_egyptiansentences_data import CANDIDATE_POOL_SIZE
+from egyptiansentences.models import Word
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the nearest-word search behind import_egyptiansentences_data '
+        '(egyptiansentences.distractors) on a word list, optionally padded '
+        'with random near-variants to simulate a larger one (--scale), and '
+        'with --check compare its answers and speed against the brute-force '
+        'reference on a sample of the targets.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--words',
+            help='A lisaanmasry_words.txt. Defaults to every word in the egyptiansentences database '
+                 '(cloze words and their distractors).',
+        )
+        parser.add_argument('--scale', type=int, default=1, help='Grow the word list to this many times its size.')
+        parser.add_argument('--targets', type=int, default=500, help='Words to find neighbours for.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes to search with.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the padding and the target sample.')
+        parser.add_argument(
+            '--check', type=int, nargs='?', const=20, default=0, metavar='N',
+            help='Also run the brute-force reference on N targets (default 20) and compare.',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = self._base_words(options['words'])
+        if not words:
+            raise CommandError('No words to benchmark with.')
+        base_count = len(words)
+        words = self._scaled(words, options['scale'], rng)
+        targets = rng.sample(words, min(options['targets'], len(words)))
+
+        started = time.perf_counter()
+        WordIndex(words)
+        index_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        closest = closest_words_many(targets, words, CANDIDATE_POOL_SIZE, workers=options['workers'])
+        search_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f'{len(words)} words ({base_count} x{options["scale"]}), {len(closest)} targets, '
+            f'{options["workers"]} worker(s): index {index_seconds * 1000:.0f} ms, '
+            f'search {search_seconds:.2f} s ({search_seconds / len(closest) * 1000:.2f} ms/target)'
+        )
+
+        if options['check']:
+            sample = list(closest)[:options['check']]
+            started = time.perf_counter()
+            mismatches = [
+                target for target in sample
+                if find_closest_words(target, words, CANDIDATE_POOL_SIZE) != closest[target]
+            ]
+            reference_seconds = time.perf_counter() - started
+            self.stdout.write(
+                f'reference: {reference_seconds / len(sample) * 1000:.2f} ms/target on {len(sample)} targets'
+            )
+            if mismatches:
+                raise CommandError(f'Results differ from the reference for: {", ".join(mismatches)}')
+            self.stdout.write(self.style.SUCCESS('Identical to the reference.'))
+
+    def _base_words(self, path):
+        if path:
+            return [
+                word for word in (line.strip() for line in Path(path).read_text(encoding='utf-8').splitlines())
+                if word and not word.startswith('ـ')
+            ]
+        return list(Word.objects.order_by('id').values_list('text', flat=True))
+
+    def _scaled(self, words, scale, rng):
+        """`words`, then random one-to-three-edit variants of them until `scale` times as many."""
+        alphabet = sorted(set(''.join(words)))
+        scaled = list(words)
+        while len(scaled) < len(words) * scale:
+            chars = list(rng.choice(words))
+            for _ in range(rng.randint(1, 3)):
+                position = rng.randrange(len(chars) + 1)
+                edit = rng.randrange(3)
+                if edit == 0:
+                    chars.insert(position, rng.choice(alphabet))
+                elif position < len(chars) and (edit == 1 or len(chars) == 1):
+                    chars[position] = rng.choice(alphabet)
+                elif position < len(chars):
+                    del chars[position]
+            scaled.append(''.join(chars))
+        return scaled
@@ -1,4 +1,5 @@
 import json
+import os
 import random
 import re
 import unicodedata
@@ -6,7 +7,8 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
 
-from egyptiansentences.models import ClozeWord, Sentence
+from egyptiansentences.distractors import closest_words_many
+from egyptiansentences.models import ClozeWord, Distractor, Sentence, Word
 
 DISTRACTOR_COUNT = 5
 CANDIDATE_POOL_SIZE = 10
@@ -25,39 +27,6 @@ def normalize_for_compare(value):
     return value.strip()
 
 
-def levenshtein(a, b):
-    if len(a) == 0:
-        return len(b)
-    if len(b) == 0:
-        return len(a)
-
-    matrix = [[0] * (len(a) + 1) for _ in range(len(b) + 1)]
-    for i in range(len(b) + 1):
-        matrix[i][0] = i
-    for j in range(len(a) + 1):
-        matrix[0][j] = j
-
-    for i in range(1, len(b) + 1):
-        for j in range(1, len(a) + 1):
-            if b[i - 1] == a[j - 1]:
-                matrix[i][j] = matrix[i - 1][j - 1]
-            else:
-                matrix[i][j] = min(
-                    matrix[i - 1][j - 1] + 1,
-                    matrix[i][j - 1] + 1,
-                    matrix[i - 1][j] + 1,
-                )
-    return matrix[len(b)][len(a)]
-
-
-def find_closest_words(target, words, n):
-    scored = sorted(
-        ((word, levenshtein(target, word)) for word in words if word != target),
-        key=lambda item: item[1],
-    )
-    return [word for word, _ in scored[:n]]
-
-
 class Command(BaseCommand):
     help = (
         'One-time/rerunnable dev tool: imports egyptiansentences content '
@@ -65,9 +34,9 @@ class Command(BaseCommand):
         'precomputed wrong-answer distractors) from a local '
         'basic-egyptian-sentences checkout into the egyptiansentences '
         'database. Never run in production - the resulting '
-        'egyptiansentences.sqlite3 is committed to git directly. Takes '
-        'roughly a minute to run, since it computes Levenshtein distance '
-        'for every distinct cloze-able word against the full word list.'
+        'egyptiansentences.sqlite3 is committed to git directly. The '
+        'nearest words for every distinct cloze-able word are found up '
+        'front over --workers processes (see egyptiansentences.distractors).'
     )
 
     def add_arguments(self, parser):
@@ -79,6 +48,14 @@ class Command(BaseCommand):
             '--flush', action='store_true',
             help='Delete existing Sentence/ClozeWord rows first.',
         )
+        parser.add_argument(
+            '--seed', type=int,
+            help='Seed for the random top-up of short distractor lists, for a reproducible import.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes computing nearest words (default: one per CPU).',
+        )
 
     def handle(self, *args, **options):
         source = Path(options['source']).resolve()
@@ -95,11 +72,18 @@ class Command(BaseCommand):
         if options['flush']:
             ClozeWord.objects.all().delete()
             Sentence.objects.all().delete()
+            Distractor.objects.all().delete()
+            Word.objects.all().delete()
             self.stdout.write('Flushed existing egyptiansentences content rows.')
 
         words = self._load_words(words_path)
         word_set = set(words)
-        sentence_count, cloze_word_count = self._import_sentences(sentences_path, words, word_set)
+        records = self._load_records(sentences_path, word_set)
+        targets = [word for _, usable_words in records for word in usable_words]
+        closest = closest_words_many(targets, words, CANDIDATE_POOL_SIZE, workers=options['workers'])
+        self.rng = random.Random(options['seed'])
+        self.word_ids = dict(Word.objects.values_list('text', 'id'))
+        sentence_count, cloze_word_count = self._import_sentences(records, words, closest)
 
         self.stdout.write(self.style.SUCCESS(
             f'Imported {sentence_count} sentences, {cloze_word_count} cloze words.'
@@ -113,41 +97,63 @@ class Command(BaseCommand):
             if word and not word.startswith('ـ')
         ]
 
-    def _distractors_for(self, target, words, distractor_cache):
+    def _load_records(self, sentences_path, word_set):
+        """`(record, distinct words of it that are in the word list)` for each sentence with any."""
+        records = []
+        for line in sentences_path.read_text(encoding='utf-8').splitlines():
+            line = line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            usable_words = list(dict.fromkeys(
+                word for word in record['arz'].split() if word in word_set
+            ))
+            if usable_words:
+                records.append((record, usable_words))
+        return records
+
+    def _distractors_for(self, target, words, closest, distractor_cache):
         if target in distractor_cache:
             return distractor_cache[target]
 
         base = normalize_for_compare(target)
-        closest = find_closest_words(target, words, CANDIDATE_POOL_SIZE)
-        filtered = [word for word in closest if normalize_for_compare(word) != base]
+        filtered = [word for word in closest[target] if normalize_for_compare(word) != base]
         pool = filtered if filtered else [word for word in words if normalize_for_compare(word) != base]
 
         distractors = pool[:DISTRACTOR_COUNT]
         if len(distractors) < DISTRACTOR_COUNT and pool:
             extra_pool = [word for word in pool if word not in distractors]
-            random.shuffle(extra_pool)
+            self.rng.shuffle(extra_pool)
             distractors += extra_pool[:DISTRACTOR_COUNT - len(distractors)]
 
         distractor_cache[target] = distractors
         return distractors
 
-    def _import_sentences(self, sentences_path, words, word_set):
+    def _word_id(self, text):
+        word_id = self.word_ids.get(text)
+        if word_id is None:
+            word_id = self.word_ids[text] = Word.objects.create(text=text).id
+        return word_id
+
+    def _cloze_word_id(self, target, words, closest, distractor_cache):
+        """`target`'s Word id, with its Distractor rows (re)written the first time it is seen."""
+        if target in distractor_cache:
+            return self.word_ids[target]
+        word_id = self._word_id(target)
+        Distractor.objects.filter(word_id=word_id).delete()
+        Distractor.objects.bulk_create(
+            Distractor(word_id=word_id, distractor_id=self._word_id(distractor), position=position)
+            for position, distractor in enumerate(self._distractors_for(target, words, closest, distractor_cache))
+        )
+        return word_id
+
+    def _import_sentences(self, records, words, closest):
         distractor_cache = {}
         sentence_count = 0
         cloze_word_count = 0
 
-        for line in sentences_path.read_text(encoding='utf-8').splitlines():
-            line = line.strip()
-            if not line:
-                continue
-
-            record = json.loads(line)
-            usable_words = list(dict.fromkeys(
-                word for word in record['arz'].split() if word in word_set
-            ))
-            if not usable_words:
-                continue
-
+        for record, usable_words in records:
             sentence = Sentence.objects.create(
                 arz=record['arz'],
                 transliteration=record['transliteration'],
@@ -158,8 +164,7 @@ class Command(BaseCommand):
             ClozeWord.objects.bulk_create(
                 ClozeWord(
                     sentence=sentence,
-                    word=word,
-                    distractors=self._distractors_for(word, words, distractor_cache),
+                    word_id=self._cloze_word_id(word, words, closest, distractor_cache),
                 )
                 for word in usable_words
             )
@@ -0,0 +1,117 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def intern_words(apps, schema_editor):
+    """One Word per distinct cloze word or distractor, and each cloze word's list as Distractor rows."""
+    alias = schema_editor.connection.alias
+    ClozeWord = apps.get_model('egyptiansentences', 'ClozeWord')
+    Word = apps.get_model('egyptiansentences', 'Word')
+    Distractor = apps.get_model('egyptiansentences', 'Distractor')
+
+    cloze_words = list(ClozeWord.objects.using(alias).order_by('id'))
+    # The importer computes a word's distractors once, so every row of a word carries the same list.
+    lists = {}
+    for cloze_word in cloze_words:
+        lists.setdefault(cloze_word.word, cloze_word.distractors)
+    texts = {}
+    for text, distractors in lists.items():
+        texts[text] = None
+        texts.update(dict.fromkeys(distractors))
+    Word.objects.using(alias).bulk_create(Word(text=text) for text in texts)
+    ids = dict(Word.objects.using(alias).values_list('text', 'id'))
+
+    Distractor.objects.using(alias).bulk_create(
+        Distractor(word_id=ids[text], distractor_id=ids[distractor], position=position)
+        for text, distractors in lists.items()
+        for position, distractor in enumerate(distractors)
+    )
+    for cloze_word in cloze_words:
+        cloze_word.entry_id = ids[cloze_word.word]
+    ClozeWord.objects.using(alias).bulk_update(cloze_words, ['entry'], batch_size=500)
+
+
+def restore_cloze_words(apps, schema_editor):
+    """Each ClozeWord's text and a copy of its word's distractor list back on the row."""
+    alias = schema_editor.connection.alias
+    ClozeWord = apps.get_model('egyptiansentences', 'ClozeWord')
+    Word = apps.get_model('egyptiansentences', 'Word')
+    Distractor = apps.get_model('egyptiansentences', 'Distractor')
+
+    texts = dict(Word.objects.using(alias).values_list('id', 'text'))
+    lists = {}
+    for word_id, distractor_id in (
+        Distractor.objects.using(alias).order_by('word_id', 'position').values_list('word_id', 'distractor_id')
+    ):
+        lists.setdefault(word_id, []).append(texts[distractor_id])
+    cloze_words = list(ClozeWord.objects.using(alias).order_by('id'))
+    for cloze_word in cloze_words:
+        cloze_word.word = texts[cloze_word.entry_id]
+        cloze_word.distractors = lists.get(cloze_word.entry_id, [])
+    ClozeWord.objects.using(alias).bulk_update(cloze_words, ['word', 'distractors'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('egyptiansentences', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Word',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Distractor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('distractor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='egyptiansentences.word')),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='distractors', to='egyptiansentences.word')),
+            ],
+            options={
+                'ordering': ['word_id', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('word', 'position'), name='egyptiansentences_distractor_position')],
+            },
+        ),
+        migrations.AddField(
+            model_name='clozeword',
+            name='entry',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='egyptiansentences.word'),
+        ),
+        # Nullable for the reverse only: re-adding these columns to existing rows needs a
+        # value until restore_cloze_words has filled them in.
+        migrations.AlterField(
+            model_name='clozeword',
+            name='word',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='clozeword',
+            name='distractors',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(intern_words, restore_cloze_words),
+        migrations.RemoveField(
+            model_name='clozeword',
+            name='distractors',
+        ),
+        migrations.RemoveField(
+            model_name='clozeword',
+            name='word',
+        ),
+        migrations.RenameField(
+            model_name='clozeword',
+            old_name='entry',
+            new_name='word',
+        ),
+        migrations.AlterField(
+            model_name='clozeword',
+            name='word',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cloze_words', to='egyptiansentences.word'),
+        ),
+    ]
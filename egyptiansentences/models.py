@@ -10,13 +10,38 @@ class Sentence(models.Model):
         return self.arz
 
 
+class Word(models.Model):
+    """A word, stored once however many sentences it appears in or is offered as a distractor for."""
+
+    text = models.CharField(max_length=64, unique=True)
+
+    def __str__(self):
+        return self.text
+
+
+class Distractor(models.Model):
+    """`distractor` is the `position`-th wrong answer offered for `word` (see egyptiansentences.distractors)."""
+
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='distractors')
+    distractor = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='+')
+    position = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['word_id', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['word', 'position'], name='egyptiansentences_distractor_position'),
+        ]
+
+    def __str__(self):
+        return f'{self.word} -> {self.distractor}'
+
+
 class ClozeWord(models.Model):
     sentence = models.ForeignKey(Sentence, on_delete=models.CASCADE, related_name='cloze_words')
-    word = models.CharField(max_length=64)
-    distractors = models.JSONField()
+    word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='cloze_words')
 
     class Meta:
         ordering = ['sentence_id', 'id']
 
     def __str__(self):
-        return self.word
+        return self.word.text
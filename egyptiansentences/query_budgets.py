@@ -0,0 +1,9 @@
+"""Query budgets for egyptiansentences' views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({}),
+    'practice': Budget({}),
+    # Cold: the quizzable id list, the page's sentences and cloze words, then their dictionary.
+    'api_sample': Budget({'egyptiansentences': 5}, query={'seed': 1, 'count': 20}),
+}
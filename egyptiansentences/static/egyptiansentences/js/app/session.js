@@ -6,7 +6,9 @@
 // calling findClosestWords() (Levenshtein) against the full word list live
 // in the browser, this picks randomly among the up-to-5 distractors
 // precomputed at import time and stored on each ClozeWord (see
-// import_egyptiansentences_data.py).
+// import_egyptiansentences_data.py). Sentences arrive in seeded pages from
+// the sample API rather than as the whole corpus up front: the next page is
+// fetched while the current one still has PREFETCH_WHEN_LEFT sentences left.
 
 import { queueEvent } from "/static/tracking/js/client.js";
 import { showToast } from "./toast.js";
@@ -15,6 +17,9 @@ import { showToast } from "./toast.js";
 /** @typedef {import('../types.js').ClozeWord} ClozeWord */
 /** @typedef {import('../types.js').Highscore} Highscore */
 /** @typedef {import('../types.js').PracticeConfig} PracticeConfig */
+/** @typedef {import('../types.js').SentenceSample} SentenceSample */
+/** @typedef {import('../types.js').SentenceRow} SentenceRow */
+/** @typedef {import('../types.js').WordDictionary} WordDictionary */
 /** @typedef {"undetermined" | "go" | "game-ended"} GameMode */
 
 const { ref, computed, onMounted, onUnmounted } = window.Vue;
@@ -23,6 +28,8 @@ const INITIAL_TIME_SECONDS = 60;
 const ADVANCE_DELAY_MS = 5000;
 const HIGHSCORES_STORAGE_KEY = "egyptiansentences-highscores";
 const MAX_STORED_HIGHSCORES = 10;
+const SAMPLE_SIZE = 20;
+const PREFETCH_WHEN_LEFT = 5;
 
 const MASKED_WORD_HTML =
   '<span class="inline-block bg-base-200/70 border border-base-300/60 rounded px-2 mx-1 min-w-[3rem]">&nbsp;&nbsp;&nbsp;</span>';
@@ -32,6 +39,26 @@ function randomIndex(length) {
   return Math.floor(Math.random() * length);
 }
 
+function newSeed() {
+  return Math.floor(Math.random() * 2 ** 31);
+}
+
+/**
+ * A sentence row with its cloze word ids spelled out from the response's word dictionary.
+ * @param {SentenceRow} row
+ * @param {WordDictionary} dictionary
+ * @returns {Sentence}
+ */
+function resolveSentence(row, { words, distractors }) {
+  return {
+    ...row,
+    cloze_words: row.cloze_words.map((wordId) => ({
+      word: words[wordId],
+      distractors: (distractors[wordId] ?? []).map((distractorId) => words[distractorId]),
+    })),
+  };
+}
+
 /** @returns {Highscore[]} */
 function loadHighscores() {
   const raw = window.localStorage.getItem(HIGHSCORES_STORAGE_KEY);
@@ -45,6 +72,12 @@ export function createGameSession(config) {
 
   /** @type {import('../types.js').VueRef<Sentence[]>} */
   const sentences = ref([]);
+  /** Fetched sentences not dealt yet, in the server's seeded order. @type {Sentence[]} */
+  const upcoming = [];
+  let seed = newSeed();
+  let cursor = 0;
+  /** @type {Promise<void> | null} */
+  let fetching = null;
 
   /** @type {import('../types.js').VueRef<GameMode>} */
   const gameMode = ref("undetermined");
@@ -127,11 +160,41 @@ export function createGameSession(config) {
     }, 1000);
   }
 
+  async function fetchPage() {
+    const params = new URLSearchParams({ seed: String(seed), count: String(SAMPLE_SIZE), cursor: String(cursor) });
+    const response = await fetch(`${config.apiSampleUrl}?${params}`);
+    if (!response.ok) throw new Error(`Failed to load sentences (${response.status})`);
+    /** @type {SentenceSample} */
+    const data = await response.json();
+    if (data.next === null) {
+      seed = newSeed();
+      cursor = 0;
+    } else {
+      cursor = data.next;
+    }
+    const usable = data.sentences
+      .filter((row) => row.cloze_words.length > 0)
+      .map((row) => resolveSentence(row, data));
+    upcoming.push(...usable);
+    sentences.value = [...sentences.value, ...usable];
+  }
+
+  function prefetch() {
+    if (fetching || upcoming.length > PREFETCH_WHEN_LEFT) return;
+    fetching = fetchPage()
+      .catch(() => {})
+      .finally(() => {
+        fetching = null;
+      });
+  }
+
   function generateExercise() {
     if (sentences.value.length === 0) return;
 
-    const sentence = sentences.value[randomIndex(sentences.value.length)];
+    // Should the next page be late, repeat one already seen rather than stall the timer.
+    const sentence = upcoming.shift() ?? sentences.value[randomIndex(sentences.value.length)];
     currentSentence.value = sentence;
+    prefetch();
 
     const clozeWord = sentence.cloze_words[randomIndex(sentence.cloze_words.length)];
     currentClozeWord.value = clozeWord;
@@ -249,11 +312,7 @@ export function createGameSession(config) {
 
   async function load() {
     try {
-      const response = await fetch(config.apiSentencesUrl);
-      if (!response.ok) throw new Error(`Failed to load sentences (${response.status})`);
-      /** @type {Sentence[]} */
-      const data = await response.json();
-      sentences.value = data.filter((sentence) => sentence.cloze_words.length > 0);
+      await fetchPage();
       if (sentences.value.length === 0) {
         loadError.value = "No sentences available.";
       }
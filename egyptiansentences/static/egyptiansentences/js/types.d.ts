@@ -11,8 +11,29 @@ export interface Sentence {
   cloze_words: ClozeWord[];
 }
 
+// As the API sends them: cloze words by id, spelled out once in `words`.
+export interface SentenceRow {
+  id: number;
+  arz: string;
+  transliteration: string;
+  translations: string[];
+  cloze_words: number[];
+}
+
+export interface WordDictionary {
+  words: Record<string, string>;
+  distractors: Record<string, number[]>;
+}
+
+export interface SentenceSample extends WordDictionary {
+  seed: number;
+  total: number;
+  next: number | null;
+  sentences: SentenceRow[];
+}
+
 export interface PracticeConfig {
-  apiSentencesUrl: string;
+  apiSampleUrl: string;
 }
 
 export interface Highscore {
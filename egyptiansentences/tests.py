@@ -0,0 +1,247 @@
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from core.conditional import invalidate
+from egyptiansentences.distractors import WordIndex, closest_words_many, find_closest_words
+from egyptiansentences.models import ClozeWord, Distractor, Sentence, Word
+from egyptiansentences.views import MAX_SAMPLE_SIZE
+
+WORDS = ['kitab', 'kutub', 'katab', 'maktab', 'maktaba', 'bab', 'beit', 'bint', 'walad', 'wlad', 'kalb', 'qalb']
+
+SENTENCES = [
+    {'arz': 'walad kitab', 'transliteration': 'walad kitaab', 'translations': ['a boy, a book']},
+    {'arz': 'bint fi beit', 'transliteration': 'bint fi beet', 'translations': ['a girl in a house']},
+    {'arz': 'kalb maktab bab', 'transliteration': 'kalb maktab baab', 'translations': ['dog, office, door']},
+]
+
+
+class WordIndexTest(SimpleTestCase):
+    """WordIndex.closest answers exactly as the brute-force find_closest_words, ties included."""
+
+    def assertMatchesReference(self, words, targets, sizes=(1, 3, 10)):
+        index = WordIndex(words)
+        for target in targets:
+            for n in sizes:
+                with self.subTest(target=target, n=n):
+                    self.assertEqual(index.closest(target, n), find_closest_words(target, words, n))
+
+    def test_random_word_lists(self):
+        rng = random.Random(22)
+        for _ in range(20):
+            words = [
+                ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 7)))
+                for _ in range(rng.randint(0, 40))
+            ]
+            targets = [*rng.sample(words, min(5, len(words))), 'abcabc', 'dd', '']
+            self.assertMatchesReference(words, targets)
+
+    def test_empty_strings(self):
+        self.assertMatchesReference(['', 'a', 'ab', ''], ['', 'a', 'abc'])
+
+    def test_length_one_words(self):
+        self.assertMatchesReference(['a', 'b', 'c', 'ab', 'a'], ['a', 'z', 'ba'])
+
+    def test_ties_keep_word_list_order(self):
+        words = ['ab', 'ba', 'aa', 'bb', 'ab', 'cb']
+        self.assertMatchesReference(words, ['ab', 'bb', 'ca'])
+        self.assertEqual(WordIndex(words).closest('ab', 3), ['aa', 'bb', 'cb'])
+
+    def test_words_sharing_no_bigram_with_the_target(self):
+        self.assertMatchesReference(['xyz', 'qqq', 'w', 'vvvvvv'], ['ab', 'abcdef'])
+
+    def test_more_requested_than_there_are_words(self):
+        self.assertMatchesReference(['kitab', 'kutub'], ['kitab'], sizes=(0, 5))
+
+    def test_process_pool_gives_the_same_answers(self):
+        expected = {target: find_closest_words(target, WORDS, 4) for target in WORDS}
+        self.assertEqual(closest_words_many(WORDS, WORDS, 4, workers=2), expected)
+
+
+class ImportDistractorsTest(TestCase):
+    """import_egyptiansentences_data's stored distractors, for a fixed word list and seed."""
+
+    databases = {'default', 'egyptiansentences'}
+
+    # Regenerate only on purpose: a change here changes every deployed quiz.
+    EXPECTED = {
+        'bab': ['kalb', 'qalb', 'kitab', 'katab', 'beit'],
+        'beit': ['bint', 'bab', 'kitab', 'wlad', 'kalb'],
+        'bint': ['beit', 'bab', 'kitab', 'wlad', 'kalb'],
+        'kalb': ['qalb', 'katab', 'bab', 'kitab', 'kutub'],
+        'kitab': ['katab', 'kutub', 'maktab', 'bab', 'kalb'],
+        'maktab': ['maktaba', 'katab', 'kitab', 'kutub', 'bab'],
+        'walad': ['wlad', 'katab', 'kalb', 'qalb', 'kitab'],
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source = Path(directory.name)
+        (self.source / 'public').mkdir()
+        (self.source / 'public' / 'lisaanmasry_words.txt').write_text('\n'.join(WORDS), encoding='utf-8')
+        (self.source / 'public' / 'lisaanmasry_sentences.jsonl').write_text(
+            '\n'.join(json.dumps(record) for record in SENTENCES), encoding='utf-8',
+        )
+
+    def run_import(self, workers=1):
+        call_command(
+            'import_egyptiansentences_data', source=str(self.source), seed=3, workers=workers, flush=True,
+            stdout=io.StringIO(),
+        )
+        stored = {}
+        for word, distractor in Distractor.objects.values_list('word__text', 'distractor__text'):
+            stored.setdefault(word, []).append(distractor)
+        return stored
+
+    def test_stored_distractors_are_the_brute_force_nearest_words(self):
+        stored = self.run_import()
+        for word, distractors in stored.items():
+            self.assertEqual(distractors, find_closest_words(word, WORDS, 5))
+
+    def test_stored_distractors_do_not_change(self):
+        self.assertEqual(self.run_import(), self.EXPECTED)
+        self.assertEqual(self.run_import(workers=2), self.EXPECTED)
+
+
+class SampleApiTest(TestCase):
+    """api_sample deals every quizzable sentence once per seed, a page at a time."""
+
+    databases = {'default', 'egyptiansentences'}
+    url = reverse('egyptiansentences:api_sample')
+
+    @classmethod
+    def setUpTestData(cls):
+        words = Word.objects.bulk_create(Word(text=text) for text in WORDS)
+        sentences = Sentence.objects.bulk_create(
+            Sentence(arz=f'sentence {i}', transliteration=f'sentence {i}', translations=[str(i)]) for i in range(7)
+        )
+        # The last two have no cloze word, so no round can use them.
+        ClozeWord.objects.bulk_create(
+            ClozeWord(sentence=sentence, word=words[i]) for i, sentence in enumerate(sentences[:5])
+        )
+        cls.quizzable = sorted(sentence.id for sentence in sentences[:5])
+        # Created out of order: responses list them by position.
+        Distractor.objects.bulk_create([
+            Distractor(word=words[0], distractor=words[6], position=1),
+            Distractor(word=words[0], distractor=words[5], position=0),
+        ])
+        cls.words = words
+
+    def setUp(self):
+        # The id list is kept per content version, which the in-memory test database doesn't change.
+        invalidate('egyptiansentences')
+
+    def deal(self, seed, count):
+        """Every page for `seed`, following `next` from cursor 0."""
+        pages, cursor = [], 0
+        while cursor is not None:
+            data = self.client.get(self.url, {'seed': seed, 'count': count, 'cursor': cursor}).json()
+            pages.append([sentence['id'] for sentence in data['sentences']])
+            cursor = data['next']
+        return pages
+
+    def test_same_seed_gives_the_same_order(self):
+        dealt = [i for page in self.deal(7, 2) for i in page]
+        self.assertEqual(sorted(dealt), self.quizzable)
+        self.assertEqual([i for page in self.deal(7, 2) for i in page], dealt)
+        self.assertEqual([i for page in self.deal(7, 5) for i in page], dealt)
+        orders = {tuple(i for page in self.deal(seed, 5) for i in page) for seed in range(5)}
+        self.assertGreater(len(orders), 1)
+
+    def test_paging_boundaries(self):
+        self.assertEqual([len(page) for page in self.deal(1, 2)], [2, 2, 1])
+        self.assertEqual([len(page) for page in self.deal(1, 5)], [5])
+        self.assertEqual([len(page) for page in self.deal(1, MAX_SAMPLE_SIZE)], [5])
+        for cursor in (5, 6, 100):
+            with self.subTest(cursor=cursor):
+                data = self.client.get(self.url, {'seed': 1, 'cursor': cursor}).json()
+                self.assertEqual((data['sentences'], data['next'], data['total']), ([], None, 5))
+
+    def test_bad_parameters_are_400_without_validators(self):
+        etag = self.client.get(self.url, {'seed': 1})['ETag']
+        for query in (
+            {}, {'seed': 'x'}, {'seed': 1, 'count': 0}, {'seed': 1, 'count': MAX_SAMPLE_SIZE + 1},
+            {'seed': 1, 'count': '2.5'}, {'seed': 1, 'cursor': -1}, {'seed': 1, 'cursor': 'next'},
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(self.url, query, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_payload_shape(self):
+        # What the practice page's resolveSentence expands: cloze words and distractors as ids,
+        # spelled out once in `words`.
+        data = self.client.get(self.url, {'seed': 1, 'count': 5}).json()
+        self.assertEqual(set(data), {'seed', 'total', 'next', 'sentences', 'words', 'distractors'})
+        first = next(sentence for sentence in data['sentences'] if sentence['arz'] == 'sentence 0')
+        self.assertEqual(first, {
+            'id': self.quizzable[0], 'arz': 'sentence 0', 'transliteration': 'sentence 0', 'translations': ['0'],
+            'cloze_words': [self.words[0].id],
+        })
+        self.assertEqual(data['distractors'], {str(self.words[0].id): [self.words[5].id, self.words[6].id]})
+        self.assertEqual(data['words'], {str(word.id): word.text for word in self.words[:7]})
+
+    def test_page_revalidates(self):
+        etag = self.client.get(self.url, {'seed': 1})['ETag']
+        self.assertEqual(self.client.get(self.url, {'seed': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class WordDistractorMigrationTest(TransactionTestCase):
+    """Migration 0002 moves cloze words and their distractor lists into Word/Distractor rows, and back."""
+
+    databases = {'default', 'egyptiansentences'}
+    before = [('egyptiansentences', '0001_initial')]
+    after = [('egyptiansentences', '0002_word_distractor')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connections['egyptiansentences'])
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        self.addCleanup(self.migrate, self.after)
+
+    def test_forwards_and_back(self):
+        apps = self.migrate(self.before)
+        Sentence = apps.get_model('egyptiansentences', 'Sentence')
+        ClozeWord = apps.get_model('egyptiansentences', 'ClozeWord')
+        first, second = Sentence.objects.bulk_create(
+            Sentence(arz=arz, transliteration=arz, translations=[]) for arz in ('walad kitab', 'kitab bab')
+        )
+        rows = [
+            (first.id, 'walad', ['wlad', 'katab']),
+            (first.id, 'kitab', ['katab', 'kutub', 'bab']),
+            (second.id, 'kitab', ['katab', 'kutub', 'bab']),
+            (second.id, 'bab', []),
+        ]
+        ClozeWord.objects.bulk_create(
+            ClozeWord(sentence_id=sentence_id, word=word, distractors=distractors)
+            for sentence_id, word, distractors in rows
+        )
+
+        apps = self.migrate(self.after)
+        Word = apps.get_model('egyptiansentences', 'Word')
+        self.assertEqual(
+            sorted(Word.objects.values_list('text', flat=True)), ['bab', 'katab', 'kitab', 'kutub', 'walad', 'wlad'],
+        )
+        stored = [
+            (cloze_word.sentence_id, cloze_word.word.text, [
+                link.distractor.text for link in cloze_word.word.distractors.order_by('position')
+            ])
+            for cloze_word in apps.get_model('egyptiansentences', 'ClozeWord').objects.order_by('id')
+        ]
+        self.assertEqual(stored, rows)
+
+        apps = self.migrate(self.before)
+        restored = apps.get_model('egyptiansentences', 'ClozeWord').objects.order_by('id')
+        self.assertEqual([(row.sentence_id, row.word, row.distractors) for row in restored], rows)
@@ -7,5 +7,5 @@ app_name = 'egyptiansentences'
 urlpatterns = [
     path('', views.home, name='home'),
     path('practice/', views.practice, name='practice'),
-    path('api/sentences/', views.api_sentences, name='api_sentences'),
+    path('api/sentences/sample/', views.api_sample, name='api_sample'),
 ]
@@ -1,11 +1,21 @@
 import json
+import random
+from functools import lru_cache
 
-from django.http import JsonResponse
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render
 from django.urls import reverse
 
-from egyptiansentences.models import Sentence
+from egyptiansentences.models import Distractor, Sentence, Word
 from core.apps_registry import nav_context
+from core.conditional import content_conditional, content_version
+from core.metrics import JsonResponse
+
+DEFAULT_SAMPLE_SIZE = 20
+MAX_SAMPLE_SIZE = 100
+
+# content version -> ids of every sentence with at least one cloze word, ascending
+_sentence_ids: dict[str | None, tuple[int, ...]] = {}
 
 
 def home(request):
@@ -14,25 +24,103 @@ def home(request):
 
 def practice(request):
     config = {
-        'apiSentencesUrl': reverse('egyptiansentences:api_sentences'),
+        'apiSampleUrl': reverse('egyptiansentences:api_sample'),
     }
     context = {'config_json': json.dumps(config), **nav_context('egyptiansentences', 'practice')}
     return render(request, 'egyptian-sentences/practice.html', context)
 
 
-def api_sentences(request):
-    sentences = Sentence.objects.prefetch_related('cloze_words').all()
-    data = [
-        {
-            'id': sentence.id,
-            'arz': sentence.arz,
-            'transliteration': sentence.transliteration,
-            'translations': sentence.translations,
-            'cloze_words': [
-                {'word': cloze_word.word, 'distractors': cloze_word.distractors}
-                for cloze_word in sentence.cloze_words.all()
-            ],
-        }
-        for sentence in sentences
-    ]
-    return JsonResponse(data, safe=False)
+def _serialize(sentence):
+    return {
+        'id': sentence.id,
+        'arz': sentence.arz,
+        'transliteration': sentence.transliteration,
+        'translations': sentence.translations,
+        'cloze_words': [cloze_word.word_id for cloze_word in sentence.cloze_words.all()],
+    }
+
+
+def _payload(sentences, cloze_word_ids):
+    """`sentences` with the words they refer to by id, each spelled out once per response.
+
+    `words` maps an id to its text - for `cloze_word_ids` and their
+    distractors only - and `distractors` a cloze word's id to its
+    distractors' ids, closest first.
+    """
+    distractors = {}
+    for word_id, distractor_id in Distractor.objects.filter(word_id__in=cloze_word_ids).values_list(
+        'word_id', 'distractor_id',
+    ):
+        distractors.setdefault(word_id, []).append(distractor_id)
+    word_ids = {*cloze_word_ids, *(i for ids in distractors.values() for i in ids)}
+    return {
+        'sentences': [_serialize(sentence) for sentence in sentences],
+        'words': dict(Word.objects.filter(id__in=word_ids).values_list('id', 'text')),
+        'distractors': distractors,
+    }
+
+
+def _quizzable_ids():
+    """`(content version, ids)` of the sentences a round can use, read once per version."""
+    version = content_version('egyptiansentences')
+    key = version[0] if version else None
+    if key not in _sentence_ids:
+        ids = tuple(
+            Sentence.objects.filter(cloze_words__isnull=False).distinct().order_by('id').values_list('id', flat=True)
+        )
+        _sentence_ids.clear()
+        _permutation.cache_clear()
+        _sentence_ids[key] = ids
+    return key, _sentence_ids[key]
+
+
+@lru_cache(maxsize=256)
+def _permutation(version, seed):
+    """The order `seed` shuffles content `version`'s quizzable ids into.
+
+    Keyed on the version rather than the ids themselves, so an entry holds
+    one shuffled list and not another copy of the tuple as its key.
+    """
+    ids = _sentence_ids[version]
+    return random.Random(seed).sample(ids, len(ids))
+
+
+def api_sample(request):
+    """`count` sentences in the order `seed` shuffles them into, from `cursor` on.
+
+    The shuffle is a seeded permutation of the cached id list, so a page is
+    a few primary-key lookups rather than an `ORDER BY RANDOM()` scan, and the
+    same `seed` and `cursor` always give the same page (and ETag). Pass the
+    response's `next` back as `cursor` for the following round; it is null
+    once every sentence has been dealt, and the client starts a new seed.
+
+    The parameters are checked before content_conditional sees the request,
+    so a 400 carries no validators and is never answered 304.
+    """
+    try:
+        seed = int(request.GET['seed'])
+        count = int(request.GET.get('count', DEFAULT_SAMPLE_SIZE))
+        cursor = int(request.GET.get('cursor', 0))
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest('seed, count and cursor must be integers (seed is required)')
+    if not 1 <= count <= MAX_SAMPLE_SIZE or cursor < 0:
+        return HttpResponseBadRequest(f'count must be 1-{MAX_SAMPLE_SIZE} and cursor non-negative')
+    return _sample_page(request, seed, count, cursor)
+
+
+@content_conditional
+def _sample_page(request, seed, count, cursor):
+    # Revalidation still answers 304, but pages aren't kept in core.response_cache: each
+    # session's seed makes its own URLs, which would be stored there and hardly ever hit again.
+    version, ids = _quizzable_ids()
+    page = _permutation(version, seed)[cursor:cursor + count]
+    by_id = Sentence.objects.prefetch_related('cloze_words').in_bulk(page)
+    sentences = [by_id[sentence_id] for sentence_id in page]
+    cloze_word_ids = {cloze_word.word_id for sentence in sentences for cloze_word in sentence.cloze_words.all()}
+    end = cursor + len(page)
+    return JsonResponse({
+        'seed': seed,
+        'total': len(ids),
+        'next': end if end < len(ids) else None,
+        **_payload(sentences, cloze_word_ids),
+    })
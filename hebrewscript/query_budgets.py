@@ -0,0 +1,9 @@
+"""Query budgets for hebrewscript's views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({}),
+    'practice': Budget({}),
+    'stats': Budget({}),
+    'api_clips': Budget({'hebrewscript': 1}),
+}
@@ -1,12 +1,14 @@
 import json
 
-from django.http import JsonResponse
 from django.shortcuts import render
 from django.templatetags.static import static
-from django.urls import reverse
 
 from hebrewscript.models import Clip
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url
 
 
 def home(request):
@@ -16,7 +18,7 @@ def home(request):
 def practice(request):
     config = {
         'audioBaseUrl': static('hebrewscript/audio/'),
-        'apiClipsUrl': reverse('hebrewscript:api_clips'),
+        'apiClipsUrl': api_url('hebrewscript:api_clips'),
     }
     context = {'config_json': json.dumps(config), **nav_context('hebrewscript', 'practice')}
     return render(request, 'hebrew-script/practice.html', context)
@@ -26,5 +28,7 @@ def stats(request):
     return render(request, 'hebrew-script/stats.html', nav_context('hebrewscript', 'stats'))
 
 
+@content_conditional
+@cache_content_response
 def api_clips(request):
     return JsonResponse(list(Clip.objects.values('filename', 'transcript')), safe=False)
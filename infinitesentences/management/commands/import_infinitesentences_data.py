@@ -1,10 +1,99 @@
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Max
 
 from infinitesentences.models import Language, LanguagePair, Sentence, SentencePart
 
+# Sentence files parsed per worker task, and written per executemany.
+BATCH_SIZE = 2000
+
+SENTENCE_COLUMNS = ['id', 'pair', 'index', 'text', 'translations', 'credits', 'transcription']
+PART_COLUMNS = ['sentence', 'order', 'content', 'translations', 'usage_examples', 'transcription']
+
+
+def _parse_batch(pair_dir, start, stop):
+    """Rows for each `{index}.json` in [start, stop) under `pair_dir` that exists.
+
+    `(sentences, parts)`: sentences as `(index, text, translations,
+    credits, transcription)`, parts as `(position of their sentence in
+    sentences, order, content, translations, usage_examples,
+    transcription)`, JSON fields already encoded the way JSONField stores
+    them - that work happens here, in the pool, not in the writing process.
+    """
+    sentences = []
+    parts = []
+    for index in range(start, stop):
+        try:
+            text = (pair_dir / f'{index}.json').read_text(encoding='utf-8')
+        except FileNotFoundError:
+            continue
+        record = json.loads(text)
+        position = len(sentences)
+        sentences.append((
+            index,
+            record['sentence'],
+            json.dumps(record.get('translations', [])),
+            json.dumps(record.get('credits', [])),
+            record.get('transcription', ''),
+        ))
+        parts.extend(
+            (
+                position,
+                order,
+                part['content'],
+                json.dumps(part.get('translations', [])),
+                json.dumps(part.get('usageExamples', [])),
+                part.get('transcription', ''),
+            )
+            for order, part in enumerate(record.get('parts', []))
+        )
+    return sentences, parts
+
+
+def _insert_sql(connection, model, names):
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in names)
+    placeholders = ', '.join(['%s'] * len(names))
+    return f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+
+def _delete_sentences(pair=None):
+    """Delete `pair`'s sentences and their parts (every pair's without one), in two statements.
+
+    Sentence.objects.delete() would load every sentence to cascade to its
+    parts one batch at a time; parts go first instead, then the sentences
+    with nothing left referencing them.
+    """
+    parts = SentencePart.objects.all() if pair is None else SentencePart.objects.filter(sentence__pair=pair)
+    parts.delete()
+    connection = connections[router.db_for_write(Sentence)]
+    quote = connection.ops.quote_name
+    sql = f'DELETE FROM {quote(Sentence._meta.db_table)}'
+    with connection.cursor() as cursor:
+        if pair is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(f'{sql} WHERE {quote(Sentence._meta.get_field("pair").column)} = %s', [pair.id])
+
+
+class _InlineExecutor:
+    """The slice of ProcessPoolExecutor's interface `_import_sentences` uses, run in this process."""
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
 
 class Command(BaseCommand):
     help = (
@@ -12,7 +101,8 @@ class Command(BaseCommand):
         'sentences, per-word gloss + usage examples with Tatoeba attribution) from a '
         'local infinite-sentences-frontend checkout into the infinitesentences database. '
         'Never run in production - the resulting infinitesentences.sqlite3 is committed '
-        'to git directly.'
+        'to git directly. Sentence files are parsed over --workers processes and written '
+        'in batched inserts, one transaction per language pair.'
     )
 
     def add_arguments(self, parser):
@@ -27,6 +117,14 @@ class Command(BaseCommand):
             '--flush', action='store_true',
             help='Delete existing Language/LanguagePair/Sentence/SentencePart rows first.',
         )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes parsing sentence files (default: one per CPU; 1 parses in this process).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help=f'Sentence files per parse task and per insert (default {BATCH_SIZE}).',
+        )
 
     def handle(self, *args, **options):
         source = Path(options['source']).resolve()
@@ -42,14 +140,16 @@ class Command(BaseCommand):
             )
 
         if options['flush']:
-            SentencePart.objects.all().delete()
-            Sentence.objects.all().delete()
+            _delete_sentences()
             LanguagePair.objects.all().delete()
             Language.objects.all().delete()
             self.stdout.write('Flushed existing infinitesentences content rows.')
 
+        self.batch_size = options['batch_size']
         language_count = self._import_languages(languages_json, native_languages_json)
-        pair_count, sentence_count, part_count = self._import_pairs_and_sentences(data_dir)
+        workers = options['workers']
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else _InlineExecutor() as executor:
+            pair_count, sentence_count, part_count = self._import_pairs_and_sentences(data_dir, executor)
 
         self.stdout.write(self.style.SUCCESS(
             f'Imported {language_count} languages, {pair_count} language pairs, '
@@ -72,7 +172,7 @@ class Command(BaseCommand):
 
         return len(languages)
 
-    def _import_pairs_and_sentences(self, data_dir):
+    def _import_pairs_and_sentences(self, data_dir, executor):
         native_languages_json = data_dir / 'native_languages.json'
         native_codes = json.loads(native_languages_json.read_text(encoding='utf-8'))
 
@@ -104,14 +204,21 @@ class Command(BaseCommand):
                 target = Language.objects.get(code=target_code)
                 max_index = int(index_txt.read_text(encoding='utf-8').strip())
 
-                pair, _ = LanguagePair.objects.update_or_create(
-                    native=native, target=target, defaults={'sentence_count': 0},
-                )
-                Sentence.objects.filter(pair=pair).delete()
+                started = time.perf_counter()
+                with transaction.atomic(using=router.db_for_write(Sentence)):
+                    pair, _ = LanguagePair.objects.update_or_create(
+                        native=native, target=target, defaults={'sentence_count': 0},
+                    )
+                    _delete_sentences(pair)
 
-                imported = self._import_sentences(pair_dir, pair, max_index)
-                pair.sentence_count = imported[0]
-                pair.save(update_fields=['sentence_count'])
+                    imported = self._import_sentences(pair_dir, pair, max_index, executor)
+                    pair.sentence_count = imported[0]
+                    pair.save(update_fields=['sentence_count'])
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{native_code}/{target_code}: {imported[0]} sentences, {imported[1]} parts '
+                    f'in {elapsed:.1f} s ({imported[0] / elapsed if elapsed else 0:.0f} sentences/s)'
+                )
 
                 pair_count += 1
                 sentence_count += imported[0]
@@ -119,38 +226,39 @@ class Command(BaseCommand):
 
         return pair_count, sentence_count, part_count
 
-    def _import_sentences(self, pair_dir, pair, max_index):
+    def _import_sentences(self, pair_dir, pair, max_index, executor):
+        """Parse the pair's sentence files on `executor` and insert each parsed batch as it arrives.
+
+        Rows go in through `executemany` rather than bulk_create: building
+        and preparing a model instance per row cost several times the
+        inserts themselves. Sentence ids are assigned here, from the
+        table's current maximum, so parts can point at their sentence
+        without reading ids back - safe inside the pair's transaction.
+        """
+        db = router.db_for_write(Sentence)
+        connection = connections[db]
+        sentence_sql = _insert_sql(connection, Sentence, SENTENCE_COLUMNS)
+        part_sql = _insert_sql(connection, SentencePart, PART_COLUMNS)
+        next_id = (Sentence.objects.using(db).aggregate(last=Max('id'))['last'] or 0) + 1
         sentence_count = 0
         part_count = 0
 
-        for index in range(1, max_index + 1):
-            sentence_json = pair_dir / f'{index}.json'
-            if not sentence_json.is_file():
-                continue
-
-            record = json.loads(sentence_json.read_text(encoding='utf-8'))
-            sentence = Sentence.objects.create(
-                pair=pair,
-                index=index,
-                text=record['sentence'],
-                translations=record.get('translations', []),
-                credits=record.get('credits', []),
-                transcription=record.get('transcription', ''),
-            )
-            sentence_count += 1
-
-            parts = record.get('parts', [])
-            SentencePart.objects.bulk_create(
-                SentencePart(
-                    sentence=sentence,
-                    order=order,
-                    content=part['content'],
-                    translations=part.get('translations', []),
-                    usage_examples=part.get('usageExamples', []),
-                    transcription=part.get('transcription', ''),
-                )
-                for order, part in enumerate(parts)
-            )
-            part_count += len(parts)
+        starts = range(1, max_index + 1, self.batch_size)
+        stops = [min(start + self.batch_size, max_index + 1) for start in starts]
+        # map() yields batches in order as they are parsed, while the pool works on the next ones.
+        batches = executor.map(_parse_batch, [pair_dir] * len(starts), starts, stops)
+        with connection.cursor() as cursor:
+            for stop, (sentences, parts) in zip(stops, batches):
+                cursor.executemany(sentence_sql, [
+                    (next_id + position, pair.id, *sentence) for position, sentence in enumerate(sentences)
+                ])
+                cursor.executemany(part_sql, [(next_id + position, *part) for position, *part in parts])
+                next_id += len(sentences)
+                sentence_count += len(sentences)
+                part_count += len(parts)
+                if self.stdout.isatty():
+                    self.stdout.write(
+                        f'  {pair}: {stop - 1}/{max_index} files, {sentence_count} sentences', ending='\r',
+                    )
 
         return sentence_count, part_count
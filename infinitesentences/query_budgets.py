@@ -0,0 +1,37 @@
+"""Query budgets for infinitesentences' views (see core.query_budgets).
+
+infinitesentences.sqlite3 is built by import_infinitesentences_data rather
+than committed, so `fixtures` seeds one small language pair instead.
+"""
+from core.query_budgets import Budget
+from infinitesentences.models import Language, LanguagePair, Sentence, SentencePart
+
+PAIR = ('eng', 'deu')
+
+
+def fixtures():
+    english = Language.objects.create(code='eng', display_name='English', symbols=[], is_native=True)
+    german = Language.objects.create(code='deu', display_name='German', symbols=['ä', 'ö', 'ü', 'ß'])
+    pair = LanguagePair.objects.create(native=english, target=german, sentence_count=3)
+    for index, text in enumerate(['Ich bin hier.', 'Du bist da.', 'Wir sind dort.']):
+        sentence = Sentence.objects.create(pair=pair, index=index, text=text, translations=[text])
+        SentencePart.objects.bulk_create(
+            SentencePart(sentence=sentence, order=order, content=word, translations=[word])
+            for order, word in enumerate(text.rstrip('.').split())
+        )
+
+
+BUDGETS = {
+    'landing': Budget({}),
+    'select_native_language': Budget({}),
+    'select_target_language': Budget({}, args=PAIR[:1]),
+    'practice': Budget({}, args=PAIR),
+    'stats': Budget({}),
+    'settings': Budget({}),
+    'api_languages': Budget({'infinitesentences': 1}),
+    'api_native_languages': Budget({'infinitesentences': 1}),
+    'api_target_languages': Budget({'infinitesentences': 1}, args=PAIR[:1]),
+    'api_sentence_count': Budget({'infinitesentences': 1}, args=PAIR),
+    'api_sentence': Budget({'infinitesentences': 2}, args=(*PAIR, '1')),
+    'api_sentences': Budget({'infinitesentences': 2}, args=PAIR, query={'indices': '0,1,2'}),
+}
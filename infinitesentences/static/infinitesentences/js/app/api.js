@@ -4,7 +4,7 @@
 // submodule files).
 
 /** @typedef {import('../types.js').LanguageDataMap} LanguageDataMap */
-/** @typedef {import('../types.js').SentenceData} SentenceData */
+/** @typedef {import('../types.js').SentenceBatch} SentenceBatch */
 
 /** @param {string} url */
 async function fetchJson(url) {
@@ -49,10 +49,11 @@ export async function loadSentenceCount(apiSentenceCountUrl) {
 }
 
 /**
- * @param {string} apiSentenceUrlTemplate
- * @param {number} index
- * @returns {Promise<SentenceData>}
+ * Several sentences in one request; indices without a sentence are absent from the result.
+ * @param {string} apiSentencesUrl
+ * @param {number[]} indices
+ * @returns {Promise<SentenceBatch>}
  */
-export function loadSentenceByIndex(apiSentenceUrlTemplate, index) {
-  return fetchJson(apiSentenceUrlTemplate.replace("__INDEX__", String(index)));
+export function loadSentencesByIndex(apiSentencesUrl, indices) {
+  return fetchJson(`${apiSentencesUrl}?${new URLSearchParams({ indices: indices.join(",") })}`);
 }
@@ -4,16 +4,22 @@
 // load here, rather than reactive vue-router params).
 
 /** @typedef {import('../types.js').PracticeConfig} PracticeConfig */
+/** @typedef {import('../types.js').SentenceData} SentenceData */
 
 import { pullState } from "/static/tracking/js/client.js";
 import { pickRandom, takeRandom } from "./random.js";
 import { createPracticeStore, createUserSettingsStore } from "./store.js";
-import { loadSentenceByIndex, loadSentenceCount } from "./api.js";
+import { loadSentenceCount, loadSentencesByIndex } from "./api.js";
 import { buildPartKey, buildSentenceKey } from "./keys.js";
 import { Rating } from "./fsrs.js";
 
 const { ref, computed } = window.Vue;
 
+// Sentences fetched per request (random unlearned ones), and how few may be left
+// waiting before the next request goes out in the background.
+const PREFETCH_COUNT = 10;
+const PREFETCH_LOW_WATER = 3;
+
 /** @param {string} content @param {string} [refKey] */
 const toTaskText = (content, refKey) => ({ content, ref: refKey });
 
@@ -44,6 +50,12 @@ export function createPracticeSession(config) {
   const lastIntroTask = ref(/** @type {string | null} */ (null));
   const isLoading = ref(true);
   const errorMessage = ref(/** @type {string | null} */ (null));
+  /** Sentences fetched ahead of being shown, by index. @type {Map<number, SentenceData>} */
+  const prefetched = new Map();
+  /** Indices asked for that the API had no sentence at. @type {Set<number>} */
+  const missing = new Set();
+  /** @type {Promise<boolean | void> | null} */
+  let prefetching = null;
 
   function resetSession() {
     maxIndex.value = null;
@@ -55,6 +67,8 @@ export function createPracticeSession(config) {
     lastPartKey.value = null;
     lastIntroTask.value = null;
     errorMessage.value = null;
+    prefetched.clear();
+    missing.clear();
   }
 
   /** @param {any} part */
@@ -113,13 +127,55 @@ export function createPracticeSession(config) {
     return candidates;
   }
 
+  /** @returns {Promise<boolean>} whether there was anything left to ask for */
+  async function prefetchSentences() {
+    const batch = takeRandom(
+      getAvailableSentenceIndices().filter((index) => !prefetched.has(index) && !missing.has(index)),
+      PREFETCH_COUNT,
+    );
+    if (!batch.length) return false;
+    const { sentences } = await loadSentencesByIndex(config.apiSentencesUrl, batch);
+    for (const index of batch) {
+      if (index in sentences) {
+        prefetched.set(index, sentences[index]);
+      } else {
+        missing.add(index);
+      }
+    }
+    return true;
+  }
+
+  function prefetchAhead() {
+    if (prefetching || prefetched.size > PREFETCH_LOW_WATER) return;
+    prefetching = prefetchSentences()
+      .catch((error) => console.error("Failed to prefetch sentences:", error))
+      .finally(() => {
+        prefetching = null;
+      });
+  }
+
+  /** @returns {number | undefined} */
+  function pickPrefetched() {
+    return pickRandom(getAvailableSentenceIndices().filter((index) => prefetched.has(index)));
+  }
+
   async function addRandomSentence() {
-    const candidates = getAvailableSentenceIndices();
-    const nextIndex = pickRandom(candidates);
-    if (nextIndex === undefined) return false;
+    let nextIndex = pickPrefetched();
+    // A batch can come back with nothing usable (its sentences were started or learned while it
+    // was in flight, or its indices are gaps): ask again until no candidate is left to ask for.
+    while (nextIndex === undefined) {
+      if (prefetching) {
+        await prefetching;
+      } else if (!(await prefetchSentences())) {
+        return false;
+      }
+      nextIndex = pickPrefetched();
+    }
 
-    const data = await loadSentenceByIndex(config.apiSentenceUrlTemplate, nextIndex);
+    const data = /** @type {SentenceData} */ (prefetched.get(nextIndex));
+    prefetched.delete(nextIndex);
     addSentenceData(nextIndex, data);
+    prefetchAhead();
     return true;
   }
 
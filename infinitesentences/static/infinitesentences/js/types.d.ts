@@ -20,12 +20,16 @@ export interface SentenceData {
   transcription?: string;
 }
 
+export interface SentenceBatch {
+  sentences: Record<string, SentenceData>;
+}
+
 export interface PracticeConfig {
   nativeIso: string;
   targetIso: string;
   apiLanguagesUrl: string;
   apiSentenceCountUrl: string;
-  apiSentenceUrlTemplate: string;
+  apiSentencesUrl: string;
   landingUrl: string;
   selectNativeLanguageUrl: string;
   statsUrl: string;
@@ -0,0 +1,157 @@
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from infinitesentences.models import LanguagePair, Sentence, SentencePart
+from infinitesentences.query_budgets import PAIR, fixtures
+from infinitesentences.views import MAX_BATCH_SIZE
+
+
+class SentenceBatchTest(TestCase):
+    """api_sentences answers what the practice session's prefetch loop relies on:
+    a sentence per index that has one, nothing for a gap, and 400 for a bad ask."""
+
+    databases = {'default', 'infinitesentences'}
+    url = reverse('infinitesentences:api_sentences', args=PAIR)
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures()  # indices 0, 1 and 2
+
+    def batch(self, **query):
+        response = self.client.get(self.url, query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['sentences']
+
+    def test_by_indices(self):
+        sentences = self.batch(indices='2,0')
+        self.assertEqual(sorted(sentences), ['0', '2'])
+        self.assertEqual(sentences['2']['sentence'], 'Wir sind dort.')
+        self.assertEqual([part['content'] for part in sentences['2']['parts']], ['Wir', 'sind', 'dort'])
+
+    def test_by_range(self):
+        self.assertEqual(sorted(self.batch(**{'from': 1, 'count': 5})), ['1', '2'])
+        self.assertEqual(sorted(self.batch(**{'from': 0})), ['0', '1', '2'])
+
+    def test_missing_indices_are_left_out(self):
+        self.assertEqual(sorted(self.batch(indices='1,7,3,1')), ['1'])
+        self.assertEqual(self.batch(indices='5,6,7'), {})
+        self.assertEqual(self.batch(**{'from': 3, 'count': MAX_BATCH_SIZE}), {})
+
+    def test_unknown_pair_is_an_empty_batch(self):
+        url = reverse('infinitesentences:api_sentences', args=('eng', 'fra'))
+        self.assertEqual(self.client.get(url, {'indices': '0'}).json(), {'sentences': {}})
+
+    def test_prefetch_loop_keeps_fetching_past_empty_batches_and_ends(self):
+        # practiceSession.js's addRandomSentence: ask for random unasked candidates in
+        # batches, note the indices that came back empty, and stop once none are left.
+        candidates = set(range(20))
+        rng = random.Random(24)
+        found, missing, requests = {}, set(), 0
+        while unasked := sorted(candidates - found.keys() - missing):
+            batch = rng.sample(unasked, min(4, len(unasked)))
+            sentences = self.batch(indices=','.join(map(str, batch)))
+            requests += 1
+            for index in batch:
+                if str(index) in sentences:
+                    found[index] = sentences[str(index)]
+                else:
+                    missing.add(index)
+        self.assertEqual(sorted(found), [0, 1, 2])
+        self.assertEqual(requests, 5)
+
+    def test_malformed_input_is_400(self):
+        too_many = ','.join(map(str, range(MAX_BATCH_SIZE + 1)))
+        for query in (
+            {}, {'indices': ''}, {'indices': 'a,b'}, {'indices': '1,,2'}, {'indices': '-1'}, {'indices': too_many},
+            {'from': 'x'}, {'from': -1}, {'from': 0, 'count': 0}, {'from': 0, 'count': MAX_BATCH_SIZE + 1},
+            {'count': 5},
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(self.url, query)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.has_header('ETag'))
+
+
+class ImportSentencesTest(TestCase):
+    """import_infinitesentences_data's sentence import, inline and over a process pool."""
+
+    databases = {'default', 'infinitesentences'}
+
+    # pair -> {index: sentence}; each word becomes a part. Index 3 of eng/deu is a gap.
+    SENTENCES = {
+        ('eng', 'deu'): {1: 'Ich bin hier', 2: 'Du bist da', 4: 'Wir sind dort', 5: 'Ja'},
+        ('eng', 'fra'): {1: 'Je suis ici', 2: 'Tu es là'},
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source = Path(directory.name)
+        self.data = self.source / 'public' / 'infinite-sentences-data'
+        self.data.mkdir(parents=True)
+        self.write(self.data / 'languages.json', {code: {'displayName': code} for code in ('eng', 'deu', 'fra')})
+        self.write(self.data / 'native_languages.json', ['eng'])
+        self.write(self.data / 'eng' / 'target_languages.json', ['deu', 'fra'])
+        for pair, sentences in self.SENTENCES.items():
+            self.write_pair(pair, sentences)
+
+    def write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding='utf-8')
+
+    def write_pair(self, pair, sentences):
+        pair_dir = self.data.joinpath(*pair)
+        for path in pair_dir.glob('*.json'):
+            path.unlink()
+        for index, text in sentences.items():
+            self.write(pair_dir / f'{index}.json', {
+                'sentence': text, 'translations': [f'{text}!'],
+                'parts': [{'content': word, 'translations': [word.lower()]} for word in text.split()],
+            })
+        (pair_dir / 'index.txt').write_text(str(max(sentences) + 1), encoding='utf-8')
+
+    def run_import(self, workers, **options):
+        # batch_size=2 splits each pair over several parse tasks and inserts.
+        call_command(
+            'import_infinitesentences_data', source=str(self.source), workers=workers, batch_size=2,
+            stdout=io.StringIO(), **options,
+        )
+
+    def assertImported(self, expected):
+        for (native, target), sentences in expected.items():
+            with self.subTest(pair=(native, target)):
+                pair = LanguagePair.objects.get(native_id=native, target_id=target)
+                self.assertEqual(pair.sentence_count, len(sentences))
+                stored = {sentence.index: sentence.text for sentence in Sentence.objects.filter(pair=pair)}
+                self.assertEqual(stored, sentences)
+        self.assertEqual(Sentence.objects.count(), sum(map(len, expected.values())))
+        words = sum(len(text.split()) for sentences in expected.values() for text in sentences.values())
+        self.assertEqual(SentencePart.objects.count(), words)
+        # Parts point at their own sentence through the ids the importer assigned.
+        for sentence in Sentence.objects.prefetch_related('parts'):
+            self.assertEqual(' '.join(part.content for part in sentence.parts.all()), sentence.text)
+
+    def test_inline(self):
+        self.run_import(workers=1, flush=True)
+        self.assertImported(self.SENTENCES)
+
+    def test_process_pool(self):
+        self.run_import(workers=2, flush=True)
+        self.assertImported(self.SENTENCES)
+
+    def test_reimporting_replaces_each_pairs_rows(self):
+        self.run_import(workers=1, flush=True)
+        changed = {1: 'Ich war hier', 3: 'Neu'}
+        self.write_pair(('eng', 'deu'), changed)
+        # Without --flush: each pair's old sentences and parts go, the new ones come in once.
+        self.run_import(workers=2)
+        self.assertImported({**self.SENTENCES, ('eng', 'deu'): changed})
+        self.run_import(workers=1)
+        self.assertImported({**self.SENTENCES, ('eng', 'deu'): changed})
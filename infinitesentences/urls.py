@@ -25,4 +25,9 @@ urlpatterns = [
         views.api_sentence,
         name='api_sentence',
     ),
+    path(
+        'api/sentences/<str:native_iso>/<str:target_iso>/',
+        views.api_sentences,
+        name='api_sentences',
+    ),
 ]
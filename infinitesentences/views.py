@@ -1,12 +1,18 @@
 import json
 
-from django.http import Http404, JsonResponse
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, render
 from django.templatetags.static import static
 from django.urls import reverse
 
 from infinitesentences.models import Language, LanguagePair, Sentence
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+
+# Most sentences one api_sentences request may ask for.
+MAX_BATCH_SIZE = 50
 
 
 def landing(request):
@@ -53,9 +59,9 @@ def practice(request, native_iso, target_iso):
             'infinitesentences:api_sentence_count',
             kwargs={'native_iso': native_iso, 'target_iso': target_iso},
         ),
-        'apiSentenceUrlTemplate': reverse(
-            'infinitesentences:api_sentence',
-            kwargs={'native_iso': native_iso, 'target_iso': target_iso, 'index': '__INDEX__'},
+        'apiSentencesUrl': reverse(
+            'infinitesentences:api_sentences',
+            kwargs={'native_iso': native_iso, 'target_iso': target_iso},
         ),
     }
     context = {'config_json': json.dumps(config), **nav_context('infinitesentences', 'practice')}
@@ -82,6 +88,8 @@ def settings_page(request):
     return render(request, 'infinite-sentences/settings.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_languages(request):
     data = {
         language.code: {'displayName': language.display_name, 'symbols': language.symbols}
@@ -90,21 +98,29 @@ def api_languages(request):
     return JsonResponse(data)
 
 
+@content_conditional
+@cache_content_response
 def api_native_languages(request):
     codes = list(Language.objects.filter(is_native=True).values_list('code', flat=True))
     return JsonResponse(codes, safe=False)
 
 
+@content_conditional
+@cache_content_response
 def api_target_languages(request, native_iso):
     codes = list(LanguagePair.objects.filter(native_id=native_iso).values_list('target_id', flat=True))
     return JsonResponse(codes, safe=False)
 
 
+@content_conditional
+@cache_content_response
 def api_sentence_count(request, native_iso, target_iso):
     pair = get_object_or_404(LanguagePair, native_id=native_iso, target_id=target_iso)
     return JsonResponse({'count': pair.sentence_count})
 
 
+@content_conditional
+@cache_content_response
 def api_sentence(request, native_iso, target_iso, index):
     try:
         index_int = int(index)
@@ -115,7 +131,11 @@ def api_sentence(request, native_iso, target_iso, index):
         Sentence.objects.prefetch_related('parts'),
         pair__native_id=native_iso, pair__target_id=target_iso, index=index_int,
     )
-    data = {
+    return JsonResponse(_sentence_data(sentence))
+
+
+def _sentence_data(sentence):
+    return {
         'sentence': sentence.text,
         'credits': sentence.credits,
         'translations': sentence.translations,
@@ -130,4 +150,42 @@ def api_sentence(request, native_iso, target_iso, index):
             for part in sentence.parts.all()
         ],
     }
-    return JsonResponse(data)
+
+
+def _batch_indices(params):
+    """The sentence indices asked for by `?indices=1,5,9` or `?from=10&count=20`."""
+    if 'indices' in params:
+        indices = list(dict.fromkeys(int(value) for value in params['indices'].split(',')))
+    else:
+        start, count = int(params['from']), int(params.get('count', MAX_BATCH_SIZE))
+        if count < 1:
+            raise ValueError('count must be positive')
+        indices = list(range(start, start + count))
+    if not 1 <= len(indices) <= MAX_BATCH_SIZE or min(indices) < 0:
+        raise ValueError(f'1-{MAX_BATCH_SIZE} non-negative indices')
+    return indices
+
+
+@content_conditional
+def api_sentences(request, native_iso, target_iso):
+    """Many sentences of a pair at once, as `{"sentences": {index: api_sentence's data}}`.
+
+    Ask by explicit `indices` (comma-separated) or by a `from`/`count`
+    range, at most MAX_BATCH_SIZE either way. Indices without a sentence
+    are left out. Two queries, however many sentences: the sentences,
+    with the pair resolved in the same join, then all of their parts.
+
+    Not in core.response_cache: the session asks for a random set each
+    time, so the same query string hardly ever comes back.
+    """
+    try:
+        indices = _batch_indices(request.GET)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest(
+            f'Pass indices=1,2,3 or from=N&count=M (1-{MAX_BATCH_SIZE} non-negative indices).'
+        )
+
+    sentences = Sentence.objects.prefetch_related('parts').filter(
+        pair__native_id=native_iso, pair__target_id=target_iso, index__in=indices,
+    )
+    return JsonResponse({'sentences': {sentence.index: _sentence_data(sentence) for sentence in sentences}})
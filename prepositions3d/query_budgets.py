@@ -0,0 +1,9 @@
+"""Query budgets for prepositions3d's views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({'prepositions3d': 1}),
+    'practice': Budget({}),
+    'api_languages': Budget({'prepositions3d': 1}),
+    'api_glossary': Budget({'prepositions3d': 1}),
+}
@@ -1,13 +1,15 @@
 import json
 from collections import defaultdict
 
-from django.http import JsonResponse
 from django.shortcuts import render
 from django.templatetags.static import static
-from django.urls import reverse
 
 from prepositions3d.models import Language, Translation
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url
 
 
 def home(request):
@@ -18,17 +20,21 @@ def practice(request):
     config = {
         'modelsBaseUrl': static('prepositions3d/models/'),
         'soundBaseUrl': static('prepositions3d/sound/'),
-        'apiLanguagesUrl': reverse('prepositions3d:api_languages'),
-        'apiGlossaryUrl': reverse('prepositions3d:api_glossary'),
+        'apiLanguagesUrl': api_url('prepositions3d:api_languages'),
+        'apiGlossaryUrl': api_url('prepositions3d:api_glossary'),
     }
     context = {'config_json': json.dumps(config), **nav_context('prepositions3d', 'practice')}
     return render(request, 'prepositions-3d/game.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_languages(request):
     return JsonResponse({language.code: language.name for language in Language.objects.all()})
 
 
+@content_conditional
+@cache_content_response
 def api_glossary(request):
     translations = (
         Translation.objects
@@ -0,0 +1,15 @@
+"""`manage.py bench saetze` scenarios: per-lesson exercise API over read-only content."""
+from django.urls import reverse
+
+from core.bench import Scenario
+from saetze.models import Lesson
+
+
+def scenarios(params):
+    urls = [reverse('saetze:api_exercises', args=[key]) for key in Lesson.objects.values_list('key', flat=True)]
+    return [
+        Scenario(
+            'api-exercises', "GET one lesson's exercises, cycling through every lesson",
+            lambda client, number: client.get(urls[number % len(urls)]),
+        ),
+    ]
@@ -0,0 +1,14 @@
+"""Query budgets for saetze's views (see core.query_budgets)."""
+from core.query_budgets import Budget
+from saetze.models import Lesson
+
+
+def _lesson():
+    return (Lesson.objects.values_list('key', flat=True).first(),)
+
+
+BUDGETS = {
+    'home': Budget({'saetze': 1}),
+    'api_exercises': Budget({'saetze': 1}, args=_lesson),
+    'practice': Budget({'saetze': 1}, args=_lesson),
+}
@@ -1,11 +1,13 @@
 import json
 
-from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
-from django.urls import reverse
 
 from saetze.models import Exercise, Lesson
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url
 
 
 def home(request):
@@ -16,12 +18,14 @@ def home(request):
 def lesson_practice(request, lesson_key):
     lesson = get_object_or_404(Lesson, key=lesson_key)
     config = {
-        'apiExercisesUrl': reverse('saetze:api_exercises', args=[lesson_key]),
+        'apiExercisesUrl': api_url('saetze:api_exercises', lesson_key),
     }
     context = {'lesson': lesson, 'config_json': json.dumps(config), **nav_context('saetze', 'practice')}
     return render(request, 'saetze/practice.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_exercises(request, lesson_key):
     exercises = Exercise.objects.filter(lesson_id=lesson_key).values(
         'id', 'english', 'english_credit', 'cloze', 'correct_answer', 'wrong_answer', 'german_credit',
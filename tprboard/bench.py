@@ -0,0 +1,26 @@
+"""`manage.py bench tprboard` scenarios: board object and task APIs over read-only content."""
+from django.urls import reverse
+
+from core.bench import Scenario
+from tprboard.models import Locale
+
+
+def scenarios(params):
+    task_urls = [
+        reverse('tprboard:api_locale_tasks', args=[code]) for code in Locale.objects.values_list('code', flat=True)
+    ]
+    objects_url = reverse('tprboard:api_objects')
+    return [
+        Scenario(
+            'api-objects', 'GET every board object with its relationships',
+            lambda client, number: client.get(objects_url),
+        ),
+        Scenario(
+            'api-objects-gzip', 'GET every board object with its relationships, accepting gzip/br',
+            lambda client, number: client.get(objects_url, HTTP_ACCEPT_ENCODING='gzip, deflate, br'),
+        ),
+        Scenario(
+            'api-locale-tasks', "GET one locale's task sentences, cycling through every locale",
+            lambda client, number: client.get(task_urls[number % len(task_urls)]),
+        ),
+    ]
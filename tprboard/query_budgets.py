@@ -0,0 +1,18 @@
+"""Query budgets for tprboard's views (see core.query_budgets)."""
+from core.query_budgets import Budget
+from tprboard.models import Locale
+
+
+def _locale():
+    return (Locale.objects.values_list('code', flat=True).first(),)
+
+
+BUDGETS = {
+    'home': Budget({'tprboard': 1}),
+    'practice': Budget({'tprboard': 1}),
+    'stats': Budget({}),
+    'settings': Budget({}),
+    'api_languages': Budget({'tprboard': 1}),
+    'api_locale_tasks': Budget({'tprboard': 1}, args=_locale),
+    'api_objects': Budget({'tprboard': 3}),
+}
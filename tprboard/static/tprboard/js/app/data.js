@@ -55,7 +55,7 @@ export async function loadLanguageOptions(config) {
  */
 export async function loadLocaleTaskMap(config, languageCode) {
   return loadJson(
-    `${config.apiLocaleTasksBaseUrl}${languageCode}/tasks/`,
+    config.apiLocaleTasksUrls[languageCode] ?? `${config.apiLocaleTasksBaseUrl}${languageCode}/tasks/`,
     `Failed to load locale task strings: ${languageCode}.`,
   )
 }
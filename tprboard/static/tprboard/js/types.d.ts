@@ -142,6 +142,8 @@ export type TprboardConfig = {
   apiLanguagesUrl: string
   apiObjectsUrl: string
   apiLocaleTasksBaseUrl: string
+  // Build-time snapshot URL per locale code, where one exists (see core/snapshots.py).
+  apiLocaleTasksUrls: Record<string, string>
 }
 
 // The lucide CDN UMD build (loaded via <script> in base.html) attaches
@@ -1,13 +1,16 @@
 import json
 from collections import defaultdict
 
-from django.http import JsonResponse
 from django.shortcuts import render
 from django.templatetags.static import static
 from django.urls import reverse
 
 from tprboard.models import BoardObject, Locale, SentenceFormulation
 from core.apps_registry import nav_context
+from core.conditional import content_conditional
+from core.metrics import JsonResponse
+from core.response_cache import cache_content_response
+from core.snapshots import api_url, snapshot_url
 
 
 def home(request):
@@ -19,9 +22,14 @@ def board(request):
         'audioBaseUrl': static('tprboard/audio/'),
         'modelsBaseUrl': static('tprboard/models/'),
         'explainImageSrc': static('tprboard/img/explain.webp'),
-        'apiLanguagesUrl': reverse('tprboard:api_languages'),
-        'apiObjectsUrl': reverse('tprboard:api_objects'),
+        'apiLanguagesUrl': api_url('tprboard:api_languages'),
+        'apiObjectsUrl': api_url('tprboard:api_objects'),
         'apiLocaleTasksBaseUrl': '/tpr-board/api/locales/',
+        # Snapshot URL per locale (see core.snapshots); locales missing here use the base URL.
+        'apiLocaleTasksUrls': {
+            code: url for code in Locale.objects.values_list('code', flat=True)
+            if (url := snapshot_url('tprboard:api_locale_tasks', code))
+        },
     }
     context = {'config_json': json.dumps(config), **nav_context('tprboard', 'practice')}
     return render(request, 'tpr-board/board.html', context)
@@ -39,10 +47,14 @@ def settings(request):
     return render(request, 'tpr-board/settings.html', context)
 
 
+@content_conditional
+@cache_content_response
 def api_languages(request):
     return JsonResponse({locale.code: locale.name for locale in Locale.objects.all()})
 
 
+@content_conditional
+@cache_content_response
 def api_locale_tasks(request, code):
     formulations = (
         SentenceFormulation.objects
@@ -58,6 +70,8 @@ def api_locale_tasks(request, code):
     return JsonResponse(task_map)
 
 
+@content_conditional
+@cache_content_response
 def api_objects(request):
     objects = (
         BoardObject.objects
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from tracking.models import ActivityEvent, LearningState
+from tracking import ratelimit
+from tracking.models import ActivityAggregate, ActivityEvent, DailyActivity, LearningState, SyncRateLimit
 
 
 @admin.register(ActivityEvent)
@@ -15,3 +16,38 @@ class LearningStateAdmin(admin.ModelAdmin):
     list_display = ['user', 'app_label', 'item_key', 'updated_at']
     list_filter = ['app_label']
     search_fields = ['user__username', 'item_key']
+
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'app_label', 'day', 'trials', 'active_ms']
+    list_filter = ['app_label']
+    search_fields = ['user__username']
+
+
+@admin.register(ActivityAggregate)
+class ActivityAggregateAdmin(admin.ModelAdmin):
+    list_display = ['user', 'app_label', 'event_type', 'day', 'count', 'magnitude']
+    list_filter = ['app_label', 'event_type']
+    search_fields = ['user__username']
+
+
+@admin.register(SyncRateLimit)
+class SyncRateLimitAdmin(admin.ModelAdmin):
+    """Read-only: each user's sync token bucket, as tracking.ratelimit sees it right now."""
+
+    list_display = ['username', 'tokens_now']
+    search_fields = ['username']
+
+    @admin.display(description='Tokens now')
+    def tokens_now(self, obj):
+        return f'{ratelimit.tokens([obj.pk])[obj.pk]:.1f} / {ratelimit.BURST}'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
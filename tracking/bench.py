@@ -0,0 +1,187 @@
+"""`manage.py bench tracking` scenarios: sync ingestion, state pulls, dashboard.
+
+Synthetic learners get `history_days` of trial/active_time events across a
+few apps (rolled up like real ones) plus `states_per_user` LearningState
+rows, then each scenario replays one request shape against them.
+"""
+import gzip
+import json
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.utils import timezone
+
+from core.bench import Scenario
+from tracking import ratelimit, rollups
+from tracking.models import ActivityEvent, LearningState
+
+WRITE_ALIASES = ['default']
+
+BENCH_APPS = ['infinitesentences', 'tprboard', 'egyptiansentences', 'boringwords']
+STATE_APP = 'infinitesentences'
+
+
+@contextmanager
+def environment(params):
+    # The per-user sync limit would turn most of a load test into 429s; measure it only on request.
+    if params.get('with_ratelimit'):
+        yield
+    else:
+        with mock.patch.object(ratelimit, 'take', return_value=None):
+            yield
+
+
+def _seed_user(username, params, rng):
+    user = get_user_model().objects.create_user(username, password=None)
+    now = timezone.now()
+    events = []
+    for day in range(params['history_days']):
+        for _ in range(params['events_per_day']):
+            is_trial = rng.random() < 0.9
+            events.append(ActivityEvent(
+                user=user,
+                app_label=rng.choice(BENCH_APPS),
+                event_type='trial' if is_trial else 'active_time',
+                occurred_at=now - timedelta(days=day, seconds=rng.randrange(86400)),
+                client_uuid=uuid.uuid4(),
+                magnitude=1 if is_trial else rng.randrange(1000, 120_000),
+                payload={'rating': rng.randrange(1, 5)} if is_trial else None,
+            ))
+    ActivityEvent.objects.bulk_create(events, batch_size=2000)
+    LearningState.objects.bulk_create(
+        (
+            LearningState(
+                user=user, app_label=STATE_APP, item_key=f'card-{index}',
+                state={'due': now.isoformat(), 'stability': rng.random() * 30, 'reps': rng.randrange(20)},
+                updated_at=now - timedelta(minutes=index),
+            )
+            for index in range(params['states_per_user'])
+        ),
+        batch_size=2000,
+    )
+    return user
+
+
+def _logged_in_clients(users):
+    def prepare(count):
+        clients = []
+        for index in range(count):
+            client = Client()
+            client.force_login(users[index % len(users)])
+            clients.append(client)
+        return clients
+    return prepare
+
+
+def _events(count, rng):
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            'client_uuid': str(uuid.uuid4()),
+            'app_label': rng.choice(BENCH_APPS),
+            'event_type': 'trial',
+            'occurred_at': now_ms - rng.randrange(60_000),
+            'magnitude': 1,
+            'payload': None,
+        }
+        for _ in range(count)
+    ]
+
+
+def _columnar(events):
+    strings = sorted({event['app_label'] for event in events} | {event['event_type'] for event in events})
+    index = {value: position for position, value in enumerate(strings)}
+    return {
+        'strings': strings,
+        'events': {
+            'client_uuid': [event['client_uuid'] for event in events],
+            'app_label': [index[event['app_label']] for event in events],
+            'event_type': [index[event['event_type']] for event in events],
+            'occurred_at': [event['occurred_at'] for event in events],
+        },
+        'states': [],
+    }
+
+
+def _states(count, rng):
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            'app_label': STATE_APP,
+            'item_key': f'card-{rng.randrange(count * 5)}',
+            'state': {'stability': rng.random() * 30, 'reps': rng.randrange(20)},
+            'updated_at': now_ms,
+        }
+        for _ in range(count)
+    ]
+
+
+def scenarios(params):
+    rng = random.Random(params.get('seed', 0))
+    users = [_seed_user(f'bench-{index}', params, rng) for index in range(params['users'])]
+    rollups.rebuild([user.pk for user in users])
+    prepare = _logged_in_clients(users)
+
+    def post_json(client, body, **extra):
+        return client.post('/tracking/sync/', body, content_type='application/json', **extra)
+
+    retry_batch = json.dumps({'events': _events(500, rng), 'states': []})
+    state_url = f'/tracking/state/{STATE_APP}/'
+
+    def prepare_with_etag(count):
+        clients = prepare(count)
+        for client in clients:
+            client.bench_etag = client.get(state_url)['ETag']
+        return clients
+
+    return [
+        Scenario(
+            'sync-rows-500', 'POST 500 new events, row-shaped JSON',
+            lambda client, number: post_json(client, json.dumps({'events': _events(500, rng), 'states': []})),
+            prepare,
+        ),
+        Scenario(
+            'sync-columnar-gzip-500', 'POST 500 new events, columnar + gzip',
+            lambda client, number: post_json(
+                client, gzip.compress(json.dumps(_columnar(_events(500, rng))).encode()),
+                HTTP_CONTENT_ENCODING='gzip',
+            ),
+            prepare,
+        ),
+        Scenario(
+            'sync-retry-500', 'POST the same 500 already-stored events again (client retry)',
+            lambda client, number: post_json(client, retry_batch),
+            prepare,
+        ),
+        Scenario(
+            'sync-states-200', 'POST 200 state updates',
+            lambda client, number: post_json(client, json.dumps({'events': [], 'states': _states(200, rng)})),
+            prepare,
+        ),
+        Scenario(
+            'state-full', f'GET every {STATE_APP} state',
+            lambda client, number: client.get(state_url),
+            prepare,
+        ),
+        Scenario(
+            'state-not-modified', f'GET {STATE_APP} state with a matching If-None-Match',
+            lambda client, number: client.get(state_url, HTTP_IF_NONE_MATCH=client.bench_etag),
+            prepare_with_etag,
+        ),
+        Scenario(
+            'export-ndjson', 'Stream every state as NDJSON',
+            lambda client, number: client.get('/tracking/export/'),
+            prepare,
+        ),
+        Scenario(
+            'dashboard', 'GET the account page (30-day activity dashboard)',
+            lambda client, number: client.get('/accounts/profile/'),
+            prepare,
+        ),
+    ]
@@ -0,0 +1,56 @@
+"""Applying a validated sync batch to the database.
+
+Shared by tracking.views.sync (inline mode) and drain_tracking_spool (spool
+mode, see tracking.spool), so both paths dedupe, roll up and merge
+identically. Applying the same batch twice is a no-op the second time -
+events dedupe by client_uuid and states merge last-writer-wins - which is
+what makes spool replay after a crash safe.
+
+Once a batch commits, its client_uuids go into tracking.recent, so the next
+retry of it is answered from that cache without reaching store_events.
+"""
+from django.db import transaction
+
+from tracking import recent, rollups
+from tracking.models import ActivityEvent
+from tracking.states import merge_states
+
+
+def store_events(event_objs):
+    """Insert the events the server doesn't have yet; returns the ones inserted."""
+    if not event_objs:
+        return []
+
+    # Clients retry unacknowledged batches, so drop events we already have (and in-batch
+    # repeats) up front - only genuinely new events may be added to the dashboard rollup.
+    # A client_uuid is only unique per user, so it is matched together with its owner.
+    with transaction.atomic():
+        known = set(
+            ActivityEvent.objects
+            .filter(
+                user_id__in={event.user_id for event in event_objs},
+                client_uuid__in=[event.client_uuid for event in event_objs],
+            )
+            .values_list('user_id', 'client_uuid')
+        )
+        new_events = list({
+            (event.user_id, event.client_uuid): event
+            for event in event_objs if (event.user_id, event.client_uuid) not in known
+        }.values())
+        ActivityEvent.objects.bulk_create(new_events, ignore_conflicts=True)
+        rollups.apply_events(new_events)
+    return new_events
+
+
+def apply_batch(user, event_objs, entries):
+    """Store a batch's events and merge its state entries.
+
+    Returns `(new_events, merged_rows)`: the events actually inserted (see
+    store_events) and merge_states' rows.
+    """
+    new_events = store_events(event_objs)
+    client_uuids = [event.client_uuid for event in event_objs]
+    # Only committed uuids may short-circuit a retry - the drain command applies several
+    # batches per transaction, and a rollback must leave them retryable.
+    transaction.on_commit(lambda: recent.remember(user.pk, client_uuids))
+    return new_events, merge_states(user, entries)
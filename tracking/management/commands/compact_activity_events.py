@@ -0,0 +1,80 @@
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracking import retention
+from tracking.views import DASHBOARD_WINDOW_DAYS
+
+
+class Command(BaseCommand):
+    help = (
+        'Retention for tracking.ActivityEvent: archive bulky payloads off events older '
+        'than --payload-days, then fold events older than --horizon-days into per-day '
+        'ActivityAggregate rows and delete them. Works in bounded chunks (one short '
+        'transaction each) so it is safe to run against a live site; scheduled daily by '
+        'deploy/tracking-retention.timer.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days', type=int, default=180,
+            help='Compact events that occurred more than this many days ago.',
+        )
+        parser.add_argument(
+            '--payload-days', type=int, default=DASHBOARD_WINDOW_DAYS,
+            help='Offload payloads of events that occurred more than this many days ago.',
+        )
+        parser.add_argument(
+            '--min-payload-bytes', type=int, default=256,
+            help='Only offload payloads at least this large (serialized JSON bytes).',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            help=(
+                'Directory for the gzip JSONL archive of removed payloads. Without it, '
+                'payload offloading is skipped and compaction drops payloads.'
+            ),
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Events per transaction.')
+
+    def handle(self, *args, **options):
+        if options['horizon_days'] < DASHBOARD_WINDOW_DAYS:
+            raise CommandError(f'--horizon-days must be at least {DASHBOARD_WINDOW_DAYS} (the dashboard window).')
+
+        now = timezone.now()
+        # Cut at local midnight so a day is either fully compacted or not at all.
+        today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        horizon = today_start - timedelta(days=options['horizon_days'])
+        payload_horizon = today_start - timedelta(days=options['payload_days'])
+
+        archive = None
+        if options['archive_dir']:
+            archive_dir = Path(options['archive_dir'])
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            archive_path = archive_dir / f'activity-payloads-{now:%Y%m%dT%H%M%S}.jsonl.gz'
+            archive = retention.PayloadArchive(archive_path)
+
+        size_before = retention.storage_bytes()
+
+        if archive is not None:
+            stripped, stripped_bytes = retention.offload_payloads(
+                payload_horizon, archive, options['min_payload_bytes'], options['chunk_size'],
+            )
+            self.stdout.write(f'Offloaded {stripped} payloads ({stripped_bytes} bytes) to {archive.path}.')
+        else:
+            self.stdout.write('No --archive-dir given, skipping payload offloading.')
+
+        compacted, compacted_bytes = retention.compact_events(horizon, archive, options['chunk_size'])
+        self.stdout.write(
+            f'Compacted {compacted} events older than {horizon.date()} '
+            f'({compacted_bytes} payload bytes {"archived" if archive else "dropped"}).'
+        )
+
+        size_after = retention.storage_bytes()
+        if size_before is not None and size_after is not None:
+            self.stdout.write(self.style.SUCCESS(
+                f'Storage in use: {size_before} -> {size_after} bytes '
+                f'({size_before - size_after} reclaimed).'
+            ))
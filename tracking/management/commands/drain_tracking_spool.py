@@ -0,0 +1,109 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, OperationalError, transaction
+
+from tracking import spool
+from tracking.ingest import apply_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply sync batches queued in the tracking spool (settings.TRACKING_SPOOL_PATH) '
+        'to the database, oldest first, in large transactions. Runs once until the spool '
+        'is empty, or forever with --loop (see deploy/tracking-drain.service).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batches-per-transaction', type=int, default=200,
+            help='How many spooled sync batches to apply per database transaction.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the spool instead of exiting once it is empty.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Seconds to sleep between polls of an empty spool in --loop mode.',
+        )
+
+    def handle(self, *args, **options):
+        if not spool.enabled():
+            raise CommandError('TRACKING_SPOOL_PATH is not set - there is no spool to drain.')
+
+        with spool.drain_lock():
+            while True:
+                try:
+                    applied = self._drain(options['batches_per_transaction'])
+                except OperationalError as exc:
+                    # Locked or unreachable database: transient, and the batches are still spooled.
+                    if not options['loop']:
+                        raise CommandError(f'Database unavailable, {spool.pending_count()} batches left spooled: {exc}')
+                    self.stderr.write(f'Database unavailable, retrying: {exc}')
+                    time.sleep(options['interval'])
+                    continue
+                if applied:
+                    self.stdout.write(f'Applied {applied} spooled batches.')
+                elif not options['loop']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+
+    def _drain(self, limit):
+        """Apply spooled batches until the spool is empty; returns how many were applied.
+
+        A batch that fails to decode, or whose data the database rejects, is
+        moved to the spool's dead_batch table. An OperationalError propagates
+        with every batch not yet committed still spooled.
+        """
+        applied = 0
+        while rows := spool.peek(limit):
+            users = get_user_model().objects.in_bulk({user_id for _, user_id, _ in rows})
+            batches, failures = [], []
+            for row in rows:
+                try:
+                    batches.append((row, self._decode(users, row)))
+                except (ValueError, KeyError, TypeError) as exc:
+                    failures.append((row, exc))
+
+            try:
+                with transaction.atomic():
+                    for _, batch in batches:
+                        self._apply(batch)
+            except OperationalError:
+                raise
+            except DatabaseError:
+                # Some batch's data is rejected outright - apply one by one to set just it aside.
+                for row, batch in batches:
+                    try:
+                        with transaction.atomic():
+                            self._apply(batch)
+                    except OperationalError:
+                        self._settle([failure for failure in failures if failure[0][0] < row[0]], row[0] - 1)
+                        raise
+                    except DatabaseError as exc:
+                        failures.append((row, exc))
+
+            self._settle(failures, rows[-1][0])
+            applied += len(rows) - len(failures)
+        return applied
+
+    def _settle(self, failures, spool_id):
+        """Dead-letter `failures`, then drop every batch through `spool_id` from the spool."""
+        for (failed_id, _, _), exc in failures:
+            self.stderr.write(f'Dead-lettering spooled batch {failed_id}: {exc}')
+        spool.dead_letter(failures)
+        spool.discard_through(spool_id)
+
+    def _decode(self, users, row):
+        _, user_id, body = row
+        user = users.get(user_id)
+        if user is None:
+            return None  # Account deleted since the batch was queued.
+        return (user, *spool.decode(user, body))
+
+    def _apply(self, batch):
+        if batch is not None:
+            apply_batch(*batch)
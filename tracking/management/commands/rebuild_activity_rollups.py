@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from tracking import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the DailyActivity dashboard rollup from raw ActivityEvent rows. '
+        'Run once after deploying the rollup table to backfill existing history; '
+        'safe to rerun at any time to reconcile drift.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only rebuild this user id (repeatable). Defaults to every user.',
+        )
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} daily activity rollup rows.'))
@@ -0,0 +1,25 @@
+# Generated by Django 6.1.2 on 2026-10-17 17:12
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0002_daily_activity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learningstate',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='learningstate',
+            index=models.Index(fields=['user', 'app_label', 'changed_at'], name='tracking_le_user_id_9991da_idx'),
+        ),
+    ]
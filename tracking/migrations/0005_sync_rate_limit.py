@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-17 18:52
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # An earlier table-backed bucket model, added and then dropped again: a database that ran
+    # those two is already where this one leaves it.
+    replaces = [('tracking', '0005_sync_rate_bucket'), ('tracking', '0006_delete_sync_rate_bucket')]
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('tracking', '0004_activity_aggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRateLimit',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'sync rate limit',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('accounts.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
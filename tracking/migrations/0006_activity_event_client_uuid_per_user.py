@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-17 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0005_sync_rate_limit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activityevent',
+            name='client_uuid',
+            field=models.UUIDField(),
+        ),
+        migrations.AddConstraint(
+            model_name='activityevent',
+            constraint=models.UniqueConstraint(fields=('user', 'client_uuid'), name='unique_activity_event_client_uuid'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+from accounts.models import User
 
 
 class ActivityEvent(models.Model):
@@ -7,11 +10,16 @@ class ActivityEvent(models.Model):
     app_label = models.CharField(max_length=64)
     event_type = models.CharField(max_length=64)
     occurred_at = models.DateTimeField()
-    client_uuid = models.UUIDField(unique=True)
+    # Generated by the client, so only unique per user: another user's device can't
+    # collide with - or suppress - this user's events.
+    client_uuid = models.UUIDField()
     magnitude = models.FloatField(default=1)
     payload = models.JSONField(blank=True, null=True)
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_uuid'], name='unique_activity_event_client_uuid'),
+        ]
         indexes = [
             models.Index(fields=['user', 'app_label', 'event_type', 'occurred_at']),
         ]
@@ -25,12 +33,80 @@ class LearningState(models.Model):
     app_label = models.CharField(max_length=64)
     item_key = models.CharField(max_length=255)
     state = models.JSONField()
+    # Client clock - drives last-writer-wins merging between devices.
     updated_at = models.DateTimeField()
+    # Server clock at the last write that changed this row - drives delta pulls
+    # (tracking.views.state?since=...). `updated_at` can't: an offline device can
+    # sync a write whose client timestamp is older than a cursor already handed out.
+    changed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['user', 'app_label', 'item_key'], name='unique_learning_state_item'),
         ]
+        indexes = [
+            models.Index(fields=['user', 'app_label', 'changed_at']),
+        ]
 
     def __str__(self):
         return f'{self.user_id}:{self.app_label}:{self.item_key}'
+
+
+class DailyActivity(models.Model):
+    """Per-user/per-app/per-day rollup of the 'trial' and 'active_time' events.
+
+    Maintained incrementally by tracking.views.sync as batches come in, so the
+    dashboard reads at most DASHBOARD_WINDOW_DAYS rows per app instead of
+    aggregating raw ActivityEvent rows. `rebuild_activity_rollups` recomputes
+    it from scratch (backfill, or to reconcile drift).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_activity')
+    app_label = models.CharField(max_length=64)
+    day = models.DateField()
+    trials = models.FloatField(default=0)
+    active_ms = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day', 'app_label'], name='unique_daily_activity'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.app_label}@{self.day}'
+
+
+class ActivityAggregate(models.Model):
+    """Per-user/per-app/per-type daily totals of ActivityEvent rows past the retention horizon.
+
+    Written by `compact_activity_events`, which deletes the raw events it
+    folds in here, so history (including the dashboard rollup, see
+    tracking.rollups.rebuild) survives compaction at a fraction of the size.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_aggregates')
+    app_label = models.CharField(max_length=64)
+    event_type = models.CharField(max_length=64)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    magnitude = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'app_label', 'event_type'], name='unique_activity_aggregate',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.app_label}:{self.event_type}@{self.day}'
+
+
+class SyncRateLimit(User):
+    """A user as seen by tracking.ratelimit, for the admin's list of sync token buckets.
+
+    The buckets live in the 'tracking' cache rather than a table, so this
+    proxy only gives the admin something to list them against.
+    """
+
+    class Meta:
+        proxy = True
+        verbose_name = 'sync rate limit'
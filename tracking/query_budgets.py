@@ -0,0 +1,32 @@
+"""Query budgets for tracking's views (see core.query_budgets)."""
+import json
+import time
+import uuid
+
+from core.query_budgets import Budget
+
+
+def _sync_batch():
+    now_ms = int(time.time() * 1000)
+    return json.dumps({
+        'events': [
+            {
+                'client_uuid': str(uuid.uuid4()), 'app_label': 'tprboard', 'event_type': 'trial',
+                'occurred_at': now_ms - index, 'magnitude': 1, 'payload': None,
+            }
+            for index in range(20)
+        ],
+        'states': [
+            {'app_label': 'tprboard', 'item_key': f'card-{index}', 'state': {'reps': 1}, 'updated_at': now_ms}
+            for index in range(5)
+        ],
+    })
+
+
+BUDGETS = {
+    'sync': Budget({'default': 14}, user='learner', method='post', data=_sync_batch, content_type='application/json'),
+    'state': Budget({'default': 4}, args=('infinitesentences',), user='learner'),
+    'export': Budget({'default': 3}, user='learner'),
+    # Redirects to the account page, which renders the dashboard.
+    'dashboard': Budget({'default': 2}, user='learner', status=302),
+}
@@ -0,0 +1,75 @@
+"""Per-user token-bucket rate limit for tracking.views.sync.
+
+Each sync spends one token; tokens refill at RATE_PER_SECOND up to BURST.
+A user's bucket is one `(tokens, refilled_at)` entry in the 'tracking'
+cache - a directory every gunicorn worker shares (see settings.CACHES) - so
+the check adds no database write to the request path, spool mode included.
+The entry expires once the bucket would have refilled anyway, and a missing
+entry is a full bucket.
+
+The file-based cache has no atomic read-modify-write, so `take` holds an
+exclusive flock on LOCK_NAME in settings.CACHE_DIR around one: concurrent
+syncs from different workers queue for it rather than spending the same
+token twice.
+"""
+import fcntl
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+# A well-behaved client flushes every 90 s plus on tab hide/unload, so a burst of 20 with one
+# token back every 5 s leaves real users untouched while capping a runaway retry loop.
+BURST = 20
+RATE_PER_SECOND = 0.2
+
+LOCK_NAME = 'tracking-ratelimit.lock'
+
+# Seconds an untouched bucket takes to refill completely, after which its entry can go.
+_FULL_AFTER = math.ceil(BURST / RATE_PER_SECOND)
+
+
+def _key(user_id):
+    return f'tracking:sync-bucket:{user_id}'
+
+
+@contextmanager
+def _locked():
+    settings.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Opened per call: flock excludes other open files, so threads of one worker exclude each other too.
+    with open(settings.CACHE_DIR / LOCK_NAME, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _level(entry, now):
+    if entry is None:
+        return float(BURST)
+    tokens, refilled_at = entry
+    return min(float(BURST), tokens + (now - refilled_at) * RATE_PER_SECOND)
+
+
+def tokens(user_ids):
+    """`{user id: tokens in their bucket now}` for `user_ids`, without spending any."""
+    now = time.time()
+    entries = caches['tracking'].get_many([_key(user_id) for user_id in user_ids])
+    return {user_id: _level(entries.get(_key(user_id)), now) for user_id in user_ids}
+
+
+def take(user, cost=1):
+    """Spend `cost` tokens from `user`'s bucket.
+
+    Returns None if allowed, or the number of seconds until enough tokens
+    will have refilled if not.
+    """
+    cache = caches['tracking']
+    key = _key(user.pk)
+    with _locked():
+        now = time.time()
+        available = _level(cache.get(key), now)
+        if available < cost:
+            return max(1, math.ceil((cost - available) / RATE_PER_SECOND))
+        cache.set(key, (available - cost, now), _FULL_AFTER)
+    return None
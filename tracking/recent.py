@@ -0,0 +1,45 @@
+"""Per-user cache of recently committed ActivityEvent client_uuids.
+
+Clients retry unacknowledged batches (and the unload beacon re-sends
+whatever a fetch flush may already have delivered), so many syncs repeat
+events the server already has. tracking.views.sync checks incoming uuids
+against this cache and drops hits before building any ActivityEvent or
+querying the events table.
+
+It's only a hint, so it needs to be shared across gunicorn workers (the
+'tracking' cache in settings.CACHES is a directory they all read) but never
+exact: an evicted uuid, or one lost to two workers updating the same user at
+once, just falls through to store_events' database dedupe.
+"""
+from django.core.cache import caches
+
+# Four full MAX_EVENTS_PER_SYNC batches - retries resend the oldest unacknowledged events first.
+CAPACITY = 2000
+TIMEOUT = 24 * 60 * 60
+UUID_BYTES = 16
+
+
+def _key(user_id):
+    return f'tracking:recent-uuids:{user_id}'
+
+
+def _split(blob):
+    return [blob[offset:offset + UUID_BYTES] for offset in range(0, len(blob), UUID_BYTES)]
+
+
+def seen(user_id):
+    """`uuid.UUID.bytes` of the client_uuids recently committed for `user_id`, as a set."""
+    return set(_split(caches['tracking'].get(_key(user_id)) or b''))
+
+
+def remember(user_id, client_uuids):
+    """Record committed `client_uuids` for `user_id`, keeping only the newest CAPACITY."""
+    cache = caches['tracking']
+    blob = cache.get(_key(user_id)) or b''
+    already = set(_split(blob))
+    added = {value.bytes: None for value in client_uuids if value.bytes not in already}
+    if not added:
+        return
+    # Fixed-width concatenated uuid bytes, oldest first: trimming to CAPACITY is one slice.
+    blob = (blob + b''.join(added))[-CAPACITY * UUID_BYTES:]
+    cache.set(_key(user_id), blob, TIMEOUT)
@@ -0,0 +1,135 @@
+"""Retention for ActivityEvent: payload offloading and compaction.
+
+Both passes walk the table in primary-key order, one bounded chunk per
+transaction, so neither holds a lock for longer than one chunk takes.
+Payloads leaving the database are first appended to a gzip'd JSONL archive
+(and fsynced) before the transaction that strips or deletes them commits -
+a crash in between leaves a duplicate archive line, never a lost payload.
+"""
+import gzip
+import json
+import os
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from tracking.models import ActivityAggregate, ActivityEvent
+from tracking.rollups import increment
+
+
+class PayloadArchive:
+    """Append-only gzip'd JSONL file of payloads removed from ActivityEvent rows."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, events):
+        lines = [
+            json.dumps({
+                'client_uuid': str(event.client_uuid),
+                'user_id': event.user_id,
+                'app_label': event.app_label,
+                'event_type': event.event_type,
+                'occurred_at': event.occurred_at.isoformat(),
+                'payload': event.payload,
+            }) + '\n'
+            for event in events
+        ]
+        if not lines:
+            return 0
+        # One gzip member per chunk - concatenated members are still one valid .gz file.
+        with gzip.open(self.path, 'at', encoding='utf-8') as archive:
+            archive.writelines(lines)
+        with open(self.path, 'rb') as archive:
+            os.fsync(archive.fileno())
+        return len(lines)
+
+
+def _payload_bytes(payload):
+    return len(json.dumps(payload).encode()) if payload is not None else 0
+
+
+def _chunks(queryset, chunk_size):
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_id).order_by('pk')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].pk
+
+
+def offload_payloads(before, archive, min_bytes, chunk_size):
+    """Move payloads of at least `min_bytes` off events older than `before`.
+
+    Returns `(events_stripped, payload_bytes_removed)`.
+    """
+    stripped = removed_bytes = 0
+    events = ActivityEvent.objects.filter(occurred_at__lt=before, payload__isnull=False)
+    for chunk in _chunks(events, chunk_size):
+        bulky = [event for event in chunk if _payload_bytes(event.payload) >= min_bytes]
+        if not bulky:
+            continue
+        archive.write(bulky)
+        with transaction.atomic():
+            ActivityEvent.objects.filter(pk__in=[event.pk for event in bulky]).update(payload=None)
+        stripped += len(bulky)
+        removed_bytes += sum(_payload_bytes(event.payload) for event in bulky)
+    return stripped, removed_bytes
+
+
+def compact_events(before, archive, chunk_size):
+    """Fold events older than `before` into ActivityAggregate and delete them.
+
+    Payloads still on those events go to `archive` first (or are dropped if
+    it's None). Returns `(events_compacted, payload_bytes_removed)`.
+    """
+    compacted = removed_bytes = 0
+    for chunk in _chunks(ActivityEvent.objects.filter(occurred_at__lt=before), chunk_size):
+        with_payload = [event for event in chunk if event.payload is not None]
+        if archive is not None:
+            archive.write(with_payload)
+
+        totals = defaultdict(lambda: {'count': 0, 'magnitude': 0.0})
+        for event in chunk:
+            key = (event.user_id, event.app_label, event.event_type, timezone.localdate(event.occurred_at))
+            totals[key]['count'] += 1
+            totals[key]['magnitude'] += event.magnitude
+
+        with transaction.atomic():
+            for (user_id, app_label, event_type, day), deltas in totals.items():
+                increment(
+                    ActivityAggregate, deltas,
+                    user_id=user_id, app_label=app_label, event_type=event_type, day=day,
+                )
+            ActivityEvent.objects.filter(pk__in=[event.pk for event in chunk]).delete()
+
+        compacted += len(chunk)
+        removed_bytes += sum(_payload_bytes(event.payload) for event in with_payload)
+    return compacted, removed_bytes
+
+
+def storage_bytes():
+    """Bytes the ActivityEvent table currently occupies, or None if the backend can't say.
+
+    On Postgres this is the table + index size (deleted rows only leave it
+    once autovacuum has processed the table); on SQLite (where per-table
+    size isn't cheaply available) it's the in-use size of the whole database
+    file, i.e. excluding free pages that deletes have made reusable.
+    """
+    db = router.db_for_write(ActivityEvent)
+    connection = connections[db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_total_relation_size(%s)', [ActivityEvent._meta.db_table])
+            return cursor.fetchone()[0]
+        if connection.vendor == 'sqlite':
+            cursor.execute('PRAGMA page_size')
+            page_size = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_count')
+            page_count = cursor.fetchone()[0]
+            cursor.execute('PRAGMA freelist_count')
+            free_pages = cursor.fetchone()[0]
+            return (page_count - free_pages) * page_size
+    return None
@@ -0,0 +1,95 @@
+"""Incremental maintenance of the DailyActivity rollup behind the dashboard.
+
+`sync` calls `apply_events` with only the events it actually inserted (retried
+batches re-send events the server already has), so each event is counted
+once. `rebuild` recomputes rows from ActivityEvent history (raw events plus
+compacted ActivityAggregate rows, see tracking.retention), for the initial
+backfill and to reconcile any drift (e.g. two tabs racing the same
+retried batch past the duplicate check).
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from tracking.models import ActivityAggregate, ActivityEvent, DailyActivity
+
+# event_type -> DailyActivity field it's summed into.
+ROLLUP_FIELDS = {
+    'trial': 'trials',
+    'active_time': 'active_ms',
+}
+
+
+def increment(model, deltas, **lookup):
+    """Add `deltas` onto the counter fields of the `model` row matching `lookup`, creating it if needed."""
+    updated = model.objects.filter(**lookup).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another request created the row between our update and insert - add onto theirs.
+        increment(model, deltas, **lookup)
+
+
+def apply_events(events):
+    """Add freshly inserted ActivityEvent objects (saved or not) to the rollup."""
+    totals = defaultdict(lambda: defaultdict(float))
+    for event in events:
+        field = ROLLUP_FIELDS.get(event.event_type)
+        if field is None:
+            continue
+        day = timezone.localdate(event.occurred_at)
+        totals[(event.user_id, event.app_label, day)][field] += event.magnitude
+
+    for (user_id, app_label, day), deltas in totals.items():
+        increment(DailyActivity, dict(deltas), user_id=user_id, app_label=app_label, day=day)
+
+
+def rebuild(user_ids=None):
+    """Recompute DailyActivity from raw events plus compacted ActivityAggregate
+    rows, for every user or just `user_ids`.
+
+    Returns the number of rollup rows written.
+    """
+    events = ActivityEvent.objects.filter(event_type__in=ROLLUP_FIELDS)
+    aggregates = ActivityAggregate.objects.filter(event_type__in=ROLLUP_FIELDS)
+    rollups = DailyActivity.objects.all()
+    if user_ids is not None:
+        events = events.filter(user_id__in=user_ids)
+        aggregates = aggregates.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    event_rows = (
+        events
+        .annotate(day=TruncDate('occurred_at'))
+        .values('user_id', 'app_label', 'day', 'event_type')
+        .annotate(total=Sum('magnitude'))
+        .order_by()
+    )
+    aggregate_rows = aggregates.values('user_id', 'app_label', 'day', 'event_type', total=F('magnitude'))
+
+    # A compacted day can still gain raw events (a device syncing long-offline history), so
+    # both sources may contribute to the same rollup row.
+    totals = defaultdict(lambda: defaultdict(float))
+    for source in (event_rows, aggregate_rows):
+        for row in source.iterator():
+            key = (row['user_id'], row['app_label'], row['day'])
+            totals[key][ROLLUP_FIELDS[row['event_type']]] += row['total']
+
+    with transaction.atomic():
+        rollups.delete()
+        created = DailyActivity.objects.bulk_create(
+            (
+                DailyActivity(user_id=user_id, app_label=app_label, day=day, **fields)
+                for (user_id, app_label, day), fields in totals.items()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
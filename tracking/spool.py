@@ -0,0 +1,156 @@
+"""Optional durable spool between tracking.views.sync and the database.
+
+When settings.TRACKING_SPOOL_PATH is set, `sync` only validates a batch,
+appends it here and answers 202 - no ActivityEvent/LearningState writes on
+the request path. `drain_tracking_spool` later applies spooled batches in
+arrival order (so per-user ordering holds) inside large transactions.
+
+The spool is its own WAL-mode SQLite file with synchronous=FULL, so a batch
+acknowledged with 202 survives a crash. A batch is only deleted from the
+spool after the transaction applying it has committed; if the drainer dies
+in between, the batch is applied again on the next run, which is harmless
+(see tracking.ingest). A batch that can never apply (it fails to decode, or
+the database rejects its data) is moved to the `dead_batch` table of the
+same file, with the error, rather than deleted.
+"""
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+
+from tracking.models import ActivityEvent
+
+_local = threading.local()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_batch (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    error TEXT NOT NULL,
+    failed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def enabled():
+    return bool(getattr(settings, 'TRACKING_SPOOL_PATH', None))
+
+
+def _connect():
+    # One connection per thread per process - gunicorn forks workers after import, and sqlite3
+    # connections must not cross a fork.
+    connection = getattr(_local, 'connection', None)
+    if connection is not None and _local.pid == os.getpid():
+        return connection
+
+    connection = sqlite3.connect(settings.TRACKING_SPOOL_PATH, timeout=30, isolation_level=None)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=FULL')
+    connection.executescript(SCHEMA)
+    _local.connection, _local.pid = connection, os.getpid()
+    return connection
+
+
+def _encode(event_objs, entries):
+    return json.dumps({
+        'events': [
+            {
+                'app_label': event.app_label,
+                'event_type': event.event_type,
+                'occurred_at': event.occurred_at.isoformat(),
+                'client_uuid': str(event.client_uuid),
+                'magnitude': event.magnitude,
+                'payload': event.payload,
+            }
+            for event in event_objs
+        ],
+        'states': [
+            [app_label, item_key, value, updated_at.isoformat()]
+            for app_label, item_key, value, updated_at in entries
+        ],
+    })
+
+
+def decode(user, body):
+    """Rebuild `(event_objs, entries)` for `user` from a spooled body."""
+    data = json.loads(body)
+    event_objs = [
+        ActivityEvent(
+            user=user,
+            app_label=event['app_label'],
+            event_type=event['event_type'],
+            occurred_at=datetime.fromisoformat(event['occurred_at']),
+            client_uuid=uuid.UUID(event['client_uuid']),
+            magnitude=event['magnitude'],
+            payload=event['payload'],
+        )
+        for event in data['events']
+    ]
+    entries = [
+        (app_label, item_key, value, datetime.fromisoformat(updated_at))
+        for app_label, item_key, value, updated_at in data['states']
+    ]
+    return event_objs, entries
+
+
+def append(user_id, event_objs, entries):
+    """Durably queue an already-validated batch (as built by tracking.views.sync)."""
+    _connect().execute(
+        'INSERT INTO batch (user_id, body) VALUES (?, ?)',
+        (user_id, _encode(event_objs, entries)),
+    )
+
+
+def pending_count():
+    return _connect().execute('SELECT COUNT(*) FROM batch').fetchone()[0]
+
+
+@contextmanager
+def drain_lock():
+    """Exclusive lock so only one drainer applies batches, keeping arrival order."""
+    with open(f'{settings.TRACKING_SPOOL_PATH}.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def peek(limit):
+    """The oldest `limit` spooled batches, as `(spool_id, user_id, body)` in arrival order."""
+    return _connect().execute(
+        'SELECT id, user_id, body FROM batch ORDER BY id LIMIT ?', (limit,),
+    ).fetchall()
+
+
+def discard_through(spool_id):
+    """Forget every batch up to and including `spool_id` - call only after they're committed."""
+    _connect().execute('DELETE FROM batch WHERE id <= ?', (spool_id,))
+
+
+def dead_letter(failures):
+    """Keep `(spool_row, error)` pairs in dead_batch. Their rows must still be discarded after.
+
+    Keyed by the batch's spool id, so recording the same failure again (the
+    drainer died before discarding) just replaces it.
+    """
+    _connect().executemany(
+        'INSERT OR REPLACE INTO dead_batch (id, user_id, body, error) VALUES (?, ?, ?, ?)',
+        [(spool_id, user_id, body, str(error)) for (spool_id, user_id, body), error in failures],
+    )
+
+
+def dead_count():
+    return _connect().execute('SELECT COUNT(*) FROM dead_batch').fetchone()[0]
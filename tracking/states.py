@@ -0,0 +1,70 @@
+"""Set-based last-writer-wins merge of a sync batch into LearningState.
+
+A whole batch is merged with one `INSERT ... ON CONFLICT ... DO UPDATE ...
+WHERE excluded.updated_at > updated_at` statement (supported identically by
+SQLite >= 3.24 and Postgres) plus one SELECT to read back the winning rows.
+The conflict check happens inside the database, so concurrent tabs can't
+race the way a read-then-write loop could on SQLite, where
+select_for_update() is a no-op.
+"""
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from tracking.models import LearningState
+
+UPSERT_COLUMNS = ['user', 'app_label', 'item_key', 'state', 'updated_at', 'changed_at']
+
+
+def _upsert_sql(connection, row_count):
+    quote = connection.ops.quote_name
+    table = quote(LearningState._meta.db_table)
+    columns = [quote(LearningState._meta.get_field(name).column) for name in UPSERT_COLUMNS]
+    placeholders = ', '.join([f'({", ".join(["%s"] * len(columns))})'] * row_count)
+    user_col, app_label_col, item_key_col, state_col, updated_at_col, changed_at_col = columns
+    return (
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES {placeholders} '
+        f'ON CONFLICT ({user_col}, {app_label_col}, {item_key_col}) DO UPDATE SET '
+        f'{state_col} = excluded.{state_col}, {updated_at_col} = excluded.{updated_at_col}, '
+        f'{changed_at_col} = excluded.{changed_at_col} '
+        f'WHERE excluded.{updated_at_col} > {table}.{updated_at_col}'
+    )
+
+
+def merge_states(user, entries):
+    """Merge `(app_label, item_key, state, updated_at)` tuples for `user`.
+
+    Returns the resulting LearningState rows keyed by `(app_label, item_key)`
+    - the incoming value where it was newer, the stored one otherwise.
+    """
+    # ON CONFLICT can't touch the same row twice in one statement, so collapse
+    # in-batch repeats to their newest write first.
+    latest = {}
+    for app_label, item_key, value, updated_at in entries:
+        key = (app_label, item_key)
+        if key not in latest or updated_at > latest[key][1]:
+            latest[key] = (value, updated_at)
+    if not latest:
+        return {}
+
+    db = router.db_for_write(LearningState)
+    connection = connections[db]
+    fields = [LearningState._meta.get_field(name) for name in UPSERT_COLUMNS]
+    changed_at = timezone.now()
+    params = []
+    for (app_label, item_key), (value, updated_at) in latest.items():
+        row = (user.pk, app_label, item_key, value, updated_at, changed_at)
+        params.extend(field.get_db_prep_save(item, connection) for field, item in zip(fields, row))
+
+    with transaction.atomic(using=db):
+        with connection.cursor() as cursor:
+            cursor.execute(_upsert_sql(connection, len(latest)), params)
+        rows = LearningState.objects.using(db).filter(
+            user=user,
+            app_label__in={app_label for app_label, _ in latest},
+            item_key__in={item_key for _, item_key in latest},
+        )
+        return {
+            (row.app_label, row.item_key): row
+            for row in rows
+            if (row.app_label, row.item_key) in latest
+        }
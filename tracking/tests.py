@@ -1,3 +1,691 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import math
+import tempfile
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DataError, OperationalError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.bench import percentile, run_scenario
+from tracking import bench, ratelimit, recent, retention, rollups, spool
+from tracking.ingest import apply_batch
+from tracking.models import ActivityAggregate, ActivityEvent, DailyActivity, LearningState
+from tracking.states import merge_states
+from tracking.views import CURSOR_HEADER, CURSOR_OVERLAP, DASHBOARD_WINDOW_DAYS, dashboard_data
+
+
+class BenchScenariosTest(TransactionTestCase):
+    """Smoke-runs every `manage.py bench tracking` scenario at toy scale, so a
+    view change that breaks a scenario shows up here rather than mid-benchmark."""
+
+    databases = '__all__'
+
+    params = {
+        'users': 2, 'history_days': 3, 'events_per_day': 5, 'states_per_user': 20,
+        'seed': 0, 'with_ratelimit': False,
+    }
+
+    def test_scenarios_succeed_and_report_percentiles(self):
+        with bench.environment(self.params):
+            for scenario in bench.scenarios(self.params):
+                with self.subTest(scenario=scenario.name):
+                    result = run_scenario(scenario, requests=4, concurrency=1)
+                    self.assertEqual(result['requests'], 4)
+                    self.assertTrue(set(result['statuses']) <= {'200', '304'}, result['statuses'])
+                    self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+                    self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class MergeStatesTest(TestCase):
+    """tracking.states.merge_states: one set-based last-writer-wins upsert per batch."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('learner')
+        self.t0 = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    def merge(self, *entries):
+        return merge_states(self.user, list(entries))
+
+    def stored(self, item_key):
+        return LearningState.objects.get(user=self.user, app_label='tprboard', item_key=item_key)
+
+    def test_inserts_new_items_and_returns_them(self):
+        merged = self.merge(
+            ('tprboard', 'a', {'n': 1}, self.t0),
+            ('tprboard', 'b', {'n': 2}, self.t0),
+        )
+        self.assertEqual(set(merged), {('tprboard', 'a'), ('tprboard', 'b')})
+        self.assertEqual(self.stored('a').state, {'n': 1})
+        self.assertEqual(self.stored('b').state, {'n': 2})
+
+    def test_newer_write_wins(self):
+        self.merge(('tprboard', 'a', {'n': 1}, self.t0))
+        merged = self.merge(('tprboard', 'a', {'n': 2}, self.t0 + timedelta(seconds=1)))
+        self.assertEqual(merged[('tprboard', 'a')].state, {'n': 2})
+        self.assertEqual(self.stored('a').updated_at, self.t0 + timedelta(seconds=1))
+
+    def test_older_or_equal_write_does_not_overwrite(self):
+        self.merge(('tprboard', 'a', {'n': 2}, self.t0))
+        for updated_at in (self.t0 - timedelta(seconds=1), self.t0):
+            with self.subTest(updated_at=updated_at):
+                merged = self.merge(('tprboard', 'a', {'n': 1}, updated_at))
+                # The stored value is what the client gets back, so it can adopt the winner.
+                self.assertEqual(merged[('tprboard', 'a')].state, {'n': 2})
+                self.assertEqual(self.stored('a').state, {'n': 2})
+                self.assertEqual(self.stored('a').updated_at, self.t0)
+
+    def test_in_batch_repeats_collapse_to_the_newest(self):
+        merged = self.merge(
+            ('tprboard', 'a', {'n': 3}, self.t0 + timedelta(seconds=3)),
+            ('tprboard', 'a', {'n': 1}, self.t0 + timedelta(seconds=1)),
+            ('tprboard', 'a', {'n': 2}, self.t0 + timedelta(seconds=2)),
+        )
+        self.assertEqual(merged[('tprboard', 'a')].state, {'n': 3})
+        self.assertEqual(LearningState.objects.filter(user=self.user).count(), 1)
+
+    def test_rejected_write_keeps_changed_at(self):
+        self.merge(('tprboard', 'a', {'n': 2}, self.t0))
+        changed_at = self.stored('a').changed_at
+        self.merge(('tprboard', 'a', {'n': 1}, self.t0 - timedelta(seconds=1)))
+        self.assertEqual(self.stored('a').changed_at, changed_at)
+
+    def test_other_users_rows_are_untouched(self):
+        other = get_user_model().objects.create_user('other')
+        merge_states(other, [('tprboard', 'a', {'n': 9}, self.t0 + timedelta(days=1))])
+        self.merge(('tprboard', 'a', {'n': 1}, self.t0))
+        self.assertEqual(self.stored('a').state, {'n': 1})
+        self.assertEqual(LearningState.objects.get(user=other).state, {'n': 9})
+
+    def test_empty_batch_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.merge(), {})
+
+
+class StatePullTest(TestCase):
+    """tracking.views.state: since-cursor delta pulls and ETag revalidation."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.t0 = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        for index, item_key in enumerate(['a', 'b', 'c']):
+            LearningState.objects.create(
+                user=self.user, app_label='tprboard', item_key=item_key, state={'n': index},
+                updated_at=self.t0, changed_at=self.t0 + timedelta(minutes=index),
+            )
+        self.url = reverse('tracking:state', args=['tprboard'])
+
+    def test_full_pull_returns_every_row_and_the_newest_cursor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'a', 'b', 'c'})
+        self.assertEqual(response[CURSOR_HEADER], (self.t0 + timedelta(minutes=2)).isoformat())
+
+    def test_since_returns_rows_changed_after_the_cursor_minus_the_overlap(self):
+        since = self.t0 + timedelta(minutes=1) + CURSOR_OVERLAP
+        response = self.client.get(self.url, {'since': since.isoformat()})
+        self.assertEqual(set(response.json()), {'c'})
+        # A row changed within the overlap before the cursor is re-sent.
+        response = self.client.get(self.url, {'since': (self.t0 + timedelta(minutes=1, seconds=1)).isoformat()})
+        self.assertEqual(set(response.json()), {'b', 'c'})
+
+    def test_empty_delta_hands_back_the_same_cursor(self):
+        since = (self.t0 + timedelta(hours=1)).isoformat()
+        response = self.client.get(self.url, {'since': since})
+        self.assertEqual(response.json(), {})
+        self.assertEqual(response[CURSOR_HEADER], since)
+
+    def test_unchanged_set_revalidates_to_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_a_write_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        merge_states(self.user, [('tprboard', 'd', {'n': 3}, self.t0)])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('d', response.json())
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_is_per_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(get_user_model().objects.create_user('other'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {})
+
+    def test_invalid_or_naive_cursor_is_rejected(self):
+        for since in ('yesterday', '2026-01-01T00:00:00'):
+            with self.subTest(since=since):
+                self.assertEqual(self.client.get(self.url, {'since': since}).status_code, 400)
+
+
+class ExportStatesTest(TestCase):
+    """tracking.views.export_states: NDJSON, one state per line, optionally per app."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('learner')
+        self.client.force_login(self.user)
+        self.t0 = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        merge_states(self.user, [
+            ('tprboard', 'b', {'n': 2}, self.t0),
+            ('tprboard', 'a', {'n': 1}, self.t0),
+            ('boringwords', 'x', {'n': 3}, self.t0),
+        ])
+        merge_states(get_user_model().objects.create_user('other'), [('tprboard', 'z', {'n': 9}, self.t0)])
+
+    def lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_streams_every_app_in_order(self):
+        response = self.client.get(reverse('tracking:export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Cache-Control'], 'private, no-store')
+        self.assertEqual(self.lines(response), [
+            {'app_label': 'boringwords', 'item_key': 'x', 'state': {'n': 3}, 'updated_at': self.t0.isoformat()},
+            {'app_label': 'tprboard', 'item_key': 'a', 'state': {'n': 1}, 'updated_at': self.t0.isoformat()},
+            {'app_label': 'tprboard', 'item_key': 'b', 'state': {'n': 2}, 'updated_at': self.t0.isoformat()},
+        ])
+
+    def test_app_label_filter(self):
+        response = self.client.get(reverse('tracking:export'), {'app_label': 'tprboard'})
+        self.assertEqual([line['item_key'] for line in self.lines(response)], ['a', 'b'])
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('tracking:export')).status_code, 302)
+
+
+# Sync keeps per-user state (tracking.ratelimit, tracking.recent) in the 'tracking' cache: give
+# each test a private, empty in-memory one instead of the shared .cache directory.
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tracking-tests'},
+    'tracking': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tracking-tests-sync'},
+})
+class SyncTestCase(TestCase):
+    def setUp(self):
+        caches['tracking'].clear()
+        self.user = get_user_model().objects.create_user('learner')
+        self.client.force_login(self.user)
+
+
+class SpoolDrainTest(SyncTestCase):
+    """Spool mode: sync answers 202, drain_tracking_spool applies the batch later - and never
+    loses one that was acknowledged."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(TRACKING_SPOOL_PATH=f'{directory.name}/spool.sqlite3')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.close_spool)
+
+    def close_spool(self):
+        if getattr(spool._local, 'connection', None) is not None:
+            spool._local.connection.close()
+            spool._local.connection = None
+
+    def sync(self, app_label='tprboard'):
+        event = {
+            'app_label': app_label, 'event_type': 'trial', 'occurred_at': 1767225600000,
+            'client_uuid': str(uuid.uuid4()),
+        }
+        response = self.client.post(
+            reverse('tracking:sync'), json.dumps({'events': [event]}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        return event['client_uuid']
+
+    def test_sync_is_queued_then_applied_by_drain(self):
+        client_uuid = self.sync()
+        self.assertEqual(spool.pending_count(), 1)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+        call_command('drain_tracking_spool', stdout=io.StringIO())
+        self.assertEqual(spool.pending_count(), 0)
+        self.assertEqual(str(ActivityEvent.objects.get().client_uuid), client_uuid)
+
+    def test_locked_database_leaves_batches_spooled(self):
+        self.sync()
+        self.sync()
+        with mock.patch(
+            'tracking.management.commands.drain_tracking_spool.apply_batch',
+            side_effect=OperationalError('database is locked'),
+        ):
+            with self.assertRaisesMessage(CommandError, '2 batches left spooled'):
+                call_command('drain_tracking_spool', stdout=io.StringIO())
+        self.assertEqual(spool.pending_count(), 2)
+        self.assertEqual(spool.dead_count(), 0)
+
+        call_command('drain_tracking_spool', stdout=io.StringIO())
+        self.assertEqual(spool.pending_count(), 0)
+        self.assertEqual(ActivityEvent.objects.count(), 2)
+
+    def test_lock_partway_through_one_by_one_keeps_the_rest_spooled(self):
+        self.sync()
+        self.sync('rejected')
+        self.sync()
+        calls = []
+
+        def apply(user, event_objs, entries):
+            calls.append(event_objs[0].app_label)
+            if len(calls) == 1:
+                raise DataError('value too long')  # Sends the drainer one by one.
+            if event_objs[0].app_label == 'rejected':
+                raise DataError('value too long')
+            if len(calls) == 4:
+                raise OperationalError('database is locked')
+            return apply_batch(user, event_objs, entries)
+
+        with mock.patch('tracking.management.commands.drain_tracking_spool.apply_batch', side_effect=apply):
+            with self.assertRaises(CommandError):
+                call_command('drain_tracking_spool', stdout=io.StringIO(), stderr=io.StringIO())
+        # The first batch committed and the second was dead-lettered; the third is still queued.
+        self.assertEqual(ActivityEvent.objects.count(), 1)
+        self.assertEqual(spool.dead_count(), 1)
+        self.assertEqual(spool.pending_count(), 1)
+
+    def test_undecodable_and_rejected_batches_are_dead_lettered(self):
+        self.sync()
+        spool._connect().execute('INSERT INTO batch (user_id, body) VALUES (?, ?)', (self.user.pk, '{"events": ['))
+        self.sync('rejected')
+        self.sync()
+
+        def apply(user, event_objs, entries):
+            if event_objs[0].app_label == 'rejected':
+                raise DataError('value too long')
+            return apply_batch(user, event_objs, entries)
+
+        stderr = io.StringIO()
+        with mock.patch('tracking.management.commands.drain_tracking_spool.apply_batch', side_effect=apply):
+            call_command('drain_tracking_spool', stdout=io.StringIO(), stderr=stderr)
+        self.assertEqual(ActivityEvent.objects.count(), 2)
+        self.assertEqual(spool.pending_count(), 0)
+        dead = spool._connect().execute('SELECT body, error FROM dead_batch ORDER BY id').fetchall()
+        self.assertEqual(len(dead), 2)
+        self.assertEqual(dead[0][0], '{"events": [')
+        self.assertIn('rejected', dead[1][0])
+        self.assertEqual(dead[1][1], 'value too long')
+        self.assertIn('Dead-lettering', stderr.getvalue())
+
+
+class RetentionTest(TestCase):
+    """tracking.retention: payload offloading and compaction into ActivityAggregate."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('learner')
+        self.now = timezone.now()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = retention.PayloadArchive(f'{directory.name}/payloads.jsonl.gz')
+
+    def event(self, days_ago, event_type='trial', magnitude=1, payload=None):
+        return ActivityEvent.objects.create(
+            user=self.user, app_label='tprboard', event_type=event_type,
+            occurred_at=self.now - timedelta(days=days_ago), client_uuid=uuid.uuid4(),
+            magnitude=magnitude, payload=payload,
+        )
+
+    def archived(self):
+        with gzip.open(self.archive.path, 'rt', encoding='utf-8') as archive:
+            return [json.loads(line) for line in archive]
+
+    def test_offload_archives_then_strips_only_old_bulky_payloads(self):
+        bulky = self.event(40, payload={'text': 'x' * 300})
+        small = self.event(40, payload={'ok': True})
+        recent_bulky = self.event(1, payload={'text': 'x' * 300})
+
+        stripped, removed = retention.offload_payloads(
+            self.now - timedelta(days=30), self.archive, min_bytes=256, chunk_size=1,
+        )
+        self.assertEqual(stripped, 1)
+        self.assertEqual(removed, len(json.dumps({'text': 'x' * 300})))
+        self.assertEqual([line['client_uuid'] for line in self.archived()], [str(bulky.client_uuid)])
+        self.assertEqual(self.archived()[0]['payload'], {'text': 'x' * 300})
+        bulky.refresh_from_db()
+        small.refresh_from_db()
+        recent_bulky.refresh_from_db()
+        self.assertIsNone(bulky.payload)
+        self.assertEqual(small.payload, {'ok': True})
+        self.assertIsNotNone(recent_bulky.payload)
+
+    def test_compaction_folds_old_events_into_daily_aggregates(self):
+        for magnitude in (1, 2, 3):
+            self.event(200, magnitude=magnitude)
+        self.event(200, event_type='active_time', magnitude=60000, payload={'note': 'kept'})
+        fresh = self.event(10)
+
+        compacted, removed = retention.compact_events(self.now - timedelta(days=180), self.archive, chunk_size=2)
+        self.assertEqual(compacted, 4)
+        self.assertEqual(removed, len(json.dumps({'note': 'kept'})))
+        self.assertEqual(list(ActivityEvent.objects.all()), [fresh])
+        day = timezone.localdate(self.now - timedelta(days=200))
+        # Spread over two chunks, the trials still land in one row per day.
+        self.assertEqual(
+            set(ActivityAggregate.objects.values_list('event_type', 'day', 'count', 'magnitude')),
+            {('trial', day, 3, 6.0), ('active_time', day, 1, 60000.0)},
+        )
+        self.assertEqual([line['payload'] for line in self.archived()], [{'note': 'kept'}])
+
+    def test_rollup_rebuild_counts_compacted_history(self):
+        self.event(200, magnitude=2)
+        self.event(200, magnitude=3)
+        rollups.rebuild()
+        before = list(DailyActivity.objects.values_list('day', 'trials'))
+
+        retention.compact_events(self.now - timedelta(days=180), None, chunk_size=100)
+        rollups.rebuild()
+        self.assertEqual(list(DailyActivity.objects.values_list('day', 'trials')), before)
+        self.assertEqual(before[0][1], 5.0)
+
+    def test_command_refuses_a_horizon_inside_the_dashboard_window(self):
+        with self.assertRaisesMessage(CommandError, '--horizon-days must be at least'):
+            call_command('compact_activity_events', '--horizon-days', '7', stdout=io.StringIO())
+
+
+class SyncDecodeTest(SyncTestCase):
+    """tracking.views.sync's body decoding: gzip/deflate Content-Encoding and the columnar shape."""
+
+    def post(self, body, encoding=None):
+        headers = {'HTTP_CONTENT_ENCODING': encoding} if encoding else {}
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        return self.client.post(reverse('tracking:sync'), body, content_type='application/json', **headers)
+
+    def columnar(self, **overrides):
+        batch = {
+            'strings': ['tprboard', 'trial', 'active_time'],
+            'events': {
+                'client_uuid': [str(uuid.uuid4()), str(uuid.uuid4())],
+                'app_label': [0, 0],
+                'event_type': [1, 2],
+                'occurred_at': [1767225600000, 1767225601000],
+            },
+        }
+        batch['events'].update(overrides.pop('events', {}))
+        batch.update(overrides)
+        return batch
+
+    def test_columnar_batch_defaults_magnitude_and_payload(self):
+        response = self.post(self.columnar())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['accepted']), 2)
+        self.assertEqual(
+            set(ActivityEvent.objects.values_list('app_label', 'event_type', 'magnitude', 'payload')),
+            {('tprboard', 'trial', 1.0, None), ('tprboard', 'active_time', 1.0, None)},
+        )
+
+    def test_columnar_magnitude_and_payload_columns(self):
+        self.post(self.columnar(events={'magnitude': [1, 5000], 'payload': [None, {'k': 1}]}))
+        event = ActivityEvent.objects.get(event_type='active_time')
+        self.assertEqual((event.magnitude, event.payload), (5000.0, {'k': 1}))
+
+    def test_malformed_columnar_batches_are_rejected(self):
+        cases = {
+            'negative index': self.columnar(events={'app_label': [0, -1]}),
+            'index past the end': self.columnar(events={'event_type': [1, 3]}),
+            'non-integer index': self.columnar(events={'event_type': [1, '2']}),
+            'boolean index': self.columnar(events={'event_type': [True, 2]}),
+            'strings not a list': self.columnar(strings={'0': 'tprboard', '1': 'trial', '2': 'active_time'}),
+            'strings as one string': self.columnar(strings='tprboard'),
+            'non-string entry': self.columnar(strings=['tprboard', 1, 'active_time']),
+            'missing strings': {key: value for key, value in self.columnar().items() if key != 'strings'},
+            'columns differ in length': self.columnar(events={'occurred_at': [1767225600000]}),
+            'missing column': self.columnar(events={'client_uuid': None}),
+        }
+        for name, batch in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self.post(batch).status_code, 400)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+    def test_gzip_and_deflate_bodies(self):
+        for encoding, compress in (('gzip', gzip.compress), ('deflate', zlib.compress)):
+            with self.subTest(encoding):
+                response = self.post(compress(json.dumps(self.columnar()).encode()), encoding)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['accepted']), 2)
+
+    def test_bad_compressed_bodies_are_rejected(self):
+        body = gzip.compress(json.dumps(self.columnar()).encode())
+        limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        cases = {
+            'unsupported encoding': (body, 'br'),
+            'not actually compressed': (json.dumps(self.columnar()).encode(), 'gzip'),
+            'deflate labelled gzip': (zlib.compress(json.dumps(self.columnar()).encode()), 'gzip'),
+            'truncated': (body[:len(body) // 2], 'gzip'),
+            'bomb': (gzip.compress(b' ' * (limit + 1)), 'gzip'),
+        }
+        for name, (payload, encoding) in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self.post(payload, encoding).status_code, 400)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+
+class SyncRateLimitTest(SyncTestCase):
+    """tracking.ratelimit: a token bucket per user of BURST syncs refilling at RATE_PER_SECOND,
+    then 429 with Retry-After."""
+
+    def sync(self):
+        return self.client.post(reverse('tracking:sync'), '{}', content_type='application/json')
+
+    def test_over_the_burst_gets_429_until_a_token_refills(self):
+        start = 1_000_000.0
+        with mock.patch('tracking.ratelimit.time.time', return_value=start):
+            for _ in range(ratelimit.BURST):
+                self.assertEqual(self.sync().status_code, 200)
+            response = self.sync()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], str(math.ceil(1 / ratelimit.RATE_PER_SECOND)))
+
+        # One token back, not a fresh window's worth: no double burst across a boundary.
+        with mock.patch('tracking.ratelimit.time.time', return_value=start + 1 / ratelimit.RATE_PER_SECOND):
+            self.assertEqual(self.sync().status_code, 200)
+            self.assertEqual(self.sync().status_code, 429)
+
+    def test_limit_is_per_user(self):
+        with mock.patch('tracking.ratelimit.time.time', return_value=1_000_000.0):
+            for _ in range(ratelimit.BURST + 1):
+                self.sync()
+            self.client.force_login(get_user_model().objects.create_user('other'))
+            self.assertEqual(self.sync().status_code, 200)
+
+    def test_check_writes_nothing_to_the_database(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(ratelimit.take(self.user))
+
+    def test_concurrent_takes_spend_each_token_once(self):
+        cache_get = LocMemCache.get
+
+        def slow_get(cache, *args, **kwargs):
+            value = cache_get(cache, *args, **kwargs)
+            time.sleep(0.001)  # Widen the read-modify-write window a race would need.
+            return value
+
+        with (
+            mock.patch('tracking.ratelimit.time.time', return_value=1_000_000.0),
+            mock.patch.object(LocMemCache, 'get', slow_get),
+            ThreadPoolExecutor(max_workers=8) as pool,
+        ):
+            results = list(pool.map(lambda _: ratelimit.take(self.user), range(ratelimit.BURST + 10)))
+        self.assertEqual(results.count(None), ratelimit.BURST)
+
+    def test_admin_lists_bucket_levels_read_only(self):
+        with mock.patch('tracking.ratelimit.time.time', return_value=1_000_000.0):
+            for _ in range(5):
+                ratelimit.take(self.user)
+            staff = get_user_model().objects.create_user('staff', is_staff=True, is_superuser=True)
+            self.client.force_login(staff)
+            response = self.client.get(reverse('admin:tracking_syncratelimit_changelist'))
+        self.assertContains(response, f'{ratelimit.BURST - 5:.1f} / {ratelimit.BURST}')
+        self.assertContains(response, f'{float(ratelimit.BURST):.1f} / {ratelimit.BURST}')  # staff's own, untouched
+        self.assertEqual(
+            self.client.get(reverse('admin:tracking_syncratelimit_change', args=[self.user.pk])).status_code, 200,
+        )
+        self.assertEqual(self.client.get(reverse('admin:tracking_syncratelimit_add')).status_code, 403)
+
+
+class SyncDedupeTest(SyncTestCase):
+    """Retried events are answered as `known`, from tracking.recent once their batch committed."""
+
+    def batch(self, *client_uuids):
+        return {'events': [
+            {'app_label': 'tprboard', 'event_type': 'trial', 'occurred_at': 1767225600000, 'client_uuid': value}
+            for value in client_uuids
+        ]}
+
+    def sync(self, batch):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('tracking:sync'), json.dumps(batch), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_new_events_are_accepted_and_retries_known(self):
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+        self.assertEqual(self.sync(self.batch(first)), {'states': {}, 'accepted': [first], 'known': []})
+
+        result = self.sync(self.batch(first, second))
+        self.assertEqual(result['accepted'], [second])
+        self.assertEqual(result['known'], [first])
+        self.assertEqual(ActivityEvent.objects.count(), 2)
+        self.assertEqual(DailyActivity.objects.get().trials, 2)
+
+    def test_retry_is_answered_from_the_cache_without_touching_events(self):
+        values = [str(uuid.uuid4()) for _ in range(3)]
+        self.sync(self.batch(*values))
+        self.assertEqual(recent.seen(self.user.pk), {uuid.UUID(value).bytes for value in values})
+
+        with mock.patch('tracking.views.apply_batch', wraps=apply_batch) as apply:
+            result = self.sync(self.batch(*values))
+        self.assertEqual(apply.call_args.args[1], [])
+        self.assertEqual(result['known'], sorted(values))
+        self.assertEqual(result['accepted'], [])
+
+    def test_cache_miss_falls_back_to_the_database(self):
+        value = str(uuid.uuid4())
+        self.sync(self.batch(value))
+        caches['tracking'].clear()
+        result = self.sync(self.batch(value))
+        self.assertEqual((result['accepted'], result['known']), ([], [value]))
+        self.assertEqual(DailyActivity.objects.get().trials, 1)
+
+    def test_in_batch_repeat_is_stored_and_counted_once(self):
+        value = str(uuid.uuid4())
+        result = self.sync(self.batch(value, value))
+        self.assertEqual(result['accepted'], [value])
+        self.assertEqual(ActivityEvent.objects.count(), 1)
+
+    def test_sync_rolls_trials_and_active_time_up_into_daily_activity(self):
+        def event(app_label, event_type, occurred_at, **extra):
+            return {
+                'app_label': app_label, 'event_type': event_type, 'occurred_at': occurred_at,
+                'client_uuid': str(uuid.uuid4()), **extra,
+            }
+
+        events = [
+            event('tprboard', 'trial', 1767225600000),
+            event('tprboard', 'trial', 1767225660000),
+            event('tprboard', 'active_time', 1767225660000, magnitude=45000),
+            event('saetze', 'trial', 1767225600000),
+        ]
+        self.sync({'events': events})
+        self.sync({'events': events})
+        rows = DailyActivity.objects.values_list('user_id', 'app_label', 'trials', 'active_ms').order_by('app_label')
+        self.assertEqual(list(rows), [(self.user.pk, 'saetze', 1, 0), (self.user.pk, 'tprboard', 2, 45000)])
+
+    def test_same_client_uuid_from_another_user_is_theirs(self):
+        value = str(uuid.uuid4())
+        self.sync(self.batch(value))
+        other = get_user_model().objects.create_user('other learner')
+        self.client.force_login(other)
+        self.assertEqual(self.sync(self.batch(value))['accepted'], [value])
+        self.assertEqual(self.sync(self.batch(value))['known'], [value])
+        self.assertEqual(
+            sorted(DailyActivity.objects.values_list('user_id', 'trials')), [(self.user.pk, 1), (other.pk, 1)],
+        )
+
+    def test_rolled_back_batch_is_not_remembered(self):
+        # As when a drain_tracking_spool transaction holding several batches rolls back.
+        event = ActivityEvent(
+            user=self.user, app_label='tprboard', event_type='trial',
+            occurred_at=timezone.now(), client_uuid=uuid.uuid4(),
+        )
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(OperationalError):
+            with transaction.atomic():
+                apply_batch(self.user, [event], [])
+                raise OperationalError('database is locked')
+        self.assertEqual(recent.seen(self.user.pk), set())
+
+    def test_remember_keeps_only_the_newest(self):
+        values = [uuid.uuid4() for _ in range(recent.CAPACITY + 10)]
+        recent.remember(self.user.pk, values[:recent.CAPACITY])
+        recent.remember(self.user.pk, values[recent.CAPACITY:])
+        self.assertEqual(recent.seen(self.user.pk), {value.bytes for value in values[10:]})
+
+
+class DashboardDataTest(TestCase):
+    """dashboard_data charts the DailyActivity rollup, not raw events."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('learner')
+        self.today = timezone.localdate()
+
+    def test_reads_the_rollup_only(self):
+        yesterday = self.today - timedelta(days=1)
+        DailyActivity.objects.bulk_create([
+            DailyActivity(user=self.user, app_label='tprboard', day=yesterday, trials=3, active_ms=120000),
+            DailyActivity(user=self.user, app_label='saetze', day=self.today, trials=5, active_ms=30000),
+            DailyActivity(
+                user=get_user_model().objects.create_user('other'), app_label='tprboard', day=self.today, trials=9,
+            ),
+        ])
+        # Raw events without a rollup row (e.g. before a rebuild) don't show.
+        ActivityEvent.objects.create(
+            user=self.user, app_label='hebrewscript', event_type='trial', occurred_at=timezone.now(),
+            client_uuid=uuid.uuid4(),
+        )
+
+        with self.assertNumQueries(1):
+            data = dashboard_data(self.user)
+        self.assertEqual(data['days'], [yesterday.isoformat(), self.today.isoformat()])
+        self.assertEqual(sorted(data['apps']), ['saetze', 'tprboard'])
+        self.assertEqual(data['trials'][yesterday.isoformat()], {'saetze': 0, 'tprboard': 3})
+        self.assertEqual(data['trials'][self.today.isoformat()], {'saetze': 5, 'tprboard': 0})
+        self.assertEqual(data['activeMinutes'][yesterday.isoformat()]['tprboard'], 2)
+        self.assertEqual(data['activeMinutes'][self.today.isoformat()]['saetze'], 0.5)
+
+    def test_window_and_empty_history(self):
+        DailyActivity.objects.create(
+            user=self.user, app_label='tprboard', day=self.today - timedelta(days=DASHBOARD_WINDOW_DAYS), trials=1,
+        )
+        data = dashboard_data(self.user)
+        self.assertEqual(data['apps'], [])
+        self.assertEqual(len(data['days']), DASHBOARD_WINDOW_DAYS)
+        self.assertEqual(data['days'][-1], self.today.isoformat())
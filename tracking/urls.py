@@ -7,5 +7,6 @@ app_name = 'tracking'
 urlpatterns = [
     path('sync/', views.sync, name='sync'),
     path('state/<str:app_label>/', views.state, name='state'),
+    path('export/', views.export_states, name='export'),
     path('dashboard/', views.dashboard, name='dashboard'),
 ]
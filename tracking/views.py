@@ -1,24 +1,34 @@
+import hashlib
 import json
 import uuid
+import zlib
 from datetime import datetime, timedelta, timezone as dt_timezone
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
-from django.db.models import Sum
-from django.db.models.functions import TruncDate
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils import timezone
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
 
 from core.apps_registry import APPS
-from tracking.models import ActivityEvent, LearningState
+from core.metrics import JsonResponse
+from tracking import ratelimit, recent, spool
+from tracking.ingest import apply_batch
+from tracking.models import ActivityEvent, DailyActivity, LearningState
 
 MAX_EVENTS_PER_SYNC = 500
 MAX_STATES_PER_SYNC = 200
 MAX_CLOCK_SKEW = timedelta(minutes=5)
 DASHBOARD_WINDOW_DAYS = 30
+CURSOR_OVERLAP = timedelta(seconds=5)
+CURSOR_HEADER = 'X-Tracking-Cursor'
+EXPORT_CHUNK_SIZE = 2000
+# zlib wbits per accepted sync Content-Encoding ('deflate' is the zlib-wrapped format, per RFC 9110).
+CONTENT_ENCODING_WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
 
 # Fixed order for stacking/coloring apps on the dashboard, so a series' color stays put as more
 # apps get wired up rather than shifting whenever alphabetical sort would insert one earlier.
@@ -42,9 +52,31 @@ def _clamp_to_now(value, now):
     return now if value > now + MAX_CLOCK_SKEW else value
 
 
+def _decompress(body, encoding):
+    """Undo a gzip/deflate Content-Encoding, capping the *decompressed* size at the same
+    DATA_UPLOAD_MAX_MEMORY_SIZE that already caps plain bodies (no zip bombs)."""
+    if encoding in ('', 'identity'):
+        return body
+    if encoding not in CONTENT_ENCODING_WBITS:
+        raise ValueError(f'Unsupported Content-Encoding {encoding!r}')
+
+    limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    decompressor = zlib.decompressobj(CONTENT_ENCODING_WBITS[encoding])
+    try:
+        data = decompressor.decompress(body, limit + 1 if limit is not None else 0)
+    except zlib.error as exc:
+        raise ValueError('Invalid compressed body') from exc
+    if limit is not None and len(data) > limit:
+        raise ValueError('Decompressed body too large')
+    if not decompressor.eof:
+        raise ValueError('Truncated compressed body')
+    return data
+
+
 def _parse_sync_payload(request):
     if request.content_type == 'application/json':
-        return json.loads(request.body)
+        encoding = request.headers.get('Content-Encoding', '').strip().lower()
+        return json.loads(_decompress(request.body, encoding))
 
     # navigator.sendBeacon can't set a JSON content-type reliably across browsers, so the
     # unload-time flush posts urlencoded form data instead, with the batch JSON in `payload`.
@@ -54,73 +86,223 @@ def _parse_sync_payload(request):
     return json.loads(raw)
 
 
+def _row_event(event):
+    try:
+        return (
+            event['app_label'], event['event_type'], event['occurred_at'], event['client_uuid'],
+            event.get('magnitude', 1), event.get('payload'),
+        )
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def _interned(strings, indexes):
+    """`strings[index]` for each of `indexes`, which must all be in range (no negative indexing)."""
+    if not all(type(index) is int and 0 <= index < len(strings) for index in indexes):
+        raise ValueError('String index out of range')
+    return [strings[index] for index in indexes]
+
+
+def _columnar_events(columns, strings):
+    """Rows of the compact columnar shape: `events` is a dict of parallel arrays, with
+    `app_label`/`event_type` given as indexes into the batch's top-level `strings` list.
+    `magnitude` and `payload` may be omitted when every event uses the default."""
+    if not isinstance(strings, list) or not all(isinstance(value, str) for value in strings):
+        raise ValueError('strings must be a list of strings')
+    client_uuids = columns['client_uuid']
+    count = len(client_uuids)
+    app_labels = _interned(strings, columns['app_label'])
+    event_types = _interned(strings, columns['event_type'])
+    occurred_ats = columns['occurred_at']
+    magnitudes = columns.get('magnitude') or [1] * count
+    payloads = columns.get('payload') or [None] * count
+    if any(len(column) != count for column in (app_labels, event_types, occurred_ats, magnitudes, payloads)):
+        raise ValueError('Columnar event arrays differ in length')
+    return list(zip(app_labels, event_types, occurred_ats, client_uuids, magnitudes, payloads))
+
+
+def _event_rows(data):
+    """`(app_label, event_type, occurred_at, client_uuid, magnitude, payload)` per event, from
+    either the row shape (a list of event dicts) or the columnar shape (see _columnar_events).
+    Malformed rows are dropped; a malformed columnar batch raises."""
+    events = data.get('events') or []
+    if isinstance(events, dict):
+        return _columnar_events(events, data.get('strings', []))
+    return [row for row in map(_row_event, events) if row is not None]
+
+
 @login_required
 @require_POST
 def sync(request):
+    """Ingest a client's batch of events and state entries.
+
+    Inline by default, answering with the merged states plus the event
+    client_uuids that were `accepted` (newly stored) and those already
+    `known` to the server. With settings.TRACKING_SPOOL_PATH set, the
+    validated batch is only queued in tracking.spool and answered 202 with
+    just `known`, for drain_tracking_spool to apply later. Clients over their
+    tracking.ratelimit budget get 429 with Retry-After.
+    """
+    retry_after = ratelimit.take(request.user)
+    if retry_after is not None:
+        response = HttpResponse('Too many sync requests', status=429, content_type='text/plain')
+        response['Retry-After'] = str(retry_after)
+        return response
+
     try:
         data = _parse_sync_payload(request)
-    except (ValueError, TypeError, json.JSONDecodeError):
+        event_rows = _event_rows(data)
+        states = data.get('states') or []
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError):
         return HttpResponseBadRequest('Invalid payload')
 
-    events = data.get('events') or []
-    states = data.get('states') or []
-
-    if len(events) > MAX_EVENTS_PER_SYNC or len(states) > MAX_STATES_PER_SYNC:
+    if len(event_rows) > MAX_EVENTS_PER_SYNC or len(states) > MAX_STATES_PER_SYNC:
         return HttpResponseBadRequest('Batch too large')
 
     now = timezone.now()
 
+    # Retried events committed recently are answered as known from tracking.recent, without
+    # building an ActivityEvent for them or looking them up in the database.
+    recently_seen = recent.seen(request.user.pk)
+    known = []
     event_objs = []
-    for event in events:
+    for app_label, event_type, occurred_at, client_uuid, magnitude, payload in event_rows:
         try:
+            client_uuid = uuid.UUID(str(client_uuid))
+            if client_uuid.bytes in recently_seen:
+                known.append(client_uuid)
+                continue
             event_objs.append(ActivityEvent(
                 user=request.user,
-                app_label=str(event['app_label']),
-                event_type=str(event['event_type']),
-                occurred_at=_clamp_to_now(_epoch_ms_to_datetime(event['occurred_at']), now),
-                client_uuid=uuid.UUID(str(event['client_uuid'])),
-                magnitude=float(event.get('magnitude', 1)),
-                payload=event.get('payload'),
+                app_label=str(app_label),
+                event_type=str(event_type),
+                occurred_at=_clamp_to_now(_epoch_ms_to_datetime(occurred_at), now),
+                client_uuid=client_uuid,
+                magnitude=float(magnitude),
+                payload=payload,
             ))
-        except (KeyError, ValueError, TypeError):
+        except (ValueError, TypeError):
             continue
 
-    if event_objs:
-        ActivityEvent.objects.bulk_create(event_objs, ignore_conflicts=True)
-
-    merged_states = {}
+    entries = []
     for entry in states:
         try:
-            app_label = str(entry['app_label'])
-            item_key = str(entry['item_key'])
-            updated_at = _clamp_to_now(_epoch_ms_to_datetime(entry['updated_at']), now)
-            value = entry['state']
+            entries.append((
+                str(entry['app_label']),
+                str(entry['item_key']),
+                entry['state'],
+                _clamp_to_now(_epoch_ms_to_datetime(entry['updated_at']), now),
+            ))
         except (KeyError, ValueError, TypeError):
             continue
 
-        with transaction.atomic():
-            row, created = LearningState.objects.select_for_update().get_or_create(
-                user=request.user,
-                app_label=app_label,
-                item_key=item_key,
-                defaults={'state': value, 'updated_at': updated_at},
-            )
-            if not created and updated_at > row.updated_at:
-                row.state = value
-                row.updated_at = updated_at
-                row.save(update_fields=['state', 'updated_at'])
+    if spool.enabled():
+        spool.append(request.user.pk, event_objs, entries)
+        return JsonResponse({'queued': True, 'known': [str(value) for value in known]}, status=202)
 
+    new_events, merged_rows = apply_batch(request.user, event_objs, entries)
+    accepted = [event.client_uuid for event in new_events]
+    # Events that missed the cache but were already stored (or repeated within the batch).
+    accepted_set = set(accepted)
+    known.extend(event.client_uuid for event in event_objs if event.client_uuid not in accepted_set)
+    merged_states = {}
+    for app_label, item_key, _, _ in entries:
+        row = merged_rows[(app_label, item_key)]
         merged_states[item_key] = {'state': row.state, 'updated_at': row.updated_at.isoformat()}
 
-    return JsonResponse({'states': merged_states})
+    return JsonResponse({
+        'states': merged_states,
+        'accepted': [str(value) for value in accepted],
+        'known': sorted({str(value) for value in known}),
+    })
+
+
+def _parse_cursor(value):
+    cursor = datetime.fromisoformat(value)
+    if timezone.is_naive(cursor):
+        raise ValueError('Cursor must carry a UTC offset')
+    return cursor
+
+
+def _state_rows(request, app_label):
+    rows = LearningState.objects.filter(user=request.user, app_label=app_label)
+    since = request.GET.get('since')
+    if since:
+        # Re-send a short overlap before the cursor: a write stamped just before it may commit
+        # just after it was handed out. Clients merge last-writer-wins, so repeats are harmless.
+        rows = rows.filter(changed_at__gt=_parse_cursor(since) - CURSOR_OVERLAP)
+    return rows
+
+
+def _state_etag(request, app_label):
+    try:
+        rows = _state_rows(request, app_label)
+    except ValueError:
+        return None
+    summary = rows.aggregate(count=Count('pk'), latest=Max('changed_at'))
+    latest = summary['latest'].isoformat() if summary['latest'] else ''
+    digest = hashlib.sha256(
+        f'{request.user.pk}|{app_label}|{request.GET.get("since", "")}|{summary["count"]}|{latest}'.encode()
+    )
+    return digest.hexdigest()[:32]
 
 
 @login_required
 @require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_state_etag)
 def state(request, app_label):
-    rows = LearningState.objects.filter(user=request.user, app_label=app_label)
-    payload = {row.item_key: {'state': row.state, 'updated_at': row.updated_at.isoformat()} for row in rows}
-    return JsonResponse(payload)
+    """This user's state for `app_label`, as `{item_key: {state, updated_at}}`.
+
+    With `?since=<cursor>`, only rows changed after that cursor are returned.
+    Every response carries the cursor to pass next time in the
+    `X-Tracking-Cursor` header, and a strong ETag so an unchanged set is
+    answered 304 (by `condition`) before anything is serialized.
+    """
+    try:
+        rows = _state_rows(request, app_label)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    payload = {}
+    cursor = None
+    for row in rows:
+        payload[row.item_key] = {'state': row.state, 'updated_at': row.updated_at.isoformat()}
+        cursor = row.changed_at if cursor is None else max(cursor, row.changed_at)
+
+    response = JsonResponse(payload)
+    response[CURSOR_HEADER] = cursor.isoformat() if cursor else request.GET.get('since', '')
+    return response
+
+
+def _state_lines(rows):
+    for app_label, item_key, value, updated_at in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield json.dumps({
+            'app_label': app_label,
+            'item_key': item_key,
+            'state': value,
+            'updated_at': updated_at.isoformat(),
+        }) + '\n'
+
+
+@login_required
+@require_GET
+def export_states(request):
+    """Stream this user's state as NDJSON, one `{app_label, item_key, state, updated_at}` per line.
+
+    Pass `app_label` (repeatable) to restrict the export to those apps; omit it to restore every
+    app in one request. Rows are read in EXPORT_CHUNK_SIZE chunks and written as they're
+    produced, so worker memory stays flat however many states a user has.
+    """
+    rows = LearningState.objects.filter(user=request.user)
+    app_labels = request.GET.getlist('app_label')
+    if app_labels:
+        rows = rows.filter(app_label__in=app_labels)
+    rows = rows.order_by('app_label', 'item_key').values_list('app_label', 'item_key', 'state', 'updated_at')
+
+    response = StreamingHttpResponse(_state_lines(rows), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'private, no-store'
+    return response
 
 
 def dashboard_data(user):
@@ -128,16 +310,16 @@ def dashboard_data(user):
 
     Shared by the account page (accounts.views.profile), which renders this
     above the account options as the single merged "activity + account" view.
+    Reads the DailyActivity rollup only (at most DASHBOARD_WINDOW_DAYS rows
+    per app), never raw ActivityEvent rows.
     """
     today = timezone.localdate()
     cutoff = today - timedelta(days=DASHBOARD_WINDOW_DAYS - 1)
 
     rows = list(
-        ActivityEvent.objects
-        .filter(user=user, event_type__in=('trial', 'active_time'), occurred_at__date__gte=cutoff)
-        .annotate(day=TruncDate('occurred_at'))
-        .values('day', 'app_label', 'event_type')
-        .annotate(total=Sum('magnitude'))
+        DailyActivity.objects
+        .filter(user=user, day__gte=cutoff)
+        .values('day', 'app_label', 'trials', 'active_ms')
     )
 
     start = min((row['day'] for row in rows), default=today - timedelta(days=DASHBOARD_WINDOW_DAYS - 1))
@@ -149,10 +331,8 @@ def dashboard_data(user):
 
     for row in rows:
         day_key = row['day'].isoformat()
-        if row['event_type'] == 'trial':
-            trials[day_key][row['app_label']] = row['total']
-        elif row['event_type'] == 'active_time':
-            active_minutes[day_key][row['app_label']] = row['total'] / 60000
+        trials[day_key][row['app_label']] = row['trials']
+        active_minutes[day_key][row['app_label']] = row['active_ms'] / 60000
 
     return {
         'days': [day.isoformat() for day in days],
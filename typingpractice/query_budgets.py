@@ -0,0 +1,8 @@
+"""Query budgets for typingpractice's views (see core.query_budgets)."""
+from core.query_budgets import Budget
+
+BUDGETS = {
+    'home': Budget({}),
+    'practice_vie': Budget({}),
+    'settings_vie': Budget({}),
+}